@@ -14,13 +14,14 @@ This module implements the about menu for the platformer game. It provides infor
 # import the pygame module
 import pygame
 import tools
+import assets
 import main_menu
 
 # initializes the pygame module
 pygame.init()
 
-# creates a screen variable of size 800 x 600
-screen = pygame.display.set_mode([tools.SCREEN_X,tools.SCREEN_Y])
+# the 800 x 600 screen made in tools, shown scaled to the window
+screen = tools.screen
 
 # controls the main game while loop
 done = False
@@ -28,14 +29,22 @@ done = False
 # sets the frame rate of the program
 clock = pygame.time.Clock()
 
+# your FUNCTIONS go here
+def load_assets():
+    """Loads the about menu background, for the "about_menu" asset group.
+    """
+    global menu_background
+    menu_background = assets.get_image("about menu.png", (tools.SCREEN_X, tools.SCREEN_Y)) # Load the background image for the about menu scaled to fit the screen
+
 # your GLOBAL variables go here
-menu_background = pygame.image.load("about menu.png").convert_alpha() # Load the background image for the about menu
-menu_background = pygame.transform.scale(menu_background, (tools.SCREEN_X, tools.SCREEN_Y)) # Scale the background to fit the screen
+menu_background = None # loaded the first time the about menu is shown
+assets.declare("about_menu", load_assets, ("main_menu",))
 
 
 # MAIN LOOP
 def run_about_menu():
     global done
+    assets.load("about_menu") # load the background the first time the menu is shown
     screen.blit(menu_background, (0, 0)) # Draw the background image onto the screen
 
     main_menu.input_info, done = tools.check_input() # Check for user input and update the input_info and done variables
@@ -43,8 +52,8 @@ def run_about_menu():
     screen.blit(main_menu.back_button, main_menu.back_button_pos) # Draw the back button onto the screen
     main_menu.back_button_collide(main_menu.back_button_pos, 50, "main_menu", main_menu.input_info.left_mouse_down, main_menu.input_info.xMouse, main_menu.input_info.yMouse) # Check if the back button is clicked and change the game state to main_menu if it is
 
-    # this line draws everything into the window all at once
-    pygame.display.flip()
+    # this line draws the parts of the screen that changed into the window
+    tools.update_display("about_menu")
     # this line limits the frames per second to 60
     clock.tick(60)
     
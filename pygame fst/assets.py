@@ -0,0 +1,238 @@
+"""
+assets.py
+Author: Adiv Goldberg
+Date last edited: 2026-10-18
+Program: platformer asset registry
+Description:
+-------------
+This module loads the images, sounds and fonts of each screen the first time that screen is used, instead of every module loading everything when it is imported. It provides:
+- Declaring the function that loads a groups assets (a screen like "skin_shop", or something shared like "skins"), and the other groups it needs.
+- Loading a group the first time it is needed, only once, after the groups it needs.
+- Shared fonts and sound effects, each is only loaded once.
+- Using the ready made images and sounds in the asset bundle when there is one (see bundle.py).
+- A shared image cache, so an image is only loaded and scaled once however many screens use it. Images count how many
+  things hold them, and when the cache is over its memory budget the biggest, least recently used images nothing holds are forgotten.
+"""
+# import the pygame module
+import pygame
+import atlas
+import bundle
+import packs
+
+FONT_FILE = "upheavtt.ttf" # retro font used for all text
+IMAGE_BUDGET = 64 * 1024 * 1024 # default most bytes of pixels the image cache keeps
+
+# your FUNCTIONS go here
+def declare(group, loader, needs = ()):
+    """declares the assets of a group, nothing is loaded until the group is used
+
+    Args:
+        group (string): name of the group, usually the game state of the screen that uses them
+        loader (function): function that loads the assets into its modules globals, takes no arguments
+        needs (tuple, optional): other groups that have to be loaded first. Defaults to ().
+    """
+    groups[group] = (loader, tuple(needs))
+
+def load(group):
+    """loads the assets of a group if they havent been loaded yet, called by each screen before it draws
+
+    Args:
+        group (string): name of the group
+    """
+    if group in loaded: # already loaded, nothing to do (this is every frame after the first)
+        return
+    loader, needs = groups[group]
+    for need in needs: # load what it needs first
+        load(need)
+    loaded.add(group) # marked before loading, so the loader can call functions that load the group themselves
+    try:
+        loader()
+    except:
+        loaded.discard(group) # try again next time
+        raise
+
+def is_loaded(group):
+    """checks if a group has been loaded
+
+    Args:
+        group (string): name of the group
+
+    Returns:
+        bool: True if its assets are loaded
+    """
+    return group in loaded
+
+def get_font(size):
+    """gets the retro font at a size, loading it the first time
+
+    Args:
+        size (int): size of the font
+
+    Returns:
+        pygame.font.Font: the font, shared with everything else that uses this size
+    """
+    if size not in fonts: # not loaded yet
+        fonts[size] = pygame.font.Font(FONT_FILE, size)
+    return fonts[size]
+
+def get_image(path, size = None, convert = "alpha", decoded = None):
+    """gets an image from the shared cache, loading it the first time. the caller holds the image until it calls release_image,
+    held images are never forgotten. images are shared so they must not be drawn on
+
+    Args:
+        path (string): filepath of the image, like "background.png" or "tiles for game/full block(1).png"
+        size (tuple, optional): (width, height) to scale it to, one can be None to keep its shape. Defaults to None (its own size).
+        convert (string, optional): "alpha" to keep see through pixels, "opaque" for images with none (faster to draw). Defaults to "alpha".
+        decoded (pygame.Surface, optional): the image already decoded by decode_image on the loading thread, only converted here if it isnt cached. Defaults to None.
+
+    Returns:
+        pygame.Surface: the image
+    """
+    global image_uses
+    if size is not None: # whole pixels, so the same size always finds the same image
+        size = tuple(None if side is None else int(side) for side in size)
+    key = (path, size, convert)
+    image_uses += 1
+    entry = image_cache.get(key)
+    if entry is None: # not cached, load it
+        if decoded is not None: # decoded already, it only needs converting for the display
+            img = decoded.convert() if convert == "opaque" else decoded.convert_alpha()
+        else:
+            img = load_image_file(path, size, convert)
+        entry = [img, 0, 0, 0] # image, holders, bytes, when it was last used
+        img = entry[0]
+        if img.get_parent() is None: # parts of atlas sheets share the sheets pixels, so they dont take up any more memory
+            entry[2] = img.get_width() * img.get_height() * img.get_bytesize()
+        image_cache[key] = entry
+        image_keys[img] = key
+        trim_images(entry[2]) # make room for it
+    entry[1] += 1 # one more holder
+    entry[3] = image_uses
+    return entry[0]
+
+def load_image_file(path, size, convert):
+    """loads and scales an image for the cache
+
+    Args:
+        path (string): filepath of the image
+        size (tuple): (width, height) to scale it to, one can be None to keep its shape, None for its own size
+        convert (string): "alpha" or "opaque"
+
+    Returns:
+        pygame.Surface: the new image
+    """
+    img = bundle.load_image(path, size) # ready made in the bundle, nothing to decode or scale
+    if img is not None:
+        return img.convert() if convert == "opaque" else img
+    if size is None: # own size, from the atlas if its packed
+        img = atlas.load_image(path)
+    elif atlas.is_packed(path): # small image, scale its part of the sheet
+        img = atlas.load_image(path)
+        width, height = size
+        if width is None: # keep the shape
+            width = int(height * img.get_width() / img.get_height())
+        elif height is None:
+            height = int(width * img.get_height() / img.get_width())
+        img = pygame.transform.scale(img, (width, height))
+    else: # big image, the scaled copy is also kept on disk
+        import tools # only imported here, tools imports this module
+        img = tools.load_scaled(path, size)
+    if convert == "opaque": # no see through pixels
+        img = img.convert()
+    return img
+
+def get_sound(path):
+    """gets a sound effect, loading it the first time. from the decoded samples in the bundle if they are there
+
+    Args:
+        path (string): filepath of the sound, like "sound/jump.mp3"
+
+    Returns:
+        pygame.mixer.Sound: the sound, shared with everything else that plays it
+    """
+    if path not in sounds: # not loaded yet
+        sound = bundle.load_sound(path)
+        sounds[path] = sound if sound is not None else pygame.mixer.Sound(path) # decode the file if it isnt bundled
+    return sounds[path]
+
+def decode_image(path, size = None):
+    """decodes and scales an image without touching the display, so it can run on the background loading thread.
+    pass the result to get_image on the main thread to convert it and add it to the cache
+
+    Args:
+        path (string): filepath of the image
+        size (tuple, optional): (width, height) to scale it to, one can be None to keep its shape. Defaults to None (its own size).
+
+    Returns:
+        pygame.Surface: the decoded image, None if its cheap to load on the main thread (its in the atlas or cached already)
+    """
+    if size is not None:
+        size = tuple(None if side is None else int(side) for side in size)
+    if atlas.is_packed(path) or any(key[:2] == (path, size) for key in list(image_cache)): # nothing slow to do
+        return None
+    if size is None:
+        return packs.load_image(path)
+    import tools # only imported here, tools imports this module
+    return tools.decode_scaled(path, size)
+
+def hold_image(img):
+    """adds a holder to an image that is already from the cache, for passing it on to something that will release it
+
+    Args:
+        img (pygame.Surface): the image, images that arent from the cache and None are ignored
+    """
+    key = image_keys.get(img)
+    if key is not None:
+        image_cache[key][1] += 1
+
+def release_image(img):
+    """tells the cache something no longer holds an image, it can be forgotten when nothing holds it
+
+    Args:
+        img (pygame.Surface): the image, images that arent from the cache and None are ignored
+    """
+    key = image_keys.get(img)
+    if key is not None and image_cache[key][1] > 0:
+        image_cache[key][1] -= 1
+        trim_images() # it might be forgettable now
+
+def trim_images(extra = 0):
+    """forgets images nothing holds until the cache fits in its budget, biggest and least recently used first
+
+    Args:
+        extra (int, optional): bytes that have just been added and arent counted yet. Defaults to 0.
+    """
+    global image_bytes
+    image_bytes += extra
+    while image_bytes > image_budget:
+        # score each image nothing holds by its size times how long ago it was used, a big custom level background that
+        # hasnt been shown for a while goes before a small icon
+        unheld = [(entry[2] * (image_uses - entry[3] + 1), key) for key, entry in image_cache.items() if entry[1] == 0 and entry[2] > 0]
+        if not unheld: # everything left is in use
+            return
+        _, key = max(unheld)
+        entry = image_cache.pop(key)
+        del image_keys[entry[0]]
+        image_bytes -= entry[2]
+
+def set_image_budget(max_bytes):
+    """changes how many bytes of pixels the image cache keeps, forgetting images if its now over
+
+    Args:
+        max_bytes (int): the new budget
+    """
+    global image_budget
+    image_budget = max_bytes
+    trim_images()
+
+
+# your GLOBAL variables go here
+groups = {} # group name to (loader, groups it needs)
+loaded = set() # names of the groups that have been loaded
+fonts = {} # font size to loaded font
+sounds = {} # sound effect path to loaded sound
+image_cache = {} # (path, size, convert) to [image, holders, bytes, when it was last used]
+image_keys = {} # image to its key in image_cache, for releasing it
+image_bytes = 0 # bytes of pixels in the cache
+image_budget = IMAGE_BUDGET # most bytes to keep, images that are held are kept even over this
+image_uses = 0 # times an image has been got, to know how long ago each was used
@@ -0,0 +1,305 @@
+"""
+atlas.py
+Author: Adiv Goldberg
+Date last edited: 2026-10-18
+Program: platformer texture atlas
+Description:
+-------------
+This module packs the small images of the game into a few sprite sheets, so starting the game opens and decodes a handful of files instead of about a hundred. It provides:
+- An offline builder that packs the tiles, powerups, skins and menu icons into sheets in the atlas folder, with a JSON index of where each image is.
+- Shrinking images that are far bigger than the game ever draws them, so the sheets are quick to decode.
+- A loader that hands out each image as a part of its sheet by the path the game already uses for it, like "tiles for game/full block(1).png".
+- Falling back to loading an image from its own file if there is no atlas, the image isnt in it or its file has changed since the atlas was built,
+  so the game still runs (and shows the new image) before the atlas is built again.
+- Building the atlas from the command line after changing any of the images: python atlas.py
+"""
+# import the pygame module
+import pygame
+import json
+import os
+import hashlib
+import bundle
+import packs
+
+ATLAS_FOLDER = "atlas" # folder the sheets and index are saved in
+INDEX_FILE = os.path.join(ATLAS_FOLDER, "atlas.json") # where each image is in the sheets
+ATLAS_VERSION = 2 # version of the index format
+MAX_SHEET_WIDTH = 2048 # widest a sheet can be
+MAX_SHEET_HEIGHT = 4096 # tallest a sheet can be, images that dont fit go on another sheet
+PADDING = 1 # empty pixels between images so scaling one never picks up its neighbour
+MAX_IMAGE_SIZE = 256 # longest side an image is stored at, nothing is drawn bigger than this so the extra pixels only slow down loading
+
+# folders (every png in them) and single files packed into each group of sheets
+ATLAS_GROUPS = {
+    "tiles": ["tiles for game"],
+    "powerups": ["powerups for game"],
+    "skins": ["characters/simple animals", "characters/runner", "characters/coming soon.png"],
+    "icons": ["menu icons", "check-mark.png"],
+}
+
+# your FUNCTIONS go here
+def get_group_files(sources):
+    """gets the image files of a group
+
+    Args:
+        sources (list): folders and files in the group
+
+    Returns:
+        list: paths of every png in the group, with / between folders like the game uses
+    """
+    files = []
+    for source in sources: # go through each folder or file
+        if os.path.isdir(source): # every png in the folder
+            files += [f"{source}/{name}" for name in sorted(os.listdir(source)) if name.lower().endswith(".png")]
+        else:
+            files.append(source)
+    return files
+
+def hash_file(path):
+    """hashes an image file, to notice images changed since the atlas was built
+
+    Args:
+        path (string): filepath of the image
+
+    Returns:
+        string: sha1 of the file
+    """
+    with open(path, "rb") as filehandle:
+        return hashlib.sha1(filehandle.read()).hexdigest()
+
+def skyline_place(skyline, w, h, sheet_width):
+    """finds the lowest spot on the skyline an image fits in, leftmost if there is a tie
+
+    Args:
+        skyline (list): [x, y, width] for each flat part of the top edge of the packed images, left to right
+        w (int): width of the image
+        h (int): height of the image
+        sheet_width (int): width of the sheet
+
+    Returns:
+        tuple: index of the part the image starts on and the x, y of the image, None if it doesnt fit
+    """
+    best = None
+    for i in range(len(skyline)): # try starting the image at each part
+        x = skyline[i][0]
+        if x + w > sheet_width: # would stick out the right of the sheet
+            break
+        y = 0
+        j = i
+        while skyline[j][0] < x + w: # the image has to sit above every part it covers
+            y = max(y, skyline[j][1])
+            j += 1
+            if j == len(skyline):
+                break
+        if y + h <= MAX_SHEET_HEIGHT and (best is None or y + h < best[2] + h): # lower than the best spot so far
+            best = (i, x, y)
+    return best
+
+def skyline_add(skyline, i, x, y, w, h):
+    """raises the skyline where an image was placed
+
+    Args:
+        skyline (list): [x, y, width] for each flat part of the top edge, changed in place
+        i (int): index of the part the image starts on
+        x, y (int): where the image was placed
+        w, h (int): size of the image
+    """
+    new_parts = [[x, y + h, w]]
+    end = x + w
+    j = i
+    while j < len(skyline) and skyline[j][0] < end: # parts under the image
+        part_end = skyline[j][0] + skyline[j][2]
+        if part_end > end: # part sticks out past the image, keep the rest of it
+            new_parts.append([end, skyline[j][1], part_end - end])
+        j += 1
+    skyline[i:j] = new_parts
+
+def pack_sheets(sizes, sheet_width):
+    """packs images into sheets of one width with the skyline method, tallest first
+
+    Args:
+        sizes (dict): path to (width, height) of each image, including padding
+        sheet_width (int): width of every sheet
+
+    Returns:
+        tuple: list of (width, height) for each sheet, dict of path to (sheet number, x, y)
+    """
+    places = {}
+    sheets = []
+    left = sorted(sizes, key=lambda path: (-sizes[path][1], -sizes[path][0], path)) # tallest first
+    while left: # fill one sheet at a time
+        skyline = [[0, 0, sheet_width]]
+        used_w, used_h = 0, 0
+        not_placed = []
+        for path in left:
+            w, h = sizes[path]
+            spot = skyline_place(skyline, w, h, sheet_width)
+            if spot is None: # sheet is full, try it on the next one
+                not_placed.append(path)
+                continue
+            i, x, y = spot
+            skyline_add(skyline, i, x, y, w, h)
+            places[path] = (len(sheets), x, y)
+            used_w, used_h = max(used_w, x + w), max(used_h, y + h)
+        if len(not_placed) == len(left): # too big for any sheet of this width
+            return None, None
+        sheets.append((used_w, used_h))
+        left = not_placed
+    return sheets, places
+
+def pack_images(sizes):
+    """places images into as few sheets with as little area as possible, trying sheets of different widths, as decoding empty space still takes time
+
+    Args:
+        sizes (dict): path to (width, height) of each image
+
+    Returns:
+        tuple: list of (width, height) for each sheet, dict of path to (sheet number, x, y)
+    """
+    padded = {path: (w + PADDING, h + PADDING) for path, (w, h) in sizes.items()}
+    best = None
+    for sheet_width in range(max(w for w, h in padded.values()), MAX_SHEET_WIDTH + PADDING + 1, 16): # try each width
+        sheets, places = pack_sheets(padded, sheet_width)
+        if sheets is None:
+            continue
+        score = (len(sheets), sum(w * h for w, h in sheets)) # fewest sheets, then least area
+        if best is None or score < best[0]:
+            best = (score, sheets, places)
+    _, sheets, places = best
+    return [(w - PADDING, h - PADDING) for w, h in sheets], places # the last row and column dont need padding
+
+def build_atlas():
+    """packs every group into sheets and writes them with the index to the atlas folder
+
+    Returns:
+        dict: the index that was written
+    """
+    os.makedirs(ATLAS_FOLDER, exist_ok=True)
+    images = {}
+    for group, sources in ATLAS_GROUPS.items(): # each group has its own sheets
+        files = get_group_files(sources)
+        loaded = {}
+        for path in files: # load each image as 32 bit with alpha, so colorkey pixels become see through
+            img = pygame.image.load(path)
+            rgba = pygame.Surface(img.get_size(), pygame.SRCALPHA, 32)
+            if img.get_flags() & pygame.SRCALPHA: # copy the pixels exactly, a normal blit would blend the see through edges
+                rgba.blit(img, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
+            else: # no alpha, a normal blit leaves the colorkey pixels empty
+                rgba.blit(img, (0, 0))
+            if max(rgba.get_size()) > MAX_IMAGE_SIZE: # bigger than it is ever drawn, shrink it keeping its shape
+                scale = MAX_IMAGE_SIZE / max(rgba.get_size())
+                rgba = pygame.transform.smoothscale(rgba, (round(rgba.get_width() * scale), round(rgba.get_height() * scale)))
+            loaded[path] = rgba
+        sheets, places = pack_images({path: img.get_size() for path, img in loaded.items()})
+        sheet_names = [f"{group} {i + 1}.png" for i in range(len(sheets))]
+        sheet_imgs = [pygame.Surface(size, pygame.SRCALPHA, 32) for size in sheets]
+        for path, (sheet, x, y) in places.items(): # copy each image onto its sheet
+            sheet_imgs[sheet].blit(loaded[path], (x, y), special_flags=pygame.BLEND_RGBA_ADD)
+            stat = os.stat(path)
+            images[path] = [sheet_names[sheet], x, y] + list(loaded[path].get_size()) + [stat.st_mtime, stat.st_size, hash_file(path)] # and what its file was like
+        for name, sheet_img in zip(sheet_names, sheet_imgs): # save the sheets
+            pygame.image.save(sheet_img, os.path.join(ATLAS_FOLDER, name))
+    index = {"version": ATLAS_VERSION, "images": images}
+    with open(INDEX_FILE, "w") as filehandle:
+        json.dump(index, filehandle, indent=1, sort_keys=True)
+    return index
+
+def read_index():
+    """reads the atlas index
+
+    Returns:
+        dict: image path to [sheet file, x, y, width, height, file modification time, file size, file hash], empty if there is no atlas
+    """
+    try:
+        with open(INDEX_FILE) as filehandle:
+            index = json.load(filehandle)
+    except (OSError, ValueError): # no atlas built, load every image from its own file
+        return {}
+    if index.get("version") != ATLAS_VERSION: # made by a different version, dont trust it
+        return {}
+    return index.get("images", {})
+
+def is_current(path, place):
+    """checks if an image in the atlas is the same as its file, like bundle.py checks the bundle
+
+    Args:
+        path (string): filepath of the image, with / between folders
+        place (list): its entry in the index
+
+    Returns:
+        bool: True if the file hasnt changed since the atlas was built, or it only exists in the atlas
+    """
+    try:
+        stat = os.stat(path)
+    except OSError: # only in the atlas
+        return True
+    if stat.st_mtime == place[5]: # not touched since it was packed (a stat, the file isnt read)
+        return True
+    if stat.st_size != place[6]: # changed
+        return False
+    key = (path, stat.st_mtime)
+    if key not in checked: # touched, like by a fresh checkout, see if its really different. once per time its touched
+        checked[key] = hash_file(path) == place[7]
+    return checked[key]
+
+def find_image(path):
+    """finds an image in the atlas
+
+    Args:
+        path (string): filepath of the image
+
+    Returns:
+        list: its entry in the index, None if it isnt packed or its file has changed since the atlas was built
+    """
+    global index
+    if index is None: # first image, read where everything is
+        index = read_index()
+    path = path.replace("\\", "/")
+    place = index.get(path)
+    if place is None or not is_current(path, place):
+        return None
+    return place
+
+def is_packed(path):
+    """checks if an image is in the atlas
+
+    Args:
+        path (string): filepath of the image
+
+    Returns:
+        bool: True if load_image gets it from a sheet
+    """
+    return find_image(path) is not None
+
+def load_image(path):
+    """loads an image from the atlas by its path, or from its own file if it isnt in the atlas
+
+    Args:
+        path (string): filepath of the image, like "menu icons/pause.png"
+
+    Returns:
+        pygame.Surface: the image, already converted for fast drawing. images from the atlas share pixels with their sheet so they must not be drawn on
+    """
+    place = find_image(path)
+    if place is None: # not packed or changed since, load it on its own (or from a level pack, for a levels custom image)
+        return packs.load_image(path).convert_alpha()
+    sheet_name, x, y, w, h = place[:5]
+    if sheet_name not in sheets: # first image from this sheet, load the whole sheet once
+        sheet = bundle.load_sheet(sheet_name) # already decoded in the asset bundle, if there is one
+        if sheet is None:
+            sheet = pygame.image.load(os.path.join(ATLAS_FOLDER, sheet_name)).convert_alpha()
+        sheets[sheet_name] = sheet
+    return sheets[sheet_name].subsurface((x, y, w, h))
+
+
+# your GLOBAL variables go here
+index = None # image path to where it is in the sheets, read the first time an image is loaded
+sheets = {} # sheet file name to the loaded sheet
+checked = {} # (image path, modification time) to if it is the same as in the atlas, for files touched since the atlas was built
+
+
+if __name__ == "__main__": # build the atlas from the command line
+    pygame.init()
+    built = build_atlas()
+    sheet_names = sorted({place[0] for place in built["images"].values()})
+    print(f"packed {len(built['images'])} images into {len(sheet_names)} sheets in {ATLAS_FOLDER}/: {', '.join(sheet_names)}")
@@ -0,0 +1,196 @@
+"""
+audio.py
+Author: Adiv Goldberg
+Date last edited: 2026-10-18
+Program: platformer audio manager
+Description:
+-------------
+This module plays the background music of the menus, levels and level editor, streamed from the file by pygame.mixer.music instead of decoding the whole track into a Sound. It provides:
+- Asking for a track every frame, it only starts it if it isnt already playing.
+- Fading the old track out and the new one in when the track changes (mixer.music streams one track at a time, so the fades are one after the other).
+- Pausing and resuming the track for the pause panel, it carries on from where it was.
+- Stopping straight away, for the level complete sound.
+- A voice manager for the sound effects (loaded as Sounds by assets.get_sound). Each kind of effect has its own reserved channels, so gameplay
+  effects can never take the channel of the level complete sound, a sound only plays a few times at once, and triggering it again
+  straight away is ignored, so the mixer isnt flooded when lots happens at once.
+- Checking if anything of a kind is playing, the music or a kind of effect, instead of the whole mixer.
+- Streaming the music of levels in level packs straight from the pack.
+"""
+# import the pygame module
+import pygame
+import packs
+
+MENU_MUSIC = "sound/music/Intro Theme.mp3" # played on every menu
+WORLD_MUSIC = "sound/music/Worldmap Theme.mp3" # played in levels without their own music
+FADE_MS = 400 # how long the old track takes to fade out, and the new one to fade in
+CHANNEL_POOLS = {"ui": 2, "effects": 6} # channels reserved for each kind of sound effect, the music streams on its own
+REPEAT_MS = 50 # a sound triggered again within this long of the last time isnt played again
+
+# your FUNCTIONS go here
+def can_play(path):
+    """checks if a music file can be streamed, without loading it
+
+    Args:
+        path (string): filepath of the track, or path into a level pack
+
+    Returns:
+        bool: True if it is a file that hasnt failed to play before
+    """
+    return isinstance(path, str) and path not in broken and packs.exists(path)
+
+def play_music(path):
+    """asks for a track to be playing, call it every frame the track should play. changing track fades between them
+
+    Args:
+        path (string): filepath of the track, None for no music
+    """
+    global wanted
+    wanted = path
+
+def stop_music(fade = True):
+    """stops the music
+
+    Args:
+        fade (bool, optional): fade it out, False to stop it straight away. Defaults to True.
+    """
+    global wanted, playing, volume
+    wanted = None
+    if not fade and playing is not None and pygame.mixer.get_init(): # stop now
+        pygame.mixer.music.stop()
+        playing = None
+        volume = 0.0
+        close_stream()
+
+def close_stream():
+    """closes the level pack file the last track streamed from, once it has stopped
+    """
+    global stream
+    if stream is not None:
+        pygame.mixer.music.unload() # let go of the file before closing it
+        stream.close()
+        stream = None
+
+def pause_music(pause):
+    """pauses or resumes the music, it carries on from where it was paused
+
+    Args:
+        pause (bool): True to pause, False to resume
+    """
+    global paused
+    if pause == paused or not pygame.mixer.get_init(): # nothing changes
+        return
+    paused = pause
+    if playing is not None:
+        if pause:
+            pygame.mixer.music.pause()
+        else:
+            pygame.mixer.music.unpause()
+
+def setup_channels():
+    """reserves the channels of each kind of sound effect, the first time an effect is played
+    """
+    total = sum(CHANNEL_POOLS.values())
+    if pygame.mixer.get_num_channels() < total: # make sure there are enough
+        pygame.mixer.set_num_channels(total)
+    pygame.mixer.set_reserved(total) # Sound.play never picks these, only the voice manager does
+    first = 0
+    for category, count in CHANNEL_POOLS.items(): # give each kind the next few channels
+        pools[category] = [pygame.mixer.Channel(i) for i in range(first, first + count)]
+        first += count
+
+def play_effect(sound, category = "effects", max_voices = 2):
+    """plays a sound effect on a channel of its kind, unless it is already playing too many times or was just played
+
+    Args:
+        sound (pygame.mixer.Sound): the effect
+        category (string, optional): kind of effect, a key of CHANNEL_POOLS. Defaults to "effects".
+        max_voices (int, optional): most times it can be playing at once. Defaults to 2.
+
+    Returns:
+        pygame.mixer.Channel: the channel it is playing on, None if it wasnt played
+    """
+    if sound is None or not pygame.mixer.get_init(): # nothing to play, or no sound
+        return None
+    if not pools: # first effect
+        setup_channels()
+    now = pygame.time.get_ticks()
+    if now - last_played.get(sound, now - REPEAT_MS) < REPEAT_MS: # triggered again straight away, the last one is still starting
+        return None
+    pool = pools[category]
+    if sum(1 for channel in pool if channel.get_sound() is sound) >= max_voices: # playing enough times already
+        return None
+    channel = next((channel for channel in pool if not channel.get_busy()), None) # a free channel
+    if channel is None: # all busy, cut off the one that started longest ago
+        channel = min(pool, key=lambda channel: started.get(channel, 0))
+    channel.play(sound)
+    started[channel] = now
+    last_played[sound] = now
+    return channel
+
+def is_playing(category, sound = None):
+    """checks if anything of a kind is playing
+
+    Args:
+        category (string): "music" or a kind of effect, a key of CHANNEL_POOLS
+        sound (pygame.mixer.Sound, optional): only check for this effect. Defaults to None (any).
+
+    Returns:
+        bool: True if it is playing
+    """
+    if not pygame.mixer.get_init():
+        return False
+    if category == "music":
+        return playing is not None and not paused and pygame.mixer.music.get_busy()
+    return any(channel.get_busy() and (sound is None or channel.get_sound() is sound) for channel in pools.get(category, []))
+
+def update():
+    """fades and switches tracks towards the one asked for, called once a frame by the main loop
+    """
+    global playing, volume, last_update, paused, stream
+    now = pygame.time.get_ticks()
+    step = (now - last_update) / FADE_MS # how much the volume can change since the last frame
+    last_update = now
+    if not pygame.mixer.get_init(): # no sound
+        return
+    if paused:
+        if wanted == playing: # stay paused
+            return
+        volume = 0.0 # a paused track is silent already, switch without fading
+        paused = False
+        pygame.mixer.music.unpause()
+    if wanted != playing: # changing track
+        if playing is not None and volume > 0: # fade the old one out first
+            volume = max(volume - step, 0.0)
+            pygame.mixer.music.set_volume(volume)
+            if volume > 0:
+                return
+        if playing is not None: # faded out
+            pygame.mixer.music.stop()
+            playing = None
+            close_stream()
+        if wanted is not None and can_play(wanted): # start the new one silently and fade it in
+            try:
+                stream = packs.load_music(wanted) # only opens the file, its decoded a bit at a time while it plays
+                pygame.mixer.music.set_volume(0.0)
+                pygame.mixer.music.play(-1)
+                playing = wanted
+                volume = 0.0
+            except (pygame.error, OSError, ValueError): # not a track mixer.music can play, dont try again
+                broken.add(wanted)
+                close_stream()
+    elif playing is not None and volume < 1: # fade in
+        volume = min(volume + step, 1.0)
+        pygame.mixer.music.set_volume(volume)
+
+
+# your GLOBAL variables go here
+wanted = None # track that should be playing
+playing = None # track that is loaded and playing
+volume = 0.0 # volume of the playing track, 0 to 1
+paused = False # if the music is paused
+last_update = 0 # ticks when update was last called, for the fades
+broken = set() # tracks that couldnt be played
+stream = None # open file in a level pack the track is streaming from, None for normal files
+pools = {} # kind of effect to its reserved channels, set up by the first effect played
+started = {} # channel to ticks when its effect started, the oldest is cut off when every channel is busy
+last_played = {} # sound to ticks when it was last played, to ignore repeats
@@ -0,0 +1,214 @@
+"""
+bundle.py
+Author: Adiv Goldberg
+Date last edited: 2026-10-18
+Program: platformer asset bundle
+Description:
+-------------
+This module puts every image and sound effect the game loads into one file of ready to use pixels and samples, so starting the game doesnt open, decode or scale any image or sound files. It provides:
+- An offline builder that loads every asset group like the game does and writes the scaled images, the atlas sheets and the decoded sound effects to assets.bundle, with an index at the start.
+- Pixels stored in the same format as the display, so images are made straight from the file with pygame.image.frombuffer and drawn without converting.
+- Memory mapping the bundle, so only the parts that are used are read from disk, when they are first drawn.
+- Falling back to the normal loading if there is no bundle, it was built for a different screen size or sound format, or an image or sound file has changed since it was built.
+- Building the bundle from the command line after changing any of the images or sounds: python bundle.py
+"""
+# import the pygame module
+import pygame
+import json
+import mmap
+import os
+import struct
+
+BUNDLE_FILE = "assets.bundle" # the bundle, next to the images it was made from
+BUNDLE_VERSION = 1 # version of the bundle format
+BUNDLE_HEADER = struct.Struct("<8sII") # magic, version, length of the JSON index after it
+BUNDLE_MAGIC = b"ADIVBNDL" # start of every bundle file
+ALIGN = 16 # every image and sound starts on a multiple of this many bytes
+ATLAS_FOLDER = "atlas" # where the atlas sheets are, the same as atlas.ATLAS_FOLDER
+
+# your FUNCTIONS go here
+def image_key(path, size):
+    """makes the index key of a scaled image
+
+    Args:
+        path (string): filepath of the image
+        size (tuple): size it was asked for, like assets.get_image gets it, None for its own size
+
+    Returns:
+        string: the key
+    """
+    return json.dumps([path.replace("\\", "/"), list(size) if size is not None else None])
+
+def get_mtime(path):
+    """gets when a file was last changed, to notice files changed since the bundle was built
+
+    Args:
+        path (string): filepath
+
+    Returns:
+        float: modification time, None if the file doesnt exist
+    """
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+def display_format():
+    """gets the byte order of the pixels of an image converted for the display
+
+    Returns:
+        string: "BGRA" or "RGBA" for pygame.image.tobytes, None if its neither
+    """
+    masks = pygame.Surface((1, 1), pygame.SRCALPHA).convert_alpha().get_masks()[:3] # red, green, blue
+    if masks == (0xff0000, 0xff00, 0xff): # little endian ARGB, nearly every display
+        return "BGRA"
+    if masks == (0xff, 0xff00, 0xff0000):
+        return "RGBA"
+    return None
+
+def build_bundle():
+    """loads every asset group like the game does and writes what they loaded to the bundle
+
+    Returns:
+        dict: the index that was written
+    """
+    global index
+    import assets, atlas # only imported here, they import this module
+    import gameplay, level_editor, main_menu, play_menu, level_editor_menu, about_menu, skin_shop # every screen, importing them declares every asset group
+    index = {} # load everything from the files, not an old bundle
+    for group in list(assets.groups): # load everything the game can load
+        assets.load(group)
+    pixel_format = display_format() or "BGRA"
+    blobs = [] # (kind, key, file it was made from, bytes, size) for everything that goes in the bundle
+    for (path, size, convert), entry in assets.image_cache.items(): # every scaled image
+        img = entry[0]
+        if convert == "alpha" and img.get_parent() is None: # parts of atlas sheets come from the sheets below
+            blobs.append(("images", image_key(path, size), path, pygame.image.tobytes(img, pixel_format), list(img.get_size())))
+    for name, sheet in atlas.sheets.items(): # the atlas sheets, for the skins and anything else loaded unscaled from the atlas
+        blobs.append(("sheets", name, os.path.join(atlas.ATLAS_FOLDER, name), pygame.image.tobytes(sheet, pixel_format), list(sheet.get_size())))
+    for path, sound in assets.sounds.items(): # the sound effects, decoded
+        blobs.append(("sounds", path.replace("\\", "/"), path, sound.get_raw(), []))
+    new_index = {"version": BUNDLE_VERSION, "screen": list(pygame.display.get_surface().get_size()), "pixel_format": pixel_format,
+                 "mixer": list(pygame.mixer.get_init() or ()), "images": {}, "sheets": {}, "sounds": {}}
+    offset = 0
+    for kind, key, source, data, size in blobs: # where each one goes, counted from the end of the index
+        offset += -offset % ALIGN
+        new_index[kind][key] = [offset, len(data), get_mtime(source)] + size
+        offset += len(data)
+    index_data = json.dumps(new_index, sort_keys=True).encode("utf-8")
+    start = BUNDLE_HEADER.size + len(index_data)
+    start += -start % ALIGN # the data starts aligned too
+    with open(BUNDLE_FILE + ".tmp", "wb") as filehandle: # write to a temporary file and then rename it, so a half written bundle is never read
+        filehandle.write(BUNDLE_HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, len(index_data)) + index_data)
+        filehandle.write(bytes(start - filehandle.tell()))
+        for kind, key, source, data, size in blobs:
+            filehandle.write(bytes(start + new_index[kind][key][0] - filehandle.tell())) # padding
+            filehandle.write(data)
+    os.replace(BUNDLE_FILE + ".tmp", BUNDLE_FILE)
+    index = None # open the new bundle next time something is loaded
+    return new_index
+
+def open_bundle():
+    """memory maps the bundle and reads its index, if it was built for this screen and sound format
+
+    Returns:
+        dict: the index, empty if there is no usable bundle
+    """
+    global view, data_start
+    try:
+        with open(BUNDLE_FILE, "rb") as filehandle:
+            magic, version, index_length = BUNDLE_HEADER.unpack(filehandle.read(BUNDLE_HEADER.size))
+            if magic != BUNDLE_MAGIC or version != BUNDLE_VERSION: # not a bundle, or made by a different version
+                return {}
+            bundle_index = json.loads(filehandle.read(index_length))
+            mapped = mmap.mmap(filehandle.fileno(), 0, access=mmap.ACCESS_COPY) # the map stays open after the file is closed
+    except (OSError, ValueError, struct.error): # no bundle, load everything from its own file
+        return {}
+    if bundle_index.get("screen") != list(pygame.display.get_surface().get_size()): # scaled for a different screen
+        return {}
+    if bundle_index.get("pixel_format") != display_format(): # the images would all need converting, the files are just as fast
+        return {}
+    if bundle_index.get("mixer") != list(pygame.mixer.get_init() or ()): # samples are in a different format, dont use the sounds
+        bundle_index["sounds"] = {}
+    view = memoryview(mapped)
+    data_start = BUNDLE_HEADER.size + index_length
+    data_start += -data_start % ALIGN
+    return bundle_index
+
+def get_part(kind, key, source):
+    """finds something in the bundle
+
+    Args:
+        kind (string): "images", "sheets" or "sounds"
+        key (string): its key in the index
+        source (string): filepath it was made from, if it has changed since the bundle was built it isnt used
+
+    Returns:
+        tuple: a view of its bytes in the mapped file and the rest of its index entry, None if it isnt in the bundle
+    """
+    global index
+    if index is None: # first thing loaded, open the bundle
+        index = open_bundle()
+    place = index.get(kind, {}).get(key)
+    if place is None or place[2] != get_mtime(source): # not bundled, or changed since (a stat, the file isnt read)
+        return None
+    offset, length = place[0], place[1]
+    return view[data_start + offset:data_start + offset + length], place[3:]
+
+def load_image(path, size):
+    """makes a scaled image straight from the bundle, without decoding or scaling anything
+
+    Args:
+        path (string): filepath of the image
+        size (tuple): size it is asked for, like assets.get_image gets it, None for its own size
+
+    Returns:
+        pygame.Surface: the image, already in the displays format. it shares its pixels with the bundle so it must not be drawn on. None if it isnt in the bundle
+    """
+    part = get_part("images", image_key(path, size), path)
+    if part is None:
+        return None
+    pixels, (width, height) = part
+    return pygame.image.frombuffer(pixels, (width, height), index["pixel_format"])
+
+def load_sheet(name):
+    """makes an atlas sheet straight from the bundle
+
+    Args:
+        name (string): file name of the sheet, like "tiles 1.png"
+
+    Returns:
+        pygame.Surface: the sheet, None if it isnt in the bundle
+    """
+    part = get_part("sheets", name, os.path.join(ATLAS_FOLDER, name))
+    if part is None:
+        return None
+    pixels, (width, height) = part
+    return pygame.image.frombuffer(pixels, (width, height), index["pixel_format"])
+
+def load_sound(path):
+    """makes a sound effect from the decoded samples in the bundle
+
+    Args:
+        path (string): filepath of the sound
+
+    Returns:
+        pygame.mixer.Sound: the sound, None if it isnt in the bundle
+    """
+    part = get_part("sounds", path.replace("\\", "/"), path)
+    if part is None:
+        return None
+    samples, _ = part
+    return pygame.mixer.Sound(buffer=samples)
+
+
+# your GLOBAL variables go here
+index = None # what is in the bundle and where, read the first time anything is loaded
+view = None # the mapped bundle file
+data_start = 0 # where the images and sounds start in the file
+
+
+if __name__ == "__main__": # build the bundle from the command line
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy") # the sounds decode the same without a sound card
+    built = build_bundle()
+    print(f"bundled {len(built['images'])} images, {len(built['sheets'])} atlas sheets and {len(built['sounds'])} sounds into {BUNDLE_FILE} ({os.path.getsize(BUNDLE_FILE) // 1024} KB)")
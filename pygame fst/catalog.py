@@ -0,0 +1,188 @@
+"""
+catalog.py
+Author: Adiv Goldberg
+Date last edited: 2026-10-18
+Program: platformer level catalog
+Description:
+-------------
+This module keeps an index of every level in the level folders, so the menus know which levels there are and what is in them without opening the level files. It provides:
+- Scanning the level folders for .adiv files and recording for each one its size, modification time, a hash of its contents, its size in tiles,
+  where the player spawns, how many finish, checkpoint, death, key and powerup tiles it has, and its custom image and music.
+- Saving the index to levels.catalog, so later starts only read the levels that changed since (found from their size and modification time),
+  and levels that were only touched (same hash) arent parsed again.
+- Looking up levels in the index, and the numbered levels of the play menu in order. The level files are only opened when a level is played.
+"""
+import json
+import os
+import hashlib
+import level_format
+
+CATALOG_FILE = "levels.catalog" # the saved index
+CATALOG_VERSION = 1 # version of the index, an index from a different version is made again
+LEVEL_FOLDERS = (".",) # folders searched for levels, not their sub folders (the game folder also has the image folders)
+SPECIAL_TILES = {"finishes": (14,), "checkpoints": (12,), "deaths": (11, 15), "key_walls": (16, 17)} # block types counted for each level
+
+# your FUNCTIONS go here
+def level_info(raw, digest, stat):
+    """reads what the catalog records about a level from its file
+
+    Args:
+        raw (bytes): the whole .adiv file
+        digest (string): hash of the file
+        stat (os.stat_result): the files size and modification time
+
+    Returns:
+        dict: the catalog entry, with "error" set instead of the level info if it isnt a level
+    """
+    entry = {"size": stat.st_size, "mtime": stat.st_mtime, "hash": digest}
+    try:
+        data = level_format.parse_level(raw) # binary or JSON
+        blocks, powerups = data["blocks"], data["powerups"]
+        entry["columns"], entry["rows"] = len(blocks[0]), len(blocks)
+        cells = [value for row in blocks for value in row]
+        spawn = next((i for i, value in enumerate(cells) if value == 13), None) # first spawn block, the same one gameplay uses
+        entry["spawn"] = None if spawn is None else [spawn % entry["columns"], spawn // entry["columns"]] # column and row
+        for name, types in SPECIAL_TILES.items():
+            entry[name] = sum(cells.count(block_type) for block_type in types)
+        entry["powerups"] = sum(1 for row in powerups for value in row if value != 0)
+        entry["image"], entry["music"] = data.get("image"), data.get("music")
+    except (ValueError, KeyError, IndexError, TypeError) as error: # not a level, recorded so it isnt read again until it changes
+        entry["error"] = str(error)
+    return entry
+
+def hash_file(level_path):
+    """reads a level file and hashes it
+
+    Args:
+        level_path (string): filepath of the .adiv file
+
+    Returns:
+        tuple: the whole file and its hash
+    """
+    with open(level_path, "rb") as filehandle:
+        raw = filehandle.read()
+    return raw, hashlib.sha1(raw).hexdigest()
+
+def read_catalog():
+    """reads the saved index
+
+    Returns:
+        dict: level path to its entry, empty if there is no index or it is from a different version
+    """
+    try:
+        with open(CATALOG_FILE) as filehandle:
+            saved = json.load(filehandle)
+    except (OSError, ValueError): # no index yet, every level is read once
+        return {}
+    if not isinstance(saved, dict) or saved.get("version") != CATALOG_VERSION:
+        return {}
+    return saved.get("levels", {})
+
+def write_catalog():
+    """saves the index, to a temporary file first so a crash never leaves half an index
+    """
+    try:
+        with open(CATALOG_FILE + ".tmp", "w") as filehandle:
+            json.dump({"version": CATALOG_VERSION, "levels": levels}, filehandle, sort_keys=True)
+        os.replace(CATALOG_FILE + ".tmp", CATALOG_FILE)
+    except OSError: # cant save (e.g. read only folder), the levels are read again next time
+        pass
+
+def find_level_files():
+    """finds every .adiv file in the level folders
+
+    Returns:
+        list: filepaths of the levels, like "level 1.adiv" for the game folder
+    """
+    found = []
+    for folder in LEVEL_FOLDERS:
+        try:
+            entries = list(os.scandir(folder))
+        except OSError: # folder doesnt exist
+            continue
+        for entry in entries:
+            if entry.name.lower().endswith(".adiv") and entry.is_file():
+                found.append(entry.name if folder == "." else os.path.join(folder, entry.name)) # the same paths the stats use
+    return found
+
+def update_catalog():
+    """brings the index up to date with the level folders, only reading levels whose size or modification time changed, and saves it if anything changed
+
+    Returns:
+        dict: level path to its entry
+    """
+    global levels
+    if levels is None: # first update, start from the saved index
+        levels = read_catalog()
+    changed = False
+    found = find_level_files()
+    for level_path in found:
+        entry = levels.get(level_path)
+        try:
+            stat = os.stat(level_path)
+            if entry is not None and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime: # unchanged, only a stat
+                continue
+            raw, digest = hash_file(level_path)
+        except OSError: # deleted while scanning
+            continue
+        if entry is not None and entry["hash"] == digest: # only touched, the same level
+            entry["size"], entry["mtime"] = stat.st_size, stat.st_mtime
+        else:
+            levels[level_path] = level_info(raw, digest, stat)
+        changed = True
+    for level_path in set(levels) - set(found): # deleted levels
+        del levels[level_path]
+        changed = True
+    if changed:
+        write_catalog()
+    return levels
+
+def get_level(level_path):
+    """gets what the catalog knows about a level
+
+    Args:
+        level_path (string): filepath of the .adiv file
+
+    Returns:
+        dict: its entry, None if it isnt in the catalog or isnt a level
+    """
+    if levels is None:
+        update_catalog()
+    entry = levels.get(level_path)
+    if entry is None or "error" in entry:
+        return None
+    return entry
+
+def level_number(level_path):
+    """gets the number of a play menu level from its name
+
+    Args:
+        level_path (string): filepath like "level 3.adiv"
+
+    Returns:
+        int: the number, None if it isnt a numbered level
+    """
+    name = os.path.splitext(os.path.basename(level_path))[0]
+    if not name.startswith("level ") or not name[6:].isdigit():
+        return None
+    return int(name[6:])
+
+def numbered_levels():
+    """gets the numbered levels of the play menu that exist and can be read, in order
+
+    Returns:
+        list: filepaths like "level 1.adiv", lowest number first
+    """
+    if levels is None:
+        update_catalog()
+    numbered = [level_path for level_path, entry in levels.items() if "error" not in entry and os.path.dirname(level_path) == "" and level_number(level_path) is not None]
+    return sorted(numbered, key=level_number)
+
+
+# your GLOBAL variables go here
+levels = None # level path to its entry, read from the index the first time it is needed
+
+
+if __name__ == "__main__": # print the catalog
+    for level_path, entry in sorted(update_catalog().items()):
+        print(level_path, entry)
@@ -8,23 +8,33 @@ Description:
 This module implements a basic 2D platformer physics engine using Pygame. It provides classes and functions for player movement, collision detection, and level/block management. The main features include:
 - Player class with gravity, jumping, friction, air resistance, and collision handling.
 - Blocks class for representing different types of level tiles (full blocks, platforms, walls, etc.).
+- Player sprites that are rotated, flipped and scaled once per skin, so drawing the player is only a lookup.
+- Tile_Layer class that pre-renders the tiles of a level in chunks so each frame only blits the few surfaces in view.
+- Levels of any size, with a camera that follows the player and collisions that only look at blocks near the player.
+- Loading the images, sounds and player the first time a level is loaded, not when the module is imported.
+- Using a level already read on loaders background thread, so only converting its image for the display is left to do.
 - Utility functions for level-to-block conversion, sign determination, and more.
+- Recording of the inputs used by each physics tick, saved as run files that replay.py can play back.
 - A sample level layout and a main game loop for demonstration.
 """
 # import the pygame module
-import pygame, random, math
+import pygame, random, math, os
 import tools
+import assets
+import loader
+import packs
+import audio
+import replay
 
 # will make it easier to use pygame functions
 from pygame.draw import line, circle, rect
 from random import randint
-import json
 
 # initializes the pygame module
 pygame.init()
 
-# creates a screen variable of size 800 x 600
-screen = pygame.display.set_mode([tools.SCREEN_X,tools.SCREEN_Y])
+# the 800 x 600 screen made in tools, shown scaled to the window
+screen = tools.screen
 
 # controls the main game while loop
 done = False
@@ -44,6 +54,8 @@ class Player:
         """
         self.x = 0
         self.y = 0
+        self.prev_x = 0 # position before the last physics tick, for drawing between ticks
+        self.prev_y = 0
         self.length = 0
         self.vx = 0
         self.vy = 0
@@ -64,106 +76,115 @@ class Player:
         self.total_coins = tools.coins
         self.user_power_ups = [self.total_coins,0,0,0,0]
         self.touching_wall_side = False
-        # Make deep copies of images so base_img is never modified
-        if p_type == 1:
-            self.base_img = img.copy()  # single surface
-            self.img = self.base_img.copy()
-        else:
-            self.base_img = [im.copy() for im in img]  # list of surfaces
-            self.img = [im.copy() for im in self.base_img]
+        self.touching_triggers = set() # special blocks the player is inside, so each only fires once when entered
+        self.path_triggers = [] # special blocks touched while moving this tick, in the order they were touched
+        self.drawn_rect = None # where the player was last drawn on the screen
+        self.sprites = get_player_sprites(img, p_type, PLAYER_LENGTH) # every rotation or flipped frame of the skin, made once per skin
+        self.img = self.sprites[0] if p_type == 1 else self.sprites[False][0] # image drawn this frame
         self.angle = 0  # For continuous rotation
+        self.facing_right = False # runner frames are flipped when it last moved right
         self.p_type = p_type #1 for cube 2 for runner
         self.animate_time = 0 #time animation has been going on for
         self.MAX_animate_time = 25 #reset after animation after
                 
-    def make_new(self):
+    def make_new(self, new_attempt = True):
         """
         adjusts the variables to reset a level back to its original state for the player.
+
+        Args:
+            new_attempt (bool, optional): True when the level is loaded or restarted, the whole physics state goes back to how a new player starts
+                                          so a recorded run replays the same on a new player. False when respawning after dying, the player keeps
+                                          its air time and animation. Defaults to True.
         """
         global pause_panel_open
-        spawn_block = None
-        check_next = True
-        for b in blocks:
-            if b.type == 12 and b.collected:
-                spawn_block = b
-                check_next = False
-                break
-            elif b.type == 13 and check_next:
-                spawn_block = b
-                self.time = 0
-                break
-        if spawn_block:
+        if active_checkpoint is not None: # respawn at the last checkpoint, the time keeps going
+            self.x = active_checkpoint.x
+            self.y = active_checkpoint.y
+        elif spawn_block is not None: # respawn at the start
             self.x = spawn_block.x
             self.y = spawn_block.y
-        self.length = 35
+            self.time = 0
+        self.prev_x, self.prev_y = self.x, self.y # dont draw the player sliding to the spawn
+        self.length = PLAYER_LENGTH
         self.vx = 0
         self.vy = 0
-        if self.p_type == 1:
-            # Scale base_img and img to new size
-            self.base_img = pygame.transform.scale(self.base_img, (self.length, self.length))
-            self.img = self.base_img.copy()
-        else:
-            # Scale all frames in base_img, then copy to img
-            self.base_img = [pygame.transform.scale(self.base_img[i], (self.length, self.length)) for i in range(len(self.base_img))]
-            self.img = [im.copy() for im in self.base_img]
+        self.touching_triggers = set() # its somewhere else now
+        self.path_triggers = []
+        if new_attempt: # the rest of the physics state goes back to how a new player starts
+            self.air_time = 0
+            self.direction = 0
+            self.colliding = False
+            self.touching_wall_side = False
+            self.animate_time = 0
+            self.facing_right = False
         self.angle = 0
+        if self.p_type == 1: # back to the unrotated image, the sprites are already scaled to the player's length
+            self.img = self.sprites[0]
         self.user_power_ups = [tools.coins,0,0,0,0]
         pause_panel_open = False
         
     def go(self):
         """
-        Updates the player's state and handles movement and collisions.
+        Draws the player, then updates the player's state and handles movement and collisions.
         """
         self.draw()
+        self.update()
+
+    def update(self):
+        """
+        Runs one physics tick for the player, handles movement, collisions and animation timing.
+        """
+        self.prev_x, self.prev_y = self.x, self.y # remember where the player was for drawing between ticks
         self.air_time += 1
-        self.colliding = self.collision_with_blocks(blocks)
+        self.colliding = self.collision_with_blocks()
         self.collison_with_power_ups()
         self.rotate()
         self.move()
+        self.check_triggers()
+        if self.p_type == 2 and self.air_time < 3 and self.direction != 0: # runner is running, move along the run animation
+            self.animate_time += 1
+            self.animate_time %= self.MAX_animate_time
         self.time += 1
 
-    def draw(self):
+    def draw(self, alpha=1):
         """
         Draws the player on the screen.
+
+        Args:
+            alpha (float, optional): how far between the last two physics ticks to draw the player, from 0 to 1. Defaults to 1 (current position).
         """
+        # position between the last two ticks so movement looks smooth at any frame rate, moved by the camera
+        x = self.prev_x + (self.x - self.prev_x) * alpha - camera_x
+        y = self.prev_y + (self.y - self.prev_y) * alpha - camera_y
         # Center the rotated image on the player
         if self.p_type == 1:
             img = self.img
-            rect_img = img.get_rect(center=(self.x + self.length // 2, self.y + self.length // 2))
+            rect_img = img.get_rect(center=(x + self.length // 2, y + self.length // 2))
             screen.blit(img, rect_img.topleft)
+            drawn_rect = rect_img
         else:
+            drawn_rect = pygame.Rect(x, y, self.length, self.length) # all runner images are scaled to its length
             if int(self.direction) == 1:
-                self.img[0] = pygame.transform.flip(self.base_img[0], True, False)
+                self.facing_right = True
             elif int(self.direction) == -1:
-                self.img[0] = self.base_img[0]
-            
+                self.facing_right = False
+            frames = self.sprites[self.facing_right] # frames facing the way the runner last moved
+
             if self.air_time < 3:
                 if self.direction == 0:
-                    screen.blit(self.img[0], (self.x, self.y))
+                    img_index = 0 # standing image
                 else:
-                    self.animate_time += 1
-                    self.animate_time %= self.MAX_animate_time
-                    img_index = int(self.animate_time / (self.MAX_animate_time / 3)) % 3
-                    if self.direction == 1:
-                        self.img[img_index + 3] = pygame.transform.flip(self.base_img[img_index + 3], True, False)
-                    elif self.direction == -1:
-                        self.img[img_index + 3] = self.base_img[img_index + 3]
-                    screen.blit(self.img[img_index + 3], (self.x, self.y))
+                    img_index = int(self.animate_time / (self.MAX_animate_time / 3)) % 3 + 3 # run images are 3 to 5
+            elif self.vy < 0:
+                img_index = 2 # index 2 is the jumping image
             else:
-                if self.vy < 0:
-                    # index 2 is the jumping image
-                    if self.direction == 1:
-                        self.img[2] = pygame.transform.flip(self.base_img[2], True, False)
-                    elif self.direction == -1:
-                        self.img[2] =self.base_img[2]
-                    screen.blit(self.img[2], (self.x, self.y))
-                else:
-                    # index 1 is the falling image
-                    if self.direction == 1:
-                        self.img[1] = pygame.transform.flip(self.base_img[1], True, False)
-                    elif self.direction == -1:
-                        self.img[1] =self.base_img[1]
-                    screen.blit(self.img[1], (self.x, self.y))
+                img_index = 1 # index 1 is the falling image
+            screen.blit(frames[img_index], (x, y))
+        drawn_rect.inflate_ip(2, 2) # a pixel bigger on each side in case the position was rounded
+        if self.drawn_rect is not None: # where it was last frame needs to be updated too
+            tools.mark_dirty(self.drawn_rect)
+        tools.mark_dirty(drawn_rect)
+        self.drawn_rect = drawn_rect
                             
     def rotate(self):
         """
@@ -171,11 +192,11 @@ class Player:
         """
         if self.p_type == 1:
             if self.air_time > 2:
-                self.angle += 5 * -self.direction
-                self.img = pygame.transform.rotate(self.base_img, self.angle)
+                self.angle += ROTATION_STEP * -self.direction
+                self.img = self.sprites[self.angle % 360] # look up the rotated image instead of rotating every tick
             elif self.angle % 90 != 0:
                 self.angle = round(self.angle / 90) * 90
-                self.img = pygame.transform.rotate(self.base_img, self.angle)
+                self.img = self.sprites[self.angle % 360]
 
     def get_velo(self):
         """
@@ -192,19 +213,19 @@ class Player:
         if self.just_jumped:
             if self.air_time < 3:
                 self.vy = -self.jump_force
-                jump_se.play()
+                audio.play_effect(jump_se)
             elif self.user_power_ups[2] > 0 and self.touching_wall_side:
                 self.vy = -self.jump_force
                 self.user_power_ups[2] -= 1
-                use_powerup_se.play()
+                audio.play_effect(use_powerup_se)
             elif self.user_power_ups[1] > 0:
                 self.vy = -self.jump_force
                 self.user_power_ups[1] -= 1
-                use_powerup_se.play()
+                audio.play_effect(use_powerup_se)
             if self.user_power_ups[3] > 0:
                 self.vy = -self.jump_force*1.5
                 self.user_power_ups[3] -= 1
-                use_powerup_se.play()
+                audio.play_effect(use_powerup_se)
         
         if self.R_pressed:
             self.vx += self.u_accel
@@ -226,131 +247,263 @@ class Player:
         
     def move(self):
         """
-        Moves the object based on its current velocity, handling pixel-perfect movement and collision detection.
-        The method first updates the object's velocity using `get_velo()`. It then performs movement in small steps
-        (equal to the maximum of the absolute values of the velocity components) to ensure precise collision detection.
-        For each step:
-            - Moves the object along the x-axis and checks for collisions with level blocks.
-                - If a collision is detected, reverts the x movement and sets horizontal velocity to zero.
-            - Moves the object along the y-axis and checks for collisions with level blocks.
-                - If a collision is detected:
+        Moves the object based on its current velocity, using swept collision detection.
+        The method first updates the object's velocity using `get_velo()`. It then uses `sweep()` to find the time of impact
+        with the nearest block along the whole movement, so the cost does not grow with speed:
+            - Moves the object up to the time of impact, touching the block it hit.
+                - If the block was hit from the side, sets horizontal velocity to zero.
+                - If the block was hit from above or below:
                     - If moving downward, resets air time.
-                    - Reverts the y movement and sets vertical velocity to zero.
-            extra check at the end in case in gets stuck which may happen in a a phase block
+                    - Sets vertical velocity to zero.
+            - Moves the rest of the way along the axis that was not blocked, checking again.
+            - Records the special blocks touched along the way and the ones pushed against when blocked, for check_triggers.
+            extra check at the end in case in gets stuck which may happen in a a phase block, special blocks are handled after by check_triggers
         """
+        global unlock_se
         self.get_velo()
-        #pixel pixel movement for more precise collisons
+        #swept movement, finds where the player hits a block instead of moving pixel by pixel
         
-        steps = int(max(abs(self.vx), abs(self.vy)))
-        for _ in range(steps):
-            self.x += self.vx / steps
-            self.colliding = self.collision_with_blocks(blocks)
-            if self.colliding or self.x < 0 or self.x + self.length > tools.SCREEN_X:
-                self.x -= self.vx / steps
+        move_x, move_y = self.vx, self.vy # distance left to move this frame
+        steps = max(int(max(abs(self.vx), abs(self.vy))), 1)
+        press = (abs(self.vx) / steps, abs(self.vy) / steps) # how far a blocked player pushes into a block, the size of one pixel step
+        self.path_triggers = self.touched_triggers(0, 0) # special blocks the player starts inside
+        for _ in range(4): # each hit stops an axis or opens a key wall, so it only takes a few passes
+            time, blocked, block = self.sweep(move_x, move_y)
+            if block is not None and block.type == 16 and self.user_power_ups[4] > 0: #key wall and the user has a key
+                block.type = 17 #set the block to an empty key block
+                block.get_rect() # its a platform now, change its collision rect straight away
+                self.user_power_ups[4] -= 1 #take away the key
+                audio.play_effect(unlock_se) #play unlock sound
+                continue # sweep again now that it no longer blocks the player
+            # move up to the point of impact, snapping to the block on the axes that were hit
+            new_x = blocked.get(0, self.x + move_x * time)
+            new_y = blocked.get(1, self.y + move_y * time)
+            self.path_triggers += self.touched_triggers(new_x - self.x, new_y - self.y) # special blocks passed through on the way
+            self.x, self.y = new_x, new_y
+            for axis, d in ((0, move_x), (1, move_y)): # pushing against the block, touches special blocks right next to it
+                if axis in blocked and d != 0:
+                    self.path_triggers += self.touched_triggers(sign(d) * press[0] if axis == 0 else 0, sign(d) * press[1] if axis == 1 else 0)
+            move_x *= 1 - time # distance left after the impact
+            move_y *= 1 - time
+            if 0 in blocked: # hit from the side
                 self.vx = 0
-            self.y += self.vy / steps
-            self.colliding = self.collision_with_blocks(blocks)
-            if self.colliding or self.y < 0 or self.y + self.length > tools.SCREEN_Y:
+                move_x = 0
+            if 1 in blocked: # hit from above or below
                 if self.vy > 0:
                     self.air_time = 0
-                self.y -= self.vy / steps
                 self.vy = 0
+                move_y = 0
+            if not blocked: # went the whole way without hitting anything
+                break
                 
         #extra check to prevent player from getting stuck
-        self.colliding = self.collision_with_blocks(blocks)
+        self.colliding = self.collision_with_blocks()
         while self.colliding:
             self.y -= 0.1
-            self.colliding = self.collision_with_blocks(blocks)
+            self.colliding = self.collision_with_blocks()
                 
-        
-    def collision_with_blocks(self, level_blocks):
+    def sweep(self, dx, dy):
         """
-        Checks for collision between the player and various types of level blocks.
+        Finds when the player first hits a solid block or the edge of the level while moving (swept AABB).
 
         Args:
-            level_blocks (list): A list of block objects in the level. Each block must have attributes:
-                - x (int): The x-coordinate of the block.
-                - y (int): The y-coordinate of the block.
-                - type (int): The type of the block (1-6).
+            dx (float): how far the player wants to move along x, negative for left.
+            dy (float): how far the player wants to move along y, negative for up.
+
+        Returns:
+            tuple: time of impact from 0 to 1 (1 if nothing is hit), a dictionary mapping each axis that was hit (0 for x, 1 for y)
+                   to the position that touches the block, and the key block that was hit (None for any other block or the level edge)
+        """
+        if dx == 0 and dy == 0: # not moving so nothing can be hit
+            return 1, {}, None
+        if self.p_type == 1: # body box, same as the rect in collision_with_blocks
+            body_offset = 0
+            body_width = self.length
+        else:
+            body_offset = 3
+            body_width = self.length - 5
+        body = (self.x + body_offset, self.y, self.x + body_offset + body_width, self.y + self.length) # left, top, right, bottom
+        feet = (self.x, self.y + self.length - 2, self.x + self.length, self.y + self.length) # feet only box for platforms
+
+        # area covered by the player while it moves, only blocks in here can be hit
+        area = pygame.Rect(self.x, self.y, self.length, self.length)
+        area.union_ip(area.move(dx, dy))
+        area.inflate_ip(4, 4)
+
+        best_time, best_blocked, best_block = 1, {}, None
+        best_is_corner = False # if the best hit only touched a corner, a flat hit at the same time should win
+
+        # the edges of the level stop the player like a wall
+        for axis, pos, d, level_size in ((0, self.x, dx, level_width), (1, self.y, dy, level_height)):
+            if d > 0 and pos + self.length + d > level_size:
+                contact = max(pos, level_size - self.length)
+            elif d < 0 and pos + d < 0:
+                contact = min(pos, 0)
+            else:
+                continue
+            time = (contact - pos) / d
+            if time < best_time:
+                best_time, best_blocked, best_block = time, {axis: contact}, None
+
+        # only the colliders the player could reach can be hit, each is (rect, player box to test with, key block or None)
+        colliders = [(brect, body, None) for brect in get_nearby_rects(solid_index, area, COLLISION_BUCKET) if area.colliderect(brect)] # merged solid blocks
+        if dy > 0: # phase platforms, only solid when moving down
+            colliders += [(brect, feet, None) for brect in get_nearby_rects(platform_index, area, COLLISION_BUCKET) if area.colliderect(brect)]
+        for block in get_nearby_blocks(key_index, area, GRID_SIZE): # key walls, solid until opened and then a platform
+            if block.type == 16:
+                colliders.append((pygame.Rect(block.rect), body, block))
+            elif dy > 0:
+                colliders.append((pygame.Rect(block.rect), feet, block))
+
+        for brect, player_box, block in colliders: #iterate through each collider the player could reach
+            x_times = entry_exit_times(player_box[0], player_box[2], brect.left, brect.right, dx)
+            y_times = entry_exit_times(player_box[1], player_box[3], brect.top, brect.bottom, dy)
+            if x_times is None or y_times is None: # never lines up with the block
+                continue
+            entry = max(x_times[0], y_times[0])
+            leave = min(x_times[1], y_times[1])
+            if entry >= leave or entry >= 1 or leave <= 0: # does not touch the block this frame
+                continue
+            is_corner = x_times[0] == y_times[0] # reaches the side and the top at the same time
+            if entry < 0: # already overlapping, cant move at all
+                time = 0
+                blocked = {0: self.x, 1: self.y}
+            elif x_times[0] > y_times[0]: # lined up on y first, so it hit the side of the block
+                if player_box is feet: # platforms can only be landed on
+                    continue
+                time = entry
+                if dx > 0:
+                    blocked = {0: brect.left - body_width - body_offset}
+                else:
+                    blocked = {0: brect.right - body_offset}
+            else: # lined up on x first (or hit the corner), so it hit the top or bottom of the block
+                time = entry
+                if dy > 0:
+                    blocked = {1: brect.top - self.length}
+                else:
+                    blocked = {1: brect.bottom}
+            # keep the first hit, only one is handled at a time and move() sweeps again for the rest
+            if time < best_time or (time == best_time and best_is_corner and not is_corner):
+                best_time, best_blocked, best_block, best_is_corner = time, blocked, block, is_corner
+        return best_time, best_blocked, best_block
+
+    def touched_triggers(self, dx, dy):
+        """
+        Finds the special blocks the player's body overlaps while moving, from where it is now.
+
+        Args:
+            dx (float): how far the player moves along x, negative for left.
+            dy (float): how far the player moves along y, negative for up.
+
+        Returns:
+            list: the special blocks, in the order they are entered
+        """
+        if self.p_type == 1: # body box, same as the rect in check_triggers
+            body = (self.x, self.y, self.x + self.length, self.y + self.length)
+        else:
+            body = (self.x + 3, self.y, self.x + self.length - 2, self.y + self.length)
+        area = pygame.Rect(self.x, self.y, self.length, self.length)
+        area.union_ip(area.move(dx, dy))
+        area.inflate_ip(2, 2) # the area is rounded to whole pixels
+        touched = []
+        for block in get_nearby_blocks(trigger_index, area, GRID_SIZE):
+            brect = pygame.Rect(block.rect)
+            x_times = entry_exit_times(body[0], body[2], brect.left, brect.right, dx)
+            y_times = entry_exit_times(body[1], body[3], brect.top, brect.bottom, dy)
+            if x_times is None or y_times is None: # never lines up with the block
+                continue
+            entry = max(x_times[0], y_times[0])
+            if entry < min(x_times[1], y_times[1]) and entry < 1 and min(x_times[1], y_times[1]) > 0: # inside it at some point of the move
+                touched.append((entry, block))
+        return [block for _, block in sorted(touched, key=lambda hit: hit[0])]
+
+    def collision_with_blocks(self):
+        """
+        Checks for collision between the player and the solid parts of the level, this only looks at geometry and never changes the level.
 
         Returns:
             bool: True if a collision is detected with any block, False otherwise.
 
         Notes:
-            - Uses pygame.Rect for collision detection.
-            - also handles special cases for different block types such as finishing the level if colliding with a finish block
+            - Uses pygame.Rect for collision detection, solid blocks and platforms are checked against the merged rects from make_colliders near the player, found with get_nearby_rects.
+            - also sets touching_wall_side, for wall jumps
+            - special blocks such as death and finish blocks are handled by check_triggers
         """
-        global  level_complete_se, game_over_se, jump_se, checkpoint_se, unlock_se, pause_panel_open, current_level, pause_panel_text
         colliding = False #assumes its not colliding
-        self.touching_wall_side = False #assumes it is not touching wall
-        for block in level_blocks: #iterate through each block in the level
-            # Determine player rect based on block type
-            if (block.type == 2 or block.type == 17) and self.vy >= 0:
-            # Platform: only check feet to avoid getting stuck
-                player_rect = pygame.Rect(self.x, self.y + self.length - 2, self.length, 2)
-                block_rects = [pygame.Rect(block.rect)]
-            else:
-            # All other blocks: full player rect
-                if self.p_type == 1:
-                    player_rect = pygame.Rect(self.x, self.y, self.length, self.length)
-                else:
-                    player_rect = pygame.Rect(self.x + 3, self.y, self.length - 5, self.length)
-                block_rects = []
-                if block.rect != (0,0,0,0):
-                    block_rects.append(pygame.Rect(block.rect))
-                if block.rect2 != (0,0,0,0):
-                    block_rects.append(pygame.Rect(block.rect2))
-                                    
-            for brect in block_rects: #iterate through the collision rectangles of each block (some may have have 2 checks such as corner blocks)
-                if pygame.Rect(self.x - 5, self.y - 5, self.length + 10, self.length + 10).colliderect(brect): # bigger hitbox for checking if its touching wall 
-                    self.touching_wall_side = True
-                elif not self.touching_wall_side:
-                    self.touching_wall_side = False
-
-                if player_rect.colliderect(brect): #check normal collision for phyisics
-                    if block.type in (1,3,4,5,6,7,8,9,10,16): #all blocks that are not listed below, normal phisics behaviour
-                        if block.type == 16: #key wall
-                            if self.user_power_ups[4] > 0: #if the user has a key
-                                block.type = 17 #set the block to an empty key block
-                                self.user_power_ups[4] -= 1 #take away the key
-                                unlock_se.play() #play unlock sound
-                        colliding = True
-                    elif block.type == 2 or block.type == 17: #phase platform
-                        if self.vy > 0: #only colliding if moving down
-                            colliding = True
-                    elif block.type == 11 or block.type == 15: #death block
-                        self.make_new() #reset the player
-                        game_over_se.play() # play game over sound
-                        pause_panel_open = True # open the pause panel
-                        Hud_buttons[2].enabled = True #enable pause button in that pannel
-                        pause_panel_text = "You Died" #set text on pause panel
-                        for power_up in power_ups: #reset each powerup
-                            power_up.reset()
-                        for block in blocks: #reset each block
-                            block.reset()
-                    elif block.type == 12: #checkpoint
-                        for check_block in blocks: #check if there are any other checkpoints by iterating through blocks
-                            if check_block.type == 12: # if its a checkpoint
-                                block.collected = False #make it not active
-                        if not checkpoint_se.get_num_channels(): #if checkpoint sound is not playing
-                            checkpoint_se.play() #play it
-                        block.collected = True #set current checkpoint to active checkpoint
-                    elif block.type == 14: #finish block
-                        tools.write_stats(self.user_power_ups[0], (current_level, round(self.time / 60, 1)), None) #wrtie to stats that you you finished the level and its time
-                        if background_sound is not None: #if there is a background sound
-                            background_sound.stop() #stop it
-                        if not level_complete_se.get_num_channels(): #if the win sound is not playing
-                            level_complete_se.play() #play it
-                        tools.coins, tools.complete_levels, _, _ = tools.read_stats() #read stats to find complete levels and their times
-                        best_time = tools.complete_levels.get(current_level, float("inf")) #find best time for current level, infinity if it isnt found
-                        if best_time >= round(self.time/60, 1): #if best time is greater or equal than the attempts time
-                            end_text = " Yay!!!" # add yay to the end of the pause panel text
-                        else:
-                            end_text = ""
-                        pause_panel_text = f"Level Complete, time: {round(self.time/60, 1)}, best time: {best_time}{end_text}" # set pause panel text, displays current and best time
-                        pause_panel_open = True #open the pause panel
-                        Hud_buttons[2].enabled = False #disable the play button
+        wall_rect = pygame.Rect(self.x - 5, self.y - 5, self.length + 10, self.length + 10) # bigger hitbox for checking if its touching wall
+        feet_rect = pygame.Rect(self.x, self.y + self.length - 2, self.length, 2) # feet only rect for platforms
+        if self.p_type == 1: # body rect for all other blocks
+            body_rect = pygame.Rect(self.x, self.y, self.length, self.length)
+        else:
+            body_rect = pygame.Rect(self.x + 3, self.y, self.length - 5, self.length)
+        # static blocks, tested against the merged rects made when the level loaded
+        if body_rect.collidelist(get_nearby_rects(solid_index, body_rect, COLLISION_BUCKET)) != -1: # solid blocks
+            colliding = True
+        if self.vy > 0 and feet_rect.collidelist(get_nearby_rects(platform_index, feet_rect, COLLISION_BUCKET)) != -1: # phase platforms, only colliding if moving down
+            colliding = True
+        self.touching_wall_side = wall_rect.collidelist(get_nearby_rects(wall_index, wall_rect, COLLISION_BUCKET)) != -1 # bigger hitbox for checking if its touching wall
+
+        for block in get_nearby_blocks(key_index, wall_rect, GRID_SIZE): # key walls near the player, solid until opened and then a platform
+            if block.type == 16 and body_rect.colliderect(block.rect):
+                colliding = True
+            elif block.type == 17 and self.vy > 0 and feet_rect.colliderect(block.rect): # only colliding if moving down
+                colliding = True
+            if wall_rect.colliderect(block.rect):
+                self.touching_wall_side = True
         return colliding #return if the player is collinding
+
+    def check_triggers(self):
+        """
+        Handles the special blocks (death, checkpoint and finish) the player touched this tick, inside it, on the way
+        through it or pushing against it. Each one only does something on the tick the player enters it, not every tick the player stays in it.
+
+        Notes:
+            - only the special blocks in the grid cells the player overlaps are checked, using the trigger index made when the level loaded
+            - the blocks touched while moving are found by move(), in the order they were touched
+            - key walls are opened by move(), its sweep finds the ones the player runs into or is already inside
+        """
+        global game_over_se, checkpoint_se, level_complete_se, pause_panel_open, pause_panel_text, level_complete, finish_time, deaths, active_checkpoint
+        if self.p_type == 1: # body rect, same as for solid blocks
+            body_rect = pygame.Rect(self.x, self.y, self.length, self.length)
+        else:
+            body_rect = pygame.Rect(self.x + 3, self.y, self.length - 5, self.length)
+        inside = [block for block in get_nearby_blocks(trigger_index, body_rect, GRID_SIZE) if body_rect.colliderect(block.rect)] # special blocks the player is inside
+        touched = list(dict.fromkeys(self.path_triggers + sorted(inside, key=lambda b: (b.grid_location[1], b.grid_location[0])))) # in the order they were touched, then row by row
+        entered = [block for block in touched if block not in self.touching_triggers] # only the ones that were just entered
+        self.touching_triggers = set(touched)
+        self.path_triggers = []
+        for block in entered:
+            if block.type == 11 or block.type == 15: #death block
+                deaths += 1 # count it for the level
+                self.make_new(False) #reset the player
+                audio.play_effect(game_over_se) # play game over sound
+                pause_panel_open = True # open the pause panel
+                Hud_buttons[2].enabled = True #enable pause button in that pannel
+                pause_panel_text = "You Died" #set text on pause panel
+                reset_level_objects() # reset powerups and key walls
+                return # the player has moved back, the other blocks werent really touched
+            elif block.type == 12: #checkpoint
+                audio.play_effect(checkpoint_se, max_voices=1) #play checkpoint sound if it is not playing
+                active_checkpoint = block #set current checkpoint to active checkpoint
+            elif block.type == 14: #finish block
+                level_complete = True # the level has been won
+                finish_time = self.time # the time of this tick, update() still counts it after the triggers
+                if save_stats: # not when running headless
+                    tools.write_stats(self.user_power_ups[0], (current_level, round(finish_time / TICK_RATE, 1)), None) #wrtie to stats that you you finished the level and its time
+                recorder.finish(finish_time) # the recorded run finished the level
+                audio.stop_music(fade=False) # stop the music so the win sound is heard
+                audio.play_effect(level_complete_se, "ui", max_voices=1) #play the win sound if it is not playing, on the ui channels so effects never cut it off
+                tools.coins, tools.complete_levels, _, _ = tools.read_stats() #read stats to find complete levels and their times
+                best_time = tools.complete_levels.get(current_level, float("inf")) #find best time for current level, infinity if it isnt found
+                if best_time >= round(finish_time/TICK_RATE, 1): #if best time is greater or equal than the attempts time
+                    end_text = " Yay!!!" # add yay to the end of the pause panel text
+                else:
+                    end_text = ""
+                save_run(end_text != "") # save the run, also as the best run if it was the best time
+                pause_panel_text = f"Level Complete, time: {round(finish_time/TICK_RATE, 1)}, best time: {best_time}{end_text}" # set pause panel text, displays current and best time
+                pause_panel_open = True #open the pause panel
+                Hud_buttons[2].enabled = False #disable the play button
+                return # the level is over
     
     def collison_with_power_ups (self):
         """
@@ -358,11 +511,11 @@ class Player:
         """
         global coin_se
         player_rect = pygame.Rect(self.x, self.y, self.length, self.length) #rectangle for player, for collision
-        for power_up in power_ups: # iterate through powerups
-            if player_rect.colliderect(pygame.Rect(power_up.rect)): #if its colliding
+        for power_up in get_nearby_blocks(power_up_index, player_rect, GRID_SIZE): # only the powerups in the cells the player overlaps
+            if not power_up.collected and player_rect.colliderect(power_up.rect): #if its colliding and not already taken
                 power_up.collected = True #set the powerup to collected
                 self.user_power_ups[power_up.type - 1] += 1 #add that powerup to the users inventory
-                coin_se.play() # play sound effect
+                audio.play_effect(coin_se, max_voices=3) # play sound effect, a few at once when lots of powerups are collected together
                        
 class Blocks:
     def __init__(self,type_num, grid_loc, g_size, b_imgs):
@@ -381,37 +534,51 @@ class Blocks:
         self.MAX_animate_time = 25 # after how many frames, restart the animation
         self.rect = (0,0,0,0) #collision rectangle
         self.rect2 = (0,0,0,0) #2nd collision rectangle, needed if block is not a rect (corner block)
-        self.collected = False #for checkpoints
         self.g_size = g_size #grid size
         self.b_imgs = b_imgs #background images
         
     def go(self):
         """performs actions for blocks
-            draws the block to the screen
+            moves the animation along and draws the block to the screen
         """
+        self.animate()
         self.draw()
+
+    def animate(self):
+        """moves animated blocks (floor death and finish line) one frame along their animation
+        """
+        if self.type in (14, 15): #if it needs to be animated
+            self.animate_time += 1 # add 1 to length the frame has been shown for
+            self.animate_time %= self.MAX_animate_time #modulus to the time it needs to restart the animation
         
     def reset(self):
         """resets the block for when restarting a level
         """
         if self.type == 17: # if its an opened key box
             self.type = 16 # close it
+            self.get_rect() # its solid again, change its collision rect straight away
             
-    def draw(self):
+    def draw(self, offset = (0, 0)):
         """
         Draws a shape on the screen based on the object's type attribute.
+
+        Args:
+            offset (tuple, optional): x, y of the camera, subtracted from the position. Defaults to (0, 0).
         """
         if self.type not in (0, 14, 15): # if its not no block, or animated block (floor death and finish line)
             if self.b_imgs[self.type - 1] is not None: # if there is an image
-                screen.blit(self.b_imgs[self.type - 1], (self.x, self.y)) # blit it to the screen
+                screen.blit(self.b_imgs[self.type - 1], (self.x - offset[0], self.y - offset[1])) # blit it to the screen
         elif self.type in (14, 15): #if it needs to be animated
             # Animate finish block by flipping through the image list at index self.type - 1
-            self.animate_time += 1 # add 1 to length the frame has been shown for
-            self.animate_time %= self.MAX_animate_time #modulus to the time it needs to restart the animation
             img_list = self.b_imgs[self.type - 1]
             #show image at index, split max animate into the number of photos there are, ex: if animate time/ max animate time = 0.33 and there are 2 images it will be the first frame
             img = img_list[int(self.animate_time / (self.MAX_animate_time / len(img_list)) % len(img_list))]
-            screen.blit(img, (self.x, self.y)) #blit the image to the screen
+            screen.blit(img, (self.x - offset[0], self.y - offset[1])) #blit the image to the screen
+
+    def get_rect(self):
+        """
+        Sets the collision rects for the block based on its type, done when the level loads and when a key wall opens or closes.
+        """
         if self.type == 1: #if its a full block
             self.rect = (self.x, self.y, self.g_size, self.g_size) # set its collision rect
         elif self.type == 2  or self.type == 17: #phase block
@@ -477,16 +644,191 @@ class Power_Ups:
         """
         self.collected = False
     
-    def draw(self):
+    def draw(self, offset = (0, 0)):
         """
         Draws a shape on the screen based on the object's type attribute.
+
+        Args:
+            offset (tuple, optional): x, y of the camera, subtracted from the position. Defaults to (0, 0).
+        """
+        if not self.collected and self.type != 0: #if its not collected or a no block
+            screen.blit(self.p_imgs[self.type - 1], (self.x - offset[0], self.y - offset[1])) # draw it
+
+    def get_rect(self):
+        """
+        Sets the collision rect for the powerup, done when the level loads.
         """
         if self.collected: # its collected
             self.rect = (0,0,0,0) # no collision rect
-        else:
-            if self.type != 0: #if its not a no block
-                self.rect = (self.x + 0.25*self.g_size, self.y + 0.25*self.g_size, 0.5*self.g_size, 0.5*self.g_size) # set its collide rect
-                screen.blit(self.p_imgs[self.type - 1], (self.x, self.y)) # draw it
+        elif self.type != 0: #if its not a no block
+            self.rect = (self.x + 0.25*self.g_size, self.y + 0.25*self.g_size, 0.5*self.g_size, 0.5*self.g_size) # set its collide rect
+
+class Tile_Layer:
+    def __init__(self, level_blocks, level_power_ups, changing_blocks, g_size, view_size):
+        """pre-rendered surfaces of the tiles that dont move, so a frame only blits a few surfaces instead of every tile.
+        the level is split into chunks of CHUNK_COLUMNS by CHUNK_ROWS cells, each chunk is drawn the first time it comes into view
+        and only the chunks in view are drawn, so long levels cost the same to draw as short ones. only the CACHED_CHUNKS chunks
+        seen most recently are kept, the rest are drawn again if they come back into view, so long levels dont use more memory either
+
+        Args:
+            level_blocks (list): Blocks of the level
+            level_power_ups (list): Power_Ups of the level, drawn on top when not collected
+            changing_blocks (list): blocks whose type can change while shown (key walls, or every block in the editor), checked each frame they are in view
+            g_size (float): size of each cell in the grid
+            view_size (tuple): width, height of the area of the screen the level is shown in, from the top left
+        """
+        self.g_size = g_size
+        self.view_size = view_size
+        self.camera = (0, 0) # x, y of the camera this frame
+        self.chunks = {} # (chunk column, chunk row) to [surface with the tiles drawn on, run length encoded copy that is blitted], the chunk seen longest ago first
+        self.chunk_blocks = get_chunks(level_blocks) # blocks in each chunk, to draw it the first time its seen
+        self.chunk_power_ups = get_chunks(level_power_ups) # powerups in each chunk
+        self.chunk_changing_blocks = get_chunks(changing_blocks) # blocks to check for changes in each chunk
+        self.drawn_types = {} # type each block was last drawn as
+        self.shown_power_ups = {} # type and if it was collected for each powerup last frame, to know when they change
+        self.animated_blocks = {} # animated blocks (finish line and floor death) in each drawn chunk, drawn each frame
+
+    def go(self, camera = (0, 0)):
+        """moves the animated tiles in view along and draws the layer, for the level editor where there are no physics ticks
+
+        Args:
+            camera (tuple, optional): x, y of the top left of the view in the level. Defaults to (0, 0).
+        """
+        for chunk in self.get_visible_chunks(camera): # move animations along
+            for block in self.animated_blocks.get(chunk, []):
+                block.animate()
+        self.draw(camera)
+
+    def get_chunk_origin(self, chunk):
+        """finds the pixel position of the top left of a chunk in the level
+
+        Args:
+            chunk (tuple): chunk column, chunk row
+
+        Returns:
+            tuple: x, y in pixels, whole numbers so tiles line up exactly with drawing them straight to the screen
+        """
+        return int(chunk[0] * CHUNK_COLUMNS * self.g_size), int(chunk[1] * CHUNK_ROWS * self.g_size)
+
+    def get_visible_chunks(self, camera):
+        """finds the chunks of the level that are in view
+
+        Args:
+            camera (tuple): x, y of the top left of the view in the level
+
+        Returns:
+            list: (chunk column, chunk row) of each chunk in view that has tiles
+        """
+        chunk_w, chunk_h = CHUNK_COLUMNS * self.g_size, CHUNK_ROWS * self.g_size # size of a chunk in pixels
+        first_col, last_col = int(camera[0] // chunk_w), int((camera[0] + self.view_size[0] - 1) // chunk_w)
+        first_row, last_row = int(camera[1] // chunk_h), int((camera[1] + self.view_size[1] - 1) // chunk_h)
+        return [(col, row) for row in range(first_row, last_row + 1) for col in range(first_col, last_col + 1) if (col, row) in self.chunk_blocks]
+
+    def make_chunk(self, chunk):
+        """draws every tile of a chunk onto a new surface, the first time the chunk comes into view
+
+        Args:
+            chunk (tuple): chunk column, chunk row
+        """
+        left, top = self.get_chunk_origin(chunk)
+        right, bottom = self.get_chunk_origin((chunk[0] + 1, chunk[1] + 1)) # where the next chunks start
+        surface = pygame.Surface((right - left, bottom - top), pygame.SRCALPHA).convert_alpha() # transparent surface to draw static tiles on
+        self.chunks[chunk] = [surface, None]
+        self.animated_blocks[chunk] = []
+        for block in self.chunk_blocks[chunk]: # draw every tile once
+            self.draw_cell(block)
+
+    def drop_chunk(self, chunk):
+        """forgets the drawn tiles of a chunk to free its memory, it is drawn again the next time it comes into view
+
+        Args:
+            chunk (tuple): chunk column, chunk row
+        """
+        del self.chunks[chunk]
+        del self.animated_blocks[chunk]
+        for block in self.chunk_blocks[chunk]: # none of its tiles are drawn now
+            self.drawn_types.pop(block, None)
+
+    def add_tiles(self, new_blocks, new_power_ups, changing_blocks):
+        """adds tiles to the layer, for when the level editor makes the level longer. only the chunks the new tiles are in change,
+        the chunks already drawn get the new tiles drawn on them
+
+        Args:
+            new_blocks (list): Blocks to add
+            new_power_ups (list): Power_Ups to add
+            changing_blocks (list): the new blocks whose type can change while shown
+        """
+        for chunk_tiles, tiles in ((self.chunk_blocks, new_blocks), (self.chunk_power_ups, new_power_ups), (self.chunk_changing_blocks, changing_blocks)):
+            for chunk, tiles_in_chunk in get_chunks(tiles).items():
+                chunk_tiles.setdefault(chunk, []).extend(tiles_in_chunk)
+        for block in new_blocks:
+            if get_chunk(block) in self.chunks: # already drawn, draw the new tile onto it
+                self.draw_cell(block)
+
+    def draw_cell(self, block):
+        """draws one tile onto its chunk, replacing what was there
+
+        Args:
+            block (Blocks): block to draw
+        """
+        chunk = get_chunk(block)
+        surface = self.chunks[chunk][0]
+        left, top = self.get_chunk_origin(chunk)
+        x, y = int(block.x) - left, int(block.y) - top # position on the chunk
+        old_type = self.drawn_types.get(block, 0)
+        if old_type in (14, 15): # was animated, stop drawing it every frame
+            self.animated_blocks[chunk].remove(block)
+        if old_type != 0: # clear the old tile
+            surface.fill((0, 0, 0, 0), (x, y, block.g_size, block.g_size))
+            tools.mark_dirty((block.x - self.camera[0], block.y - self.camera[1], block.g_size, block.g_size)) # it changes on the screen
+        if block.type in (14, 15): # animated, drawn every frame instead
+            self.animated_blocks[chunk].append(block)
+        elif block.type != 0 and block.b_imgs[block.type - 1] is not None: # static tile with an image
+            surface.blit(block.b_imgs[block.type - 1], (x, y))
+        self.drawn_types[block] = block.type
+        self.chunks[chunk][1] = None # needs to be remade
+
+    def draw(self, camera = (0, 0), animate_time = None):
+        """redraws tiles in view that changed, then draws the chunks, animated tiles and uncollected powerups in view to the screen
+
+        Args:
+            camera (tuple, optional): x, y of the top left of the view in the level, whole numbers. Defaults to (0, 0).
+            animate_time (int, optional): ticks of animation to show every animated tile at, so they stay in time while out of view.
+                                          Defaults to None (each block keeps its own animation time).
+        """
+        self.camera = camera
+        visible_chunks = self.get_visible_chunks(camera)
+        screen.set_clip((0, 0) + tuple(self.view_size)) # dont draw tiles outside the view, over the editor panels
+        for chunk in visible_chunks: # static tiles, a chunk at a time
+            if chunk not in self.chunks: # first time in view (or since it was dropped), draw its tiles
+                self.make_chunk(chunk)
+            else: # seen now, move it to the end so its dropped last
+                self.chunks[chunk] = self.chunks.pop(chunk)
+            for block in self.chunk_changing_blocks.get(chunk, []): # redraw only the tiles that changed since the last frame
+                if self.drawn_types[block] != block.type:
+                    self.draw_cell(block)
+            layer = self.chunks[chunk]
+            if layer[1] is None: # a tile changed, make a new copy to blit
+                # mostly see through and rarely changes, so run length encoding makes blitting it much faster
+                # its a copy because changing an encoded surface slightly changes the see through pixels
+                layer[1] = layer[0].copy()
+                layer[1].set_alpha(255, pygame.RLEACCEL)
+            left, top = self.get_chunk_origin(chunk)
+            screen.blit(layer[1], (left - camera[0], top - camera[1]))
+        while len(self.chunks) > CACHED_CHUNKS: # too many drawn, drop the one seen longest ago (never one in view)
+            self.drop_chunk(next(iter(self.chunks)))
+        for chunk in visible_chunks:
+            for block in self.animated_blocks[chunk]: # small overlay of animated tiles
+                if animate_time is not None: # same animation frame as every other animated tile
+                    block.animate_time = animate_time % block.MAX_animate_time
+                block.draw(camera)
+                tools.mark_dirty((block.x - camera[0], block.y - camera[1], block.g_size, block.g_size)) # they change every few frames
+            for power_up in self.chunk_power_ups.get(chunk, []): # and powerups, draw skips collected ones
+                power_up.draw(camera)
+                if self.shown_power_ups.get(power_up) != (power_up.type, power_up.collected): # collected, reset or placed since last frame
+                    tools.mark_dirty((power_up.x - camera[0], power_up.y - camera[1], power_up.g_size, power_up.g_size))
+                    self.shown_power_ups[power_up] = (power_up.type, power_up.collected)
+        screen.set_clip(None)
 
 class Hud_Buttons:
     def __init__(self, x, y, img, g_size, type):
@@ -532,7 +874,7 @@ class Hud_Buttons:
             else: # if its not long
                 img_coords = ((tools.SCREEN_X-pause_menu_img.get_width())*0.5, (tools.SCREEN_Y-pause_menu_img.get_height())*0.5)
                 screen.blit(pause_menu_img, img_coords) # blit the regular one
-            text_label = retro_font_32.render(pause_panel_text, True, tools.WHITE) # Center the heading text relative to the panel
+            text_label = tools.render_text(retro_font_32, pause_panel_text, tools.WHITE) # Center the heading text relative to the panel
             screen.blit(text_label, ((tools.SCREEN_X-text_label.get_width())*0.5,220)) # blit it
 
         screen.blit(self.img, (self.x, self.y)) #blit the image
@@ -541,7 +883,7 @@ class Hud_Buttons:
         """
             checks if it clicked and performs action if it is
         """
-        global pause_panel_open, pause_panel_text, background_img, background_sound
+        global pause_panel_open, pause_panel_text, background_img, background_music, active_checkpoint
         img = self.img # set image to self.img for shorter length in next lines
         if input_info.left_mouse_down and pygame.Rect(self.x, self.y, img.get_width(), img.get_height()).collidepoint(input_info.xMouse, input_info.yMouse) and self.enabled: # if the left mouse is pressed, it is colliding with the mouse, and the buttons is active
             if self.type == 1:
@@ -551,21 +893,23 @@ class Hud_Buttons:
                 pause_panel_text = "Pause" #panel text to pause
             elif self.type == 2:
                 #home button
-                tools.cloud_img = pygame.image.load("clouds.png").convert_alpha() #set cloud image back to original for menus
-                background_sound = pygame.mixer.Sound("sound/music/Worldmap Theme.mp3") # set background sound to world map theme
-                background_img = pygame.image.load("background.png").convert_alpha() #set background image to original for menus
+                assets.release_image(tools.cloud_img) # done with the levels images, the cache can forget a custom background
+                assets.release_image(background_img)
+                tools.cloud_img = assets.get_image("clouds.png") #set cloud image back to original for menus
+                background_music = audio.WORLD_MUSIC # set background music to world map theme
+                background_img = assets.get_image("background.png", (tools.SCREEN_X, tools.SCREEN_Y)) #set background image to original for menus
+                save_run() # save the unfinished run
                 tools.game_state = "update_play_menu" #go update the play menu
             elif self.type == 3:
                 #play button
                 pause_panel_open = False #close the pause panel
             elif self.type == 4:
                 #restart
+                save_run() # save the run before starting a new one
+                recorder.start(current_level, player.p_type) # record the new attempt
                 pause_panel_open = False # close pause panel
-                for power_up in power_ups: #reset powerups
-                    power_up.reset()
-                for block in blocks: #reset blocks and checkpoints
-                    block.collected = False
-                    block.reset()
+                active_checkpoint = None # start from the spawn again
+                reset_level_objects() # reset powerups and key walls
                 player.make_new()# reset player
                 
 # your FUNCTIONS go here
@@ -588,6 +932,189 @@ def grid_to_class(level, level_class, g_size, imgs):
                 output_block_list.append(Power_Ups(level[i][j],(j,i), g_size, imgs)) # put each in the powerup class
     return output_block_list # return the list of block or powerup instances
 
+def make_block_index(level_blocks):
+    """
+    Indexes the blocks of a level by their grid cell so collisions only have to look at nearby blocks.
+
+    Args:
+        level_blocks (list): A list of Blocks objects, as made by grid_to_class (Power_Ups work the same).
+
+    Returns:
+        dict: A dictionary mapping (column, row) grid locations to the Blocks object in that cell, empty cells are left out.
+    """
+    block_index = {}
+    for block in level_blocks: #iterate through blocks
+        if block.type != 0: # skip empty cells, they can never be collided with
+            block_index[block.grid_location] = block # store block under its cell
+    return block_index
+
+def make_colliders(level_blocks):
+    """
+    Builds the collision rects of a level once when it loads, merging touching tiles into bigger rects so there are fewer to check.
+
+    Args:
+        level_blocks (list): A list of Blocks objects with their collision rects set by get_rect.
+
+    Returns:
+        solid_rects (list): merged pygame.Rects of the solid blocks (types 1 and 3-10)
+        platform_rects (list): merged pygame.Rects of the phase platforms (type 2)
+        key_blocks (list): key walls (types 16 and 17), kept as blocks because they change when opened
+    """
+    solid_rects = []
+    platform_rects = []
+    key_blocks = []
+    for block in level_blocks: #iterate through blocks
+        if block.type in (1,3,4,5,6,7,8,9,10): # solid blocks, some have 2 rects
+            for brect in (block.rect, block.rect2):
+                if brect != (0,0,0,0):
+                    solid_rects.append(pygame.Rect(brect))
+        elif block.type == 2: # phase platform
+            platform_rects.append(pygame.Rect(block.rect))
+        elif block.type in (16, 17): # key wall
+            key_blocks.append(block)
+    return merge_rects(solid_rects), merge_rects(platform_rects), key_blocks
+
+def merge_rects(rects):
+    """
+    Merges rects that touch or overlap and line up exactly into bigger ones, first along rows then along columns. The area covered stays the same.
+
+    Args:
+        rects (list): A list of pygame.Rects.
+
+    Returns:
+        list: The merged pygame.Rects.
+    """
+    rows = []
+    for brect in sorted(rects, key=lambda r: (r.top, r.height, r.left)): # rects in the same row end up next to each other
+        if rows and rows[-1].top == brect.top and rows[-1].height == brect.height and rows[-1].right >= brect.left: # same row and touching
+            rows[-1].union_ip(brect)
+        else:
+            rows.append(pygame.Rect(brect))
+    merged = []
+    for brect in sorted(rows, key=lambda r: (r.left, r.width, r.top)): # rects in the same column end up next to each other
+        if merged and merged[-1].left == brect.left and merged[-1].width == brect.width and merged[-1].bottom >= brect.top: # same column and touching
+            merged[-1].union_ip(brect)
+        else:
+            merged.append(brect)
+    return merged
+
+def make_rect_index(rects, bucket_size):
+    """
+    Indexes rects by the square buckets of the level they overlap, so collisions only have to look at rects near the player
+    however long the level is. A merged rect that covers several buckets is stored in each of them.
+
+    Args:
+        rects (list): A list of pygame.Rects.
+        bucket_size (int): size of each bucket in pixels
+
+    Returns:
+        dict: A dictionary mapping (column, row) buckets to a list of (position in rects, rect) for the rects that overlap it.
+    """
+    rect_index = {}
+    for i, brect in enumerate(rects): #iterate through rects
+        for row in range(brect.top // bucket_size, (brect.bottom - 1) // bucket_size + 1): # every bucket the rect overlaps
+            for col in range(brect.left // bucket_size, (brect.right - 1) // bucket_size + 1):
+                rect_index.setdefault((col, row), []).append((i, brect))
+    return rect_index
+
+def get_nearby_rects(rect_index, area_rect, bucket_size):
+    """
+    Finds the rects in every bucket that a rectangle overlaps.
+
+    Args:
+        rect_index (dict): A rect index from make_rect_index.
+        area_rect (pygame.Rect): The area to look for rects in, in pixel coordinates.
+        bucket_size (int): size of each bucket in pixels, the same as the index was made with
+
+    Returns:
+        list: The rects in the overlapped buckets, each only once and in the same order as the list the index was made from.
+    """
+    # one pixel of margin on each side, the same as get_nearby_blocks
+    first_col = int((area_rect.left - 1) // bucket_size)
+    last_col = int((area_rect.right + 1) // bucket_size)
+    first_row = int((area_rect.top - 1) // bucket_size)
+    last_row = int((area_rect.bottom + 1) // bucket_size)
+    nearby = {}
+    for row in range(first_row, last_row + 1): # go through the buckets
+        for col in range(first_col, last_col + 1):
+            for i, brect in rect_index.get((col, row), []):
+                nearby[i] = brect
+    return [nearby[i] for i in sorted(nearby)]
+
+def get_chunk(tile):
+    """
+    Finds the chunk of the level a block or powerup is drawn in by the Tile_Layer.
+
+    Args:
+        tile (Blocks or Power_Ups): the block or powerup
+
+    Returns:
+        tuple: chunk column, chunk row
+    """
+    return tile.grid_location[0] // CHUNK_COLUMNS, tile.grid_location[1] // CHUNK_ROWS
+
+def get_chunks(tiles):
+    """
+    Splits blocks or powerups into the chunks of the level they are in.
+
+    Args:
+        tiles (list): Blocks or Power_Ups objects.
+
+    Returns:
+        dict: A dictionary mapping (chunk column, chunk row) to a list of the tiles in it, in the same order as tiles.
+    """
+    chunks = {}
+    for tile in tiles: #iterate through tiles
+        chunks.setdefault(get_chunk(tile), []).append(tile)
+    return chunks
+
+def get_nearby_blocks(block_index, area_rect, g_size):
+    """
+    Finds the blocks in every grid cell that a rectangle overlaps.
+
+    Args:
+        block_index (dict): A block index from make_block_index.
+        area_rect (pygame.Rect): The area to look for blocks in, in pixel coordinates.
+        g_size (float): size of each cell in the grid
+
+    Returns:
+        list: The blocks in the overlapped cells, in the same row by row order as the level blocks list.
+    """
+    # one pixel of margin on each side so rects that were rounded by pygame.Rect are never missed
+    first_col = int((area_rect.left - 1) // g_size)
+    last_col = int((area_rect.right + 1) // g_size)
+    first_row = int((area_rect.top - 1) // g_size)
+    last_row = int((area_rect.bottom + 1) // g_size)
+    nearby = []
+    for row in range(first_row, last_row + 1): # go through cells row by row, same order as grid_to_class
+        for col in range(first_col, last_col + 1):
+            block = block_index.get((col, row)) # look up block in that cell
+            if block is not None:
+                nearby.append(block)
+    return nearby
+
+def entry_exit_times(p_min, p_max, b_min, b_max, d):
+    """
+    Finds when a moving span starts and stops overlapping a still span along one axis, for swept collisions.
+
+    Args:
+        p_min (float): start of the moving span (left or top)
+        p_max (float): end of the moving span (right or bottom)
+        b_min (float): start of the still span
+        b_max (float): end of the still span
+        d (float): distance the moving span travels
+
+    Returns:
+        tuple: (entry time, exit time) as fractions of the movement, or None if the spans never overlap
+    """
+    if d > 0: # moving forwards
+        return (b_min - p_max) / d, (b_max - p_min) / d
+    elif d < 0: # moving backwards
+        return (b_max - p_min) / d, (b_min - p_max) / d
+    elif p_min < b_max and p_max > b_min: # not moving but already lined up
+        return -math.inf, math.inf
+    return None # not moving and not lined up
+
 def sign(num):
     """
     Returns the sign of a number.
@@ -616,8 +1143,32 @@ def get_loc_from_grid(g_loc, g_size):
         x, y = g_loc #cell loction set to x and y
         return g_size*x, g_size*y #pixel coords of the cells top left
     
+def get_player_sprites(img, p_type, length):
+    """gets every image the player can be drawn with, scaled to its length, making them the first time a skin is used
+
+    Args:
+        img (pygame.Surface or list): the skin image for a cube, or the list of runner frames
+        p_type (int): 1 for cube, 2 for runner
+        length (int): side length of the player in pixels
+
+    Returns:
+        dict: for a cube, the image rotated to each angle in ROTATION_STEP steps from 0 to 355,
+        for a runner, False to the frames facing left (as drawn) and True to the frames flipped to face right
+    """
+    key = (img if p_type == 1 else tuple(img), length) # surfaces are the same object for the same skin
+    if key in player_sprites: # already made for this skin
+        return player_sprites[key]
+    if p_type == 1:
+        scaled = pygame.transform.scale(img, (length, length))
+        sprites = {angle: pygame.transform.rotate(scaled, angle) for angle in range(0, 360, ROTATION_STEP)}
+    else:
+        frames = [pygame.transform.scale(frame, (length, length)) for frame in img]
+        sprites = {False: frames, True: [pygame.transform.flip(frame, True, False) for frame in frames]}
+    player_sprites[key] = sprites
+    return sprites
+
 def load_images(grid_size):
-    """loads many needed images for this file and sizes them properly
+    """gets many needed images for this file from the shared image cache, sized properly
 
     Args:
         grid_size (float): size of the grid
@@ -627,26 +1178,27 @@ def load_images(grid_size):
         power_up_image_list (list): list of images for each powerup type
         bg_img (pygame.Surface): background image
     """
+    size = (grid_size, grid_size) # every tile and powerup is one grid square
     #blocks
-    full_block = pygame.image.load("tiles for game/full block(1).png").convert_alpha()
-    phase_block = pygame.image.load("tiles for game/phase block(2).png").convert_alpha()
-    floor_block = pygame.image.load("tiles for game/floor piece(3).png").convert_alpha()
-    roof_block = pygame.image.load("tiles for game/roof piece(4).png").convert_alpha()
-    left_wall = pygame.image.load("tiles for game/left wall(5).png").convert_alpha()
-    right_wall = pygame.image.load("tiles for game/right wall(6).png").convert_alpha()
-    bottom_right_wall = pygame.image.load("tiles for game/bottom right wall(7).png").convert_alpha()
-    bottom_left_wall = pygame.image.load("tiles for game/bottom left wall(8).png").convert_alpha()
-    top_right_wall = pygame.image.load("tiles for game/top right wall(9).png").convert_alpha()
-    top_left_wall = pygame.image.load("tiles for game/top left wall(10).png").convert_alpha()
-    death_block = pygame.image.load("tiles for game/death block(11).png").convert_alpha()
-    checkpoint = pygame.image.load("tiles for game/checkpoint(12).png").convert_alpha()
-    spawn_block = pygame.image.load("tiles for game/spawn block(13).png").convert_alpha()
-    finish_block1 = pygame.image.load("tiles for game/finish block 1(14).png").convert_alpha()
-    finish_block2 = pygame.image.load("tiles for game/finish block 2(14).png").convert_alpha()
-    floor_death_block1 = pygame.image.load("tiles for game/floor death piece1(15).png").convert_alpha()
-    floor_death_block2 = pygame.image.load("tiles for game/floor death piece2(15).png").convert_alpha()
-    key_block = pygame.image.load("tiles for game/key block(16).png").convert_alpha()
-    key_empty_block = phase_block.copy()
+    full_block = assets.get_image("tiles for game/full block(1).png", size)
+    phase_block = assets.get_image("tiles for game/phase block(2).png", size)
+    floor_block = assets.get_image("tiles for game/floor piece(3).png", size)
+    roof_block = assets.get_image("tiles for game/roof piece(4).png", size)
+    left_wall = assets.get_image("tiles for game/left wall(5).png", size)
+    right_wall = assets.get_image("tiles for game/right wall(6).png", size)
+    bottom_right_wall = assets.get_image("tiles for game/bottom right wall(7).png", size)
+    bottom_left_wall = assets.get_image("tiles for game/bottom left wall(8).png", size)
+    top_right_wall = assets.get_image("tiles for game/top right wall(9).png", size)
+    top_left_wall = assets.get_image("tiles for game/top left wall(10).png", size)
+    death_block = assets.get_image("tiles for game/death block(11).png", size)
+    checkpoint = assets.get_image("tiles for game/checkpoint(12).png", size)
+    spawn_block = assets.get_image("tiles for game/spawn block(13).png", size)
+    finish_block1 = assets.get_image("tiles for game/finish block 1(14).png", size)
+    finish_block2 = assets.get_image("tiles for game/finish block 2(14).png", size)
+    floor_death_block1 = assets.get_image("tiles for game/floor death piece1(15).png", size)
+    floor_death_block2 = assets.get_image("tiles for game/floor death piece2(15).png", size)
+    key_block = assets.get_image("tiles for game/key block(16).png", size)
+    key_empty_block = phase_block.copy() # its own copy, the cached one is shared
 
     block_image_list = [
         full_block,
@@ -670,19 +1222,12 @@ def load_images(grid_size):
         key_empty_block
     ]
     
-    for i in range(len(block_image_list)): # iterate through block imgs
-        if isinstance(block_image_list[i], list): # if its list, menaing animation
-            for j in range(len(block_image_list[i])): #iterate through again in case for animation
-                block_image_list[i][j] = pygame.transform.scale(block_image_list[i][j], (grid_size, grid_size)) # scale image to grid size
-        elif block_image_list[i] is not None: #if the image exists
-            block_image_list[i] = pygame.transform.scale(block_image_list[i], (grid_size, grid_size)) # scale to grid_size
-    
     #power ups
-    coin = pygame.image.load("powerups for game/coin(1).png").convert_alpha()
-    double_jump = pygame.image.load("powerups for game/double jump(2).png").convert_alpha()
-    wall_jump = pygame.image.load("powerups for game/wall jump(3).png").convert_alpha()
-    high_jump = pygame.image.load("powerups for game/high jump(4).png").convert_alpha()
-    key = pygame.image.load("powerups for game/key(5).png").convert_alpha()
+    coin = assets.get_image("powerups for game/coin(1).png", size)
+    double_jump = assets.get_image("powerups for game/double jump(2).png", size)
+    wall_jump = assets.get_image("powerups for game/wall jump(3).png", size)
+    high_jump = assets.get_image("powerups for game/high jump(4).png", size)
+    key = assets.get_image("powerups for game/key(5).png", size)
 
     power_up_image_list = [
         coin,
@@ -691,13 +1236,9 @@ def load_images(grid_size):
         high_jump,
         key
     ]
-    for i in range(len(power_up_image_list)): # iterate through powerup imgs
-        if power_up_image_list[i] is not None: #if it exists
-            power_up_image_list[i] = pygame.transform.scale(power_up_image_list[i], (grid_size, grid_size)) # scale to grid size
             
     #background
-    bg_img = pygame.image.load("background.png").convert_alpha() #load deafult bg
-    bg_img = pygame.transform.scale(bg_img, (tools.SCREEN_X, tools.SCREEN_Y)) #scale to screen size
+    bg_img = assets.get_image("background.png", (tools.SCREEN_X, tools.SCREEN_Y)) #load deafult bg scaled to screen size
             
     return block_image_list, power_up_image_list, bg_img
 
@@ -709,222 +1250,374 @@ def draw_hud(power_up_list, imgs, font):
         imgs (list): list of powerup images
         font (font): font
     """
+    global drawn_hud, hud_text_imgs
     x_offset = 10 #offset to start po
     y_offset = 10
+    hud = (round(player.time / TICK_RATE, 1), tuple(power_up_list)) # what the hud shows
+    if hud != drawn_hud: # the time or a count changed, render the new text and update the hud area of the screen
+        tools.mark_dirty((0, 0, tools.SCREEN_X, y_offset + imgs[0].get_height()))
+        hud_text_imgs = [tools.render_text(font, f"time: {hud[0]}", tools.BLACK)] + [tools.render_text(font, str(count), tools.BLACK) for count in power_up_list] # timer then each powerup amount
+        drawn_hud = hud
     text_y = y_offset + (imgs[0].get_height() - 32) // 2 #y of text
 
     # Draw timer first, to the left of the powerups
-    timer_text = font.render(f"time: {round(player.time / 60, 1)}", True, tools.BLACK) # fstring to set time
-    screen.blit(timer_text, (x_offset, text_y)) #blit timer
+    screen.blit(hud_text_imgs[0], (x_offset, text_y)) #blit timer
     # Start powerups after the timer, with a little space
     powerup_x_start = x_offset + 200 # first x for powerup img
     img_x = powerup_x_start # set img x
     for i in range(len(power_up_list)): #iterate through powerups
-        count = power_up_list[i] #amt of powerup
         if imgs[i] is not None: # if img exists
             img_width = imgs[i].get_width() # width of img
-            text = font.render(str(count), True, tools.BLACK) #labelize the amt of powerup
+            text = hud_text_imgs[i + 1] #label of the amt of powerup
             text_width = text.get_width() # get the width
             text_y = y_offset + (imgs[i].get_height() - text.get_height()) // 2 # get the y of the text
             screen.blit(imgs[i], (img_x, y_offset)) # blit the img
             screen.blit(text, (img_x + img_width + 1, text_y)) # blit the 
             img_x += img_width + text_width + 20 #add spacing for next text
 
-def adiv_parser(file_path, background_img = None, background_sound = None, clouds_img= None):
-    """parses .adiv level fiel
+def adiv_parser(file_path, background_img = None, background_music = None, clouds_img= None, load_media = True, preload = None):
+    """parses .adiv level fiel, in the binary format or the old JSON one
 
     Args:
         file_path (string): filepath of the .adiv file
         background_img (img, optional): default bg img. Defaults to None.
-        background_sound (sound, optional): default bg sound. Defaults to None.
+        background_music (string, optional): filepath of the default bg music. Defaults to None.
         clouds_img (img, optional): def clouds img. Defaults to None.
+        load_media (bool, optional): if the levels custom image and music should be loaded, headless mode only needs the grids. Defaults to True.
+        preload (loader.Preload, optional): the level already read on the background thread, its image only needs converting. Defaults to None (read it now).
+        the music is returned as a filepath, the audio manager streams it while it plays instead of decoding it all when the level loads
+        the images returned always hold a reference in the shared image cache (the defaults get another), so the caller releases them with assets.release_image when it is done with them
 
     Returns:
-        blocks, powerups data as a grid for the level
+        blocks, powerups data as a grid for the level, levels can be any size and the powerups grid is always the same size as the blocks grid
         bg image and sound for the level
     """
     try:
-        with open(file_path, "r") as f: #try opening the file
-            data = json.load(f) #load the data
+        if preload is not None and preload.data is not None: # already read on the background thread
+            data = preload.data
+        else:
+            data = packs.read_level(file_path) #load the data, binary or the old JSON, on its own or in a level pack
     except:
         # If file can't be read or parsed, return all defaults
-        return [[0]*16 for _ in range(12)], [[0]*16 for _ in range(12)], background_img, background_sound, clouds_img
+        assets.hold_image(background_img) # the caller holds them again
+        assets.hold_image(clouds_img)
+        return [[0]*LEVEL_COLUMNS for _ in range(LEVEL_ROWS)], [[0]*LEVEL_COLUMNS for _ in range(LEVEL_ROWS)], background_img, background_music, clouds_img
 
-    def valid_grid(grid):
-        """checks if grid is valid
+    def valid_grid(grid, size = None):
+        """checks if grid is valid, levels can be any size as long as every row is the same length
 
         Args:
             grid (list): grid 
+            size (tuple, optional): rows, columns the grid has to have, None for any size. Defaults to None.
 
         Returns:
-            if the grid is a valid length
+            if the grid is a valid shape
         """
-        return len(grid) == 12 and len(grid[0]) == 16
+        if not isinstance(grid, list) or not grid or not all(isinstance(row, list) for row in grid): # not a list of rows
+            return False
+        if len(grid[0]) == 0 or any(len(row) != len(grid[0]) for row in grid): # empty or not a rectangle
+            return False
+        return size is None or (len(grid), len(grid[0])) == size
 
     blocks = data.get("blocks") #get the blocks data
     if not valid_grid(blocks): #if the blocks arent valid
-        blocks = [[0]*16 for _ in range(12)] #make it all 0s
+        blocks = [[0]*LEVEL_COLUMNS for _ in range(LEVEL_ROWS)] #make it all 0s
 
     powerups = data.get("powerups") #get powerup data
-    if not valid_grid(powerups): # powerup data is invalid
-        powerups = [[0]*16 for _ in range(12)] # grid of 0s
+    if not valid_grid(powerups, (len(blocks), len(blocks[0]))): # powerup data is invalid or a different size to the blocks
+        powerups = [[0]*len(blocks[0]) for _ in range(len(blocks))] # grid of 0s
+
+    if not load_media: # only the grids are needed, keep the defaults
+        assets.hold_image(background_img) # the caller holds them again
+        assets.hold_image(clouds_img)
+        return blocks, powerups, background_img, background_music, clouds_img
 
     image = data.get("image") # get image data
     try:
-        image = pygame.image.load(image).convert_alpha() #try loading image
-        image = pygame.transform.scale(image, (tools.SCREEN_X, tools.SCREEN_Y)) #rescalling to screen size
+        decoded = preload.image if preload is not None else None # decoded and scaled on the background thread
+        image = assets.get_image(image, (tools.SCREEN_X, tools.SCREEN_Y), decoded=decoded) #try loading image rescaled to screen size, from the cache if this level was played recently
         clouds_img = None #and if theres and image then no clouds
     except: #if it doesnt wokr
         image = background_img #set img to default
-        clouds_img = pygame.image.load("clouds.png") # and load clouds
+        assets.hold_image(image) # the caller holds it again
+        clouds_img = assets.get_image("clouds.png") # and load clouds
 
     music = data.get("music") # music data
-    try:
-        music = pygame.mixer.Sound(music) # try loading the music
-    except:
-        music = background_sound # if it deosnnt work load bg music
+    if not audio.can_play(music): # no music or the file is missing
+        music = background_music # use the bg music
 
     return blocks, powerups, image, music, clouds_img
         
 def load_sounds():
-    """loads all sound effects for game
+    """loads all sound effects for game, from the asset bundle if they are in it. they are played through audio.play_effect
 
     Returns:
         all of the sound effects
     """
-    click = pygame.mixer.Sound("sound/click.mp3")
-    level_complete = pygame.mixer.Sound("sound/level complete.mp3")
-    game_over = pygame.mixer.Sound("sound/game over.mp3")
-    jump = pygame.mixer.Sound("sound/jump.mp3")
-    checkpoint = pygame.mixer.Sound("sound/checkpoint.mp3")
-    coin = pygame.mixer.Sound("sound/coin.mp3")
+    click = assets.get_sound("sound/click.mp3")
+    level_complete = assets.get_sound("sound/level complete.mp3")
+    game_over = assets.get_sound("sound/game over.mp3")
+    jump = assets.get_sound("sound/jump.mp3")
+    checkpoint = assets.get_sound("sound/checkpoint.mp3")
+    coin = assets.get_sound("sound/coin.mp3")
     coin.set_volume(0.2) #adjust volume i would have done it more but the difference felt neglidgable
-    unlock = pygame.mixer.Sound("sound/unlock.mp3")
+    unlock = assets.get_sound("sound/unlock.mp3")
     unlock.set_volume(10.0)
-    use_powerup = pygame.mixer.Sound("sound/use powerup.mp3")
+    use_powerup = assets.get_sound("sound/use powerup.mp3")
     
     return click, level_complete, game_over, jump, checkpoint, coin, unlock, use_powerup
 
-def load_level(level_path):
+def load_assets():
+    """loads everything a level needs, for the "gameplay" asset group. also makes the player with the selected skin and loads an empty level
+    """
+    global retro_font_32, block_imgs, power_up_imgs, background_img, background_music, click_se, level_complete_se, game_over_se, jump_se, checkpoint_se, coin_se, unlock_se, use_powerup_se
+    global restart_img, play_img, pause_img, home_img, pause_menu_img, pause_menu_long_img, Hud_buttons, player
+    retro_font_32 = assets.get_font(32)
+
+    block_imgs, power_up_imgs, background_img = load_images(GRID_SIZE) #set images
+    background_music = audio.WORLD_MUSIC #set default bg music, streamed when it plays
+
+    click_se, level_complete_se, game_over_se, jump_se, checkpoint_se, coin_se, unlock_se, use_powerup_se = load_sounds() # load sounds
+
+    restart_img = assets.get_image("menu icons/restart white.png", (60, 60)) #restart image from pause menu, resized
+
+    play_img = assets.get_image("menu icons/play white.png", (60, 60)) #play image from pause menu, resized
+
+    pause_img = assets.get_image("menu icons/pause.png", (32, 32)) #pause img, resized
+
+    home_img = assets.get_image("menu icons/home white.png", (60, 60)) #home image from pause menu, resized
+
+    pause_menu_img = assets.get_image("pause menu.png", (350, None)) #image of pause menu, resized to width 350 without hurting aspect ratio
+    pause_menu_long_img = assets.get_image("pause menu long.png", (None, 175)) #long pause menu, resized to height 175
+
+    Hud_buttons = [ # add buttons to hud class
+        Hud_Buttons(760, 10, pause_img, GRID_SIZE, 1),  # Pause button (type 1)
+        Hud_Buttons(tools.SCREEN_X // 2 - button_spacing - play_img.get_width(), tools.SCREEN_Y // 2 - play_img.get_height() // 2 + button_y_offset, home_img, GRID_SIZE, 2),  # home button (type 2)
+        Hud_Buttons(tools.SCREEN_X // 2 - restart_img.get_width() // 2, tools.SCREEN_Y // 2 - restart_img.get_height() // 2 + button_y_offset, play_img, GRID_SIZE, 3), # play button (type 3)
+        Hud_Buttons(tools.SCREEN_X // 2 + button_spacing, tools.SCREEN_Y // 2 - home_img.get_height() // 2 + button_y_offset, restart_img, GRID_SIZE, 4) # restart button (type 4)
+    ]
+
+    if player is None: # not already made by the skin shop
+        if tools.selected_skin[1] == 2: #if type 2 skin
+            player = Player(tools.person_imgs, tools.selected_skin[1]) #load the player person skin
+        else: #type 1
+            player = Player(tools.type1_skins_imgs[tools.selected_skin[0]], tools.selected_skin[1]) #load image of selected skin from dict
+
+    load_level(None) # load level none to start
+
+def reset_tick_timer():
+    """starts the fixed timestep timer again with no time built up, so time spent in menus or loading isnt simulated
+    """
+    global tick_accumulator, last_frame_ticks
+    tick_accumulator = 0 # no physics time waiting to be run
+    last_frame_ticks = pygame.time.get_ticks() # count time from now
+
+def gameplay_tick():
+    """runs one fixed timestep physics tick, the player and the block animations
+    """
+    global animate_ticks
+    recorder.record(player.R_pressed, player.L_pressed, player.just_jumped) # record the inputs this tick uses so the run can be replayed
+    player.update() # run player physics
+
+    animate_ticks += 1 # move block animations along, the tile layer shows every animated block at this time
+
+    player.just_jumped = False # the jump has been used by this tick
+
+def update_camera(alpha):
+    """moves the camera to keep the player in the middle of the screen, without showing anything outside the level
+
+    Args:
+        alpha (float): how far between the last two physics ticks the player is drawn, so the camera follows the drawn player
+    """
+    global camera_x, camera_y
+    old_camera = (camera_x, camera_y)
+    x = player.prev_x + (player.x - player.prev_x) * alpha + player.length / 2 # middle of the player as it is drawn
+    y = player.prev_y + (player.y - player.prev_y) * alpha + player.length / 2
+    camera_x = round(min(max(x - tools.SCREEN_X / 2, 0), max(level_width - tools.SCREEN_X, 0))) # whole pixels so tiles dont shimmer
+    camera_y = round(min(max(y - tools.SCREEN_Y / 2, 0), max(level_height - tools.SCREEN_Y, 0)))
+    if (camera_x, camera_y) != old_camera: # everything in the level moved on the screen
+        tools.mark_dirty((0, 0, tools.SCREEN_X, tools.SCREEN_Y))
+
+def reset_level_objects():
+    """puts the powerups and key walls back, for when the player dies or restarts
+    """
+    for power_up in level_power_ups: #reset each powerup
+        power_up.reset()
+    for block in key_blocks: #close each key wall
+        block.reset()
+
+def save_run(best = False):
+    """saves the recorded run of the current level to the runs folder, as the last run and optionally the best run
+
+    Args:
+        best (bool, optional): if the run got the best time for the level. Defaults to False.
+    """
+    if not save_stats or recorder.ticks == 0: # headless or nothing recorded
+        return
+    recorder.save(os.path.join(RUNS_FOLDER, "last run.run")) # last run, for reporting bugs
+    if best and current_level: # best run, to check the time in stats.json
+        level_name = os.path.splitext(os.path.basename(current_level))[0]
+        recorder.save(os.path.join(RUNS_FOLDER, f"best {level_name}.run"))
+
+def load_level(level_path, load_media = True):
     """given level path loads entire level 
 
     Args:
         level_path (string): filepath to .adiv
+        load_media (bool, optional): if the levels custom image and music, and the games images and sounds, should be loaded.
+                                     False for the headless simulation, it only needs the grids. Defaults to True.
     """
-    global background_img, background_sound, block_grid, powerup_grid, blocks, power_ups, current_level
-    block_grid, powerup_grid, background_img, background_sound, tools.cloud_img = adiv_parser(level_path, background_img, background_sound, tools.cloud_img)   #play level x 
+    global background_img, background_music, block_grid, powerup_grid, blocks, tile_layer, trigger_index, solid_index, platform_index, wall_index, key_blocks, key_index, spawn_block, active_checkpoint, power_ups, level_power_ups, power_up_index, current_level, level_complete, finish_time, deaths
+    global level_width, level_height, camera_x, camera_y
+    if load_media:
+        assets.load("gameplay") # images, sounds and the player, the first time a level is loaded
+    old_images = (background_img, tools.cloud_img) # the last levels images, the parser holds new references to any it keeps
+    preload = loader.take_level(level_path) if load_media else None # read on the background thread by the loading screen, if it was
+    block_grid, powerup_grid, background_img, background_music, tools.cloud_img = adiv_parser(level_path, background_img, background_music, tools.cloud_img, load_media, preload)   #play level x 
+    for img in old_images: # let the cache forget the last levels background if nothing else uses it
+        assets.release_image(img)
+    level_width, level_height = len(block_grid[0]) * GRID_SIZE, len(block_grid) * GRID_SIZE # size of the level in pixels, its edges stop the player
     blocks = grid_to_class(block_grid, "Block", GRID_SIZE, block_imgs) # replace blocks in class
+    for block in blocks: # set collision rects once, before the first tick
+        block.get_rect()
+    solid_rects, platform_rects, key_blocks = make_colliders(blocks) # merged static collision rects
+    trigger_blocks = [block for block in blocks if block.type in (11, 12, 14, 15)] # special blocks, death, checkpoint and finish
+    trigger_index = make_block_index(trigger_blocks) # index special blocks by grid cell
+    wall_rects = solid_rects + platform_rects + [pygame.Rect(block.rect) for block in trigger_blocks] # everything that counts as a wall for wall jumps, key walls are checked on their own
+    # index everything the player collides with by where it is, so each tick only looks near the player
+    solid_index = make_rect_index(solid_rects, COLLISION_BUCKET)
+    platform_index = make_rect_index(platform_rects, COLLISION_BUCKET)
+    wall_index = make_rect_index(wall_rects, COLLISION_BUCKET)
+    key_index = make_block_index(key_blocks)
+    spawn_block = next((block for block in blocks if block.type == 13), None) # first spawn block, where the player starts
+    active_checkpoint = None # no checkpoint reached yet
     power_ups = grid_to_class(powerup_grid, "Power Ups", GRID_SIZE, power_up_imgs) #replace powerups in class
+    for power_up in power_ups: # set collision rects once
+        power_up.get_rect()
+    level_power_ups = [power_up for power_up in power_ups if power_up.type != 0] # only cells with a powerup can be collected
+    power_up_index = make_block_index(level_power_ups) # index powerups by grid cell
+    tile_layer = None # pre-rendered tiles, made when the level is first drawn
+    camera_x, camera_y = 0, 0 # camera starts at the top left, it moves to the player on the first frame
     player.make_new() # reset the player
 
     current_level = level_path # set current level to level path
+    level_complete = False # level hasnt been won yet
+    finish_time = 0 # no finish time yet
+    deaths = 0 # no deaths yet
+    recorder.start(level_path, player.p_type) # start recording the inputs
+    tools.request_full_update() # a new level changes the whole screen
+    reset_tick_timer() # start the level with no physics time built up
 
 
 
 # your GLOBAL variables go here
 GRID_SIZE = 50
-retro_font_32 = pygame.font.Font("upheavtt.ttf", 32)
+LEVEL_COLUMNS, LEVEL_ROWS = 16, 12 # size of a new or unreadable level in cells, one screen. levels can be any size
+CHUNK_COLUMNS, CHUNK_ROWS = 16, 12 # cells in each pre-rendered chunk of the tile layer
+CACHED_CHUNKS = 12 # most chunks of the tile layer kept drawn, the ones in view (up to 4) and the ones seen just before
+COLLISION_BUCKET = GRID_SIZE * 4 # size in pixels of the buckets collision rects are indexed by
+camera_x, camera_y = 0, 0 # top left of the part of the level on the screen, in pixels
+level_width, level_height = LEVEL_COLUMNS * GRID_SIZE, LEVEL_ROWS * GRID_SIZE # size of the current level in pixels
+animate_ticks = 0 # physics ticks run, for the animated blocks
+PLAYER_LENGTH = 35 # side length of the player in pixels
+ROTATION_STEP = 5 # degrees the cube turns each tick in the air
+player_sprites = {} # (skin, length) to the rotated or flipped images of that skin, so nothing is transformed while playing
+TICK_RATE = 60 # physics ticks per second, player.time counts these
+FPS = 60 # frames drawn per second, 0 for uncapped, doesnt change the speed of the game
+MAX_TICKS_PER_FRAME = 5 # most physics ticks to catch up on in one frame, if its further behind than this the game slows down instead
+MAX_FRAME_TIME = 250 # longest frame in ms that counts towards physics time, so a stall doesnt cause a big jump
+tick_accumulator = 0 # seconds of physics time waiting to be run
+last_frame_ticks = 0 # pygame ticks (ms) when the last frame started
 
 tools.coins, tools.complete_levels, _, tools.selected_skin = tools.read_stats() #data from stats
 
-block_imgs, power_up_imgs, background_img = load_images(GRID_SIZE) #set images
-background_sound = pygame.mixer.Sound("sound/music/Worldmap Theme.mp3") #set default bg sound
-
-click_se, level_complete_se, game_over_se, jump_se, checkpoint_se, coin_se, unlock_se, use_powerup_se = load_sounds() # load sounds
-
-restart_img = pygame.image.load("menu icons/restart white.png").convert_alpha() #restart image from pause menu
-restart_img = pygame.transform.scale(restart_img, (60, 60)) # resize
-
-play_img = pygame.image.load("menu icons/play white.png").convert_alpha() #play image from pause menu
-play_img = pygame.transform.scale(play_img, (60, 60)) #resize
-
-pause_img = pygame.image.load("menu icons/pause.png").convert_alpha() #pause img
-pause_img = pygame.transform.scale(pause_img, (32, 32)) #resize
-
-home_img = pygame.image.load("menu icons/home white.png").convert_alpha() #home image from pause menu
-home_img = pygame.transform.scale(home_img, (60, 60)) #resize
-
-pause_menu_img = pygame.image.load("pause menu.png").convert_alpha()#image of pause menu
-pause_menu_long_img = pygame.image.load("pause menu long.png").convert_alpha() #long pause menu
-
-pause_menu_img = pygame. transform.scale(pause_menu_img, (350, 350*pause_menu_img.get_height()/pause_menu_img.get_width())) # resize to width 350 without hurting aspect ratio
-pause_menu_long_img = pygame. transform.scale(pause_menu_long_img, (175*pause_menu_long_img.get_width()/pause_menu_long_img.get_height(), 175)) # resize to height 175
-
+# images, sounds, the font, hud buttons and the player, loaded with the "gameplay" asset group the first time a level is loaded
+retro_font_32 = None
+block_imgs, power_up_imgs, background_img = [], [], None
+background_music = None
+click_se = level_complete_se = game_over_se = jump_se = checkpoint_se = coin_se = unlock_se = use_powerup_se = None
+restart_img = play_img = pause_img = home_img = pause_menu_img = pause_menu_long_img = None
+Hud_buttons = []
+player = None
 button_spacing = 70  # horizontal space between buttons
 button_y_offset = 22 # y offset for buttons
+assets.declare("gameplay", load_assets, ("skins", "clouds"))
 
-Hud_buttons = [ # add buttons to hud class
-    Hud_Buttons(760, 10, pause_img, GRID_SIZE, 1),  # Pause button (type 1)
-    Hud_Buttons(tools.SCREEN_X // 2 - button_spacing - play_img.get_width(), tools.SCREEN_Y // 2 - play_img.get_height() // 2 + button_y_offset, home_img, GRID_SIZE, 2),  # home button (type 2)
-    Hud_Buttons(tools.SCREEN_X // 2 - restart_img.get_width() // 2, tools.SCREEN_Y // 2 - restart_img.get_height() // 2 + button_y_offset, play_img, GRID_SIZE, 3), # play button (type 3)
-    Hud_Buttons(tools.SCREEN_X // 2 + button_spacing, tools.SCREEN_Y // 2 - home_img.get_height() // 2 + button_y_offset, restart_img, GRID_SIZE, 4) # restart button (type 4)
-]
 pause_panel_open = False #pause panel starts as closed
 pause_panel_text = "Pause" #default text "pause"
+panel_was_open = False # if the pause panel was open last frame
+drawn_hud = None # time and powerup counts the hud showed last frame
+hud_text_imgs = [] # rendered timer and powerup amounts, only rendered again when drawn_hud changes
 
 current_level = None #no current level to start
+level_complete = False # if the current level has been won
+finish_time = 0 # player.time in ticks on the tick the level was won, the time that is saved and recorded
+deaths = 0 # times the player has died in the current level
+save_stats = True # if finishing a level writes to stats.json and the runs folder, turned off when running headless
+RUNS_FOLDER = "runs" # recorded runs are saved here
+recorder = replay.Run_Recorder() # records the inputs of each tick for replays
 
 #not for code but dictionaries to identify each block num and the description
 block_help = {0:"empty", 1:"full block", 2:"1/4 height, can phase from under", 3:"floor piece, cant penetrate", 4:"roof piece", 5:"left wall", 6:"right wall", 7:"bottom right wall", 8:"bottom left wall", 9:"top right wall", 10:"top left wall", 11:"death block, level reset if collided", 12:"checkpoint", 13:"spwan block (empty), top of player spawns on top of block", 14:"finish line block, if collided with block level is won", 15:"floor death piece", 16:"key locked wall", 17:"key block that is already collected, phase block"}
 power_ups_help = {0:"no powerup", 1:"coin for skin shop", 2:"double jump", 3:"wall jump", 4:"high jump", 5:"key"}
 
-
-if tools.selected_skin[1] == 2: #if type 2 skin
-    player = Player(tools.person_imgs, tools.selected_skin[1]) #load the player person skin
-else: #type 1
-    player = Player(tools.type1_skins_imgs[tools.selected_skin[0]], tools.selected_skin[1]) #load image of selected skin from dict
-    
-load_level(None) # load level none to start
 input_info = None # no user input info
 
 
 def run_gameplay(): # while loop of this file 
-    global screen, pause_panel_open, blocks, power_ups, player, Hud_buttons, power_up_imgs, retro_font_32, done, background_img, background_sound, input_info
+    global screen, pause_panel_open, blocks, power_ups, player, Hud_buttons, power_up_imgs, retro_font_32, done, background_img, background_music, input_info
+    global tick_accumulator, last_frame_ticks, tile_layer, panel_was_open
+    assets.load("gameplay") # images, sounds and an empty level if no level was loaded first
     # MAIN LOOP    
     screen.blit(background_img, (0,0)) #blit bg
     tools.cloud_x = tools.draw_clouds(tools.cloud_img, tools.cloud_x) #animate cloud
     
-    # Ensure background music is only played once and not overlapping
-    if background_sound is not None: 
-        if not pygame.mixer.get_busy() and not pause_panel_open:
-            background_sound.play(-1)
-        if pause_panel_open and pygame.mixer.get_busy():
-            background_sound.stop()
+    # the audio manager only starts the music if it isnt already playing, and carries on from where it was when the pause panel closes
+    if not level_complete: # stopped for the win sound
+        audio.play_music(background_music)
+    audio.pause_music(pause_panel_open and not level_complete)
     
     input_info, done = tools.check_input() #get user inputs
     
     player.R_pressed, player.L_pressed = input_info.R_pressed, input_info.L_pressed #set player class variables to user input variables
+    player.just_jumped = player.just_jumped or input_info.just_jumped # keep the jump until a physics tick uses it
     
-    if not pause_panel_open: #if the pause panel is closed
-        player.go() # run player
-
-        for block in blocks: # run blocks
-            block.go()
-            
-        for power_up in power_ups: #run powerups
-            power_up.go()
-    else: # if its open
-        player.draw() #only draw evrything dont perform other actions
-
-        for block in blocks:
-            block.draw()
-            
-        for power_up in power_ups:
-            power_up.draw()
+    # fixed timestep, run as many physics ticks as the time since the last frame needs
+    now = pygame.time.get_ticks()
+    tick_accumulator += min(now - last_frame_ticks, MAX_FRAME_TIME) / 1000 # add time passed, capped so a stall doesnt cause a big jump
+    last_frame_ticks = now
+    ticks = 0 # ticks run this frame
+    while tick_accumulator >= 1 / TICK_RATE and ticks < MAX_TICKS_PER_FRAME and not pause_panel_open:
+        gameplay_tick() # run one tick
+        tick_accumulator -= 1 / TICK_RATE
+        ticks += 1
+    if pause_panel_open: # paused, dont build up time to run later
+        tick_accumulator = 0
+    elif ticks == MAX_TICKS_PER_FRAME: # too far behind, drop the extra time instead of trying to catch up
+        tick_accumulator %= 1 / TICK_RATE
+    
+    alpha = tick_accumulator * TICK_RATE # how far into the next tick this frame is, for smooth drawing
+    if pause_panel_open: # if the pause panel is open draw the player where it is
+        alpha = 1
+    update_camera(alpha) # follow the player
+    player.draw(alpha) # draw player between ticks
+
+    if tile_layer is None: # first frame of the level, tiles are drawn as they come into view
+        tile_layer = Tile_Layer(blocks, level_power_ups, key_blocks, GRID_SIZE, (tools.SCREEN_X, tools.SCREEN_Y))
+    tile_layer.draw((camera_x, camera_y), animate_ticks) # draw blocks and powerups in view
         
     draw_hud(player.user_power_ups, power_up_imgs, retro_font_32) # draw the hud
     
     for button in Hud_buttons: # run hud buttons
         button.go()
-
-    # set player just jumped to user input class values
-    player.just_jumped = input_info.just_jumped 
-    
-
-    # this line draws everything into the window all at once
-    pygame.display.flip()
-    # this line limits the frames per second to 60
-    clock.tick(60)
+    if pause_panel_open != panel_was_open: # the pause panel opened or closed, redraw the whole screen
+        tools.request_full_update()
+        panel_was_open = pause_panel_open
+
+    # this line draws the parts of the screen that changed into the window
+    tools.update_display("gameplay")
+    # this line limits the frames per second, physics speed doesnt depend on it
+    clock.tick(FPS)
     
     return done #return done so main can close properly
     
@@ -0,0 +1,109 @@
+"""
+headless.py
+Author: Adiv Goldberg
+Date last edited: 2026-10-18
+Program: platformer headless simulation
+Description:
+-------------
+This module runs the gameplay physics without a window, sound card or any drawing, so levels and times can be checked on a server. It provides:
+- Loading a .adiv level through gameplay.adiv_parser without its custom image and music, or any of the games images, sounds and skins.
+- Stepping the player physics one fixed tick at a time from a scripted input stream.
+- A reader for simple input script files.
+- Running a level from the command line: python headless.py "level 1.adiv" inputs.txt
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy") # no window, works without an X session
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy") # no sound card needed, sounds play silently
+
+# import the pygame module
+import pygame
+import sys
+import gameplay
+
+gameplay.save_stats = False # never write times from a simulation to stats.json
+
+# your FUNCTIONS go here
+def load_level(level_path, p_type=1):
+    """loads a level for simulating, only the block and powerup grids and their collision rects, nothing is decoded
+
+    Args:
+        level_path (string): filepath to .adiv
+        p_type (int, optional): type of player to simulate, 1 for cube 2 for runner (runner has a thinner hitbox). Defaults to 1.
+    """
+    if not gameplay.Hud_buttons: # dying or finishing changes the pause panel buttons, they are never drawn
+        gameplay.Hud_buttons = [gameplay.Hud_Buttons(0, 0, None, gameplay.GRID_SIZE, button_type) for button_type in range(1, 5)]
+    skin = pygame.Surface((gameplay.PLAYER_LENGTH, gameplay.PLAYER_LENGTH)) # the skin doesnt change the physics, only the type does
+    gameplay.player = gameplay.Player([skin] * 6 if p_type == 2 else skin, p_type) # runners have 6 frames
+    gameplay.load_level(level_path, False) # load grids but not images, sounds or music
+
+def step(r_pressed, l_pressed, just_jumped):
+    """runs one physics tick with the given inputs
+
+    Args:
+        r_pressed (bool): if the right key is held
+        l_pressed (bool): if the left key is held
+        just_jumped (bool): if jump was pressed this tick
+    """
+    player = gameplay.player
+    player.R_pressed, player.L_pressed = r_pressed, l_pressed # set player inputs
+    player.just_jumped = just_jumped
+    gameplay.gameplay_tick() # run the tick
+    if gameplay.pause_panel_open and not gameplay.level_complete: # died, carry on like the play button was pressed
+        gameplay.pause_panel_open = False
+
+def run_level(level_path, inputs, p_type=1, max_ticks=None):
+    """simulates a level from start to finish with scripted inputs
+
+    Args:
+        level_path (string): filepath to .adiv
+        inputs (iterable): (right held, left held, jump pressed) for each tick
+        p_type (int, optional): type of player, 1 for cube 2 for runner. Defaults to 1.
+        max_ticks (int, optional): most ticks to run, None to run until the inputs run out. Defaults to None.
+
+    Returns:
+        tuple: if the level was finished, the time in seconds as it would be saved (the time so far if it wasnt), the number of deaths, the number of ticks run
+    """
+    load_level(level_path, p_type)
+    ticks = 0
+    for r_pressed, l_pressed, just_jumped in inputs: # go through each ticks input
+        if gameplay.level_complete or (max_ticks is not None and ticks >= max_ticks): # finished or out of time
+            break
+        step(r_pressed, l_pressed, just_jumped)
+        ticks += 1
+    time = gameplay.finish_time if gameplay.level_complete else gameplay.player.time # the finishing tick, the player counted one more after it
+    return gameplay.level_complete, round(time / gameplay.TICK_RATE, 1), gameplay.deaths, ticks
+
+def read_input_script(file_path):
+    """reads an input script, each line is a number of ticks and the keys held for them
+
+    lines look like "30 R" (hold right for 30 ticks), "1 RJ" (right and jump for 1 tick), "10" (nothing for 10 ticks)
+    R is right, L is left and J is jump, anything after a # is ignored
+
+    Args:
+        file_path (string): filepath of the script
+
+    Returns:
+        list: (right held, left held, jump pressed) for each tick
+    """
+    inputs = []
+    with open(file_path) as filehandle:
+        for line in filehandle: # go through each line
+            parts = line.split("#")[0].split() # remove comments and split into ticks and keys
+            if not parts: # empty line
+                continue
+            count = int(parts[0]) # number of ticks
+            keys = parts[1].upper() if len(parts) > 1 else "" # keys held
+            inputs += [("R" in keys, "L" in keys, "J" in keys)] * count
+    return inputs
+
+
+if __name__ == "__main__": # run a level from the command line
+    if len(sys.argv) < 3:
+        print("usage: python headless.py <level.adiv> <input script> [runner]")
+        sys.exit(1)
+    finished, time, deaths, ticks = run_level(sys.argv[1], read_input_script(sys.argv[2]), 2 if "runner" in sys.argv[3:] else 1)
+    if finished:
+        print(f"finished in {time} s ({ticks} ticks, {deaths} deaths)")
+    else:
+        print(f"not finished after {ticks} ticks ({deaths} deaths)")
+    pygame.quit()
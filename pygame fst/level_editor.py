@@ -1,7 +1,7 @@
 """ 
 level_editor.py
 Author: Adiv Goldberg
-Date last edited: 2025-06-09
+Date last edited: 2026-10-18
 Program: PLatformer level editor
 Description:
 -------------
@@ -10,14 +10,21 @@ This module provides a 2D platformer level editor built with Pygame, enabling us
 - Customization: Import and apply custom background images and music to personalize the level's aesthetic and atmosphere.
 - File Management: Save and load level designs, including block layouts, power-up placements, and custom media, for easy access and iteration.
 - Intuitive Interface: A user-friendly interface with dedicated panels for tile selection, file operations, and a clear visual representation of the level being edited.
+- Long Levels: Scroll along the level with the left and right arrow keys, scrolling past the end adds more columns to the level.
+- Loading the editor images the first time the editor is opened, not when the game starts.
+- Saving into a level pack (.adivpack) by choosing one in the save dialog, the level is added to it with its image and music.
 """
 # import the pygame module
 import pygame
-from gameplay import Blocks, Power_Ups, load_images, grid_to_class 
+from gameplay import Blocks, Power_Ups, Tile_Layer, load_images, grid_to_class 
 import tools
+import atlas
+import assets
+import level_format
+import packs
+import audio
 import gameplay
 import main_menu
-import json
 
 # will make it easier to use pygame functions
 from pygame.draw import line, rect
@@ -27,8 +34,8 @@ from tkinter import filedialog
 # initializes the pygame module
 pygame.init()
 
-# creates a screen variable of size 800 x 600
-screen = pygame.display.set_mode([tools.SCREEN_X,tools.SCREEN_Y])
+# the 800 x 600 screen made in tools, shown scaled to the window
+screen = tools.screen
 
 # controls the main game while loop
 done = False
@@ -67,6 +74,10 @@ class Level_Editor_Tiles(Blocks, Power_Ups):
         """
         run actions for this class
         """
+        if self.is_block: #if its a block
+            Blocks.animate(self) #move its animation along from blocks class
+            if self.type in (14, 15): # animated, it changes every frame
+                tools.mark_dirty((self.x, self.y, self.g_size, self.g_size))
         self.draw() #draw
         self.get_selected() #check collisions and actions
         
@@ -134,10 +145,8 @@ class File_Handler():
         self.selected = False #if its selected
         self.panel_open = False #if the panel (for loading imgs and sound) is open
         self.panel_rect = (625,self.y - 55, 100 ,50) #rect for clicking
-        self.img_impimg = pygame.image.load("menu icons/image upload.png") #img upload for panel
-        self.img_impimg = pygame.transform.scale(self.img_impimg, (self.g_size, self.g_size)) #rescale img
-        self.img_impsound = pygame.image.load("menu icons/sound upload.png") #same for import sound image
-        self.img_impsound = pygame.transform.scale(self.img_impsound, (self.g_size, self.g_size))
+        self.img_impimg = assets.get_image("menu icons/image upload.png", (self.g_size, self.g_size)) #img upload for panel, scaled
+        self.img_impsound = assets.get_image("menu icons/sound upload.png", (self.g_size, self.g_size)) #same for import sound image, scaled
     
     def go(self):
         """
@@ -198,10 +207,10 @@ class File_Handler():
                     root.destroy()
                     
                     if b_img_file_path:
+                        assets.release_image(b_img) # done with the old background
                         #try loading and scaling the image
                         try:
-                            b_img = pygame.image.load(b_img_file_path)
-                            b_img = pygame.transform.scale(b_img, (725, 543))
+                            b_img = assets.get_image(b_img_file_path, (725, 543))
                         except:
                             b_img = None
                 # Check if clicking on the sound import icon
@@ -216,12 +225,7 @@ class File_Handler():
                     root.destroy()
                     
                     if b_sound_file_path: # if there is a sound uploaded
-                        # You can now use file_path to load the sound with pygame.mixer.Sound(file_path)
-                        try: 
-                            b_sound = pygame.mixer.Sound(b_sound_file_path) #try loading the sound
-                            pygame.mixer.stop()
-                        except:
-                            b_sound = None #if you cant set no path
+                        b_sound = b_sound_file_path if audio.can_play(b_sound_file_path) else None # the audio manager streams it, if you cant set no path
 
 # your FUNCTIONS go here
 def place_on_grid(g_size):
@@ -233,13 +237,17 @@ def place_on_grid(g_size):
     """
     global select_block, select_powerup
     if not file_handler_tiles[1].panel_open: #if the panel is closed
-        for i in range(len(blocks)): # iterate through blocks
-            if pygame.Rect((blocks[i].x, blocks[i].y, g_size, g_size)).collidepoint((input_info.xMouse, input_info.yMouse)) and input_info.holding_Lmouse: # if its clicked on
-                blocks[i].type = select_block #change that block to the selected block
-                
-        for i in range(len(power_ups)): #same for powerups
-            if pygame.Rect((power_ups[i].x, power_ups[i].y, g_size, g_size)).collidepoint((input_info.xMouse, input_info.yMouse)) and input_info.holding_Rmouse:
-                power_ups[i].type = select_powerup
+        if not pygame.Rect(0, 0, GRID_SCREEN_X, GRID_SCREEN_Y).collidepoint((input_info.xMouse, input_info.yMouse)): # not over the grid
+            return
+        columns, rows = len(block_output[0]), len(block_output) # size of the level
+        col = int((input_info.xMouse + editor_camera_x) // g_size) # cell under the mouse, moved by the scroll
+        row = int(input_info.yMouse // g_size)
+        if col >= columns or row >= rows: # past the end of the level
+            return
+        if input_info.holding_Lmouse: # if its clicked on
+            blocks[row * columns + col].type = select_block #change that block to the selected block
+        if input_info.holding_Rmouse: #same for powerups
+            power_ups[row * columns + col].type = select_powerup
 
 def draw_grid(g_size, grid_screenx, grid_screeny):
     """
@@ -254,11 +262,15 @@ def draw_grid(g_size, grid_screenx, grid_screeny):
         - Draws vertical and horizontal lines to form the grid.
     """
     # Draw grid
-    # Draw vertical grid lines
-    for x in range(int(grids[0]) + 1):
-        line(screen, tools.BLACK, (x * g_size, 0), (x * g_size, grid_screeny), 1)
+    columns, rows = len(block_output[0]), len(block_output) # size of the level
+    # Draw vertical grid lines, only the ones in view
+    for x in range(int(editor_camera_x // g_size), columns + 1):
+        line_x = x * g_size - editor_camera_x # moved by the scroll
+        if line_x > grid_screenx: # rest are off the grid
+            break
+        line(screen, tools.BLACK, (line_x, 0), (line_x, grid_screeny), 1)
     # Draw horizontal grid lines
-    for y in range(int(grids[1]) + 1):
+    for y in range(rows + 1):
         line(screen, tools.BLACK, (0, y * g_size), (grid_screenx, y * g_size), 1)
         
 def draw_panels(panel_size,small_panel_size, grid_screenx, grid_screeny):
@@ -335,9 +347,9 @@ def tiles_to_panel(tile_size, b_imgs, p_imgs, g_size):
     file_tile_y = powerup_y + 10
 
     # imgs for file handler
-    save_img = pygame.image.load("menu icons/save.png").convert_alpha()
-    load_img = pygame.image.load("menu icons/load.png").convert_alpha()
-    delete_img = pygame.image.load("menu icons/delete.png").convert_alpha()
+    save_img = atlas.load_image("menu icons/save.png")
+    load_img = atlas.load_image("menu icons/load.png")
+    delete_img = atlas.load_image("menu icons/delete.png")
     #scale imgs
     save_img = pygame.transform.smoothscale(save_img, (int(file_tile_size), int(file_tile_size)))
     load_img = pygame.transform.smoothscale(load_img, (int(file_tile_size), int(file_tile_size)))
@@ -358,6 +370,51 @@ def tiles_to_panel(tile_size, b_imgs, p_imgs, g_size):
     
     return level_editor_tiles, last_powerup_x, last_block_x, file_handler_tiles
 
+def store_tiles(b_output, p_output):
+    """copies the types of the blocks and powerups being edited into the output grids
+
+    Args:
+        b_output (list): 2D list of block types, changed in place
+        p_output (list): 2D list of power-up types, changed in place
+    """
+    for block in blocks: #iterate through block
+        x, y = block.grid_location
+        b_output[y][x] = block.type #places it in grid based on location
+    for power_up in power_ups: #same for powerups
+        x, y = power_up.grid_location
+        p_output[y][x] = power_up.type
+
+def add_column():
+    """adds an empty column to the right end of the level, for making levels longer than the screen.
+    only the new cells are made, the placed tiles and the tiles already pre-rendered are kept
+    """
+    global blocks, power_ups
+    columns, rows = len(block_output[0]), len(block_output)
+    new_blocks = [Blocks(0, (columns, row), GRID_SIZE_LE, block_imgs) for row in range(rows)] # empty cell at the end of every row
+    new_power_ups = [Power_Ups(0, (columns, row), GRID_SIZE_LE, power_up_imgs) for row in range(rows)]
+    for row in range(rows):
+        block_output[row].append(0)
+        power_up_output[row].append(0)
+    # the cells are stored row by row, so each new cell goes after the last one in its row
+    blocks = [block for row in range(rows) for block in blocks[row * columns:(row + 1) * columns] + [new_blocks[row]]]
+    power_ups = [power_up for row in range(rows) for power_up in power_ups[row * columns:(row + 1) * columns] + [new_power_ups[row]]]
+    tile_layer.add_tiles(new_blocks, new_power_ups, new_blocks) # any block can change when placing
+
+def scroll_editor():
+    """scrolls the grid with the left and right arrow keys, scrolling past the end of the level makes it longer
+    """
+    global editor_camera_x
+    old_camera_x = editor_camera_x
+    if input_info.R_pressed: # scroll right
+        editor_camera_x += EDITOR_SCROLL_SPEED
+        if editor_camera_x > len(block_output[0]) * GRID_SIZE_LE - GRID_SCREEN_X: # past the end, add a column to scroll into
+            add_column()
+    if input_info.L_pressed: # scroll left
+        editor_camera_x -= EDITOR_SCROLL_SPEED
+    editor_camera_x = int(min(max(editor_camera_x, 0), max(len(block_output[0]) * GRID_SIZE_LE - GRID_SCREEN_X, 0))) # stay in the level, whole pixels so tiles line up
+    if editor_camera_x != old_camera_x: # the whole grid moved
+        tools.request_full_update()
+
 def save_level(b_output,p_output, img = None, music = None):
     """Saves the current level data to a file.
 
@@ -374,14 +431,13 @@ def save_level(b_output,p_output, img = None, music = None):
         music (str, optional): File path to the level's music. Defaults to None.
     """
     global blocks, power_ups
-    for block in blocks: #iterate through block
-        x, y = block.grid_location
-        b_output[y][x] = block.type #places it in grid based on location
-    for power_up in power_ups: #same for powerups
-        x, y = power_up.grid_location
-        p_output[y][x] = power_up.type
-        
-    data = {'blocks': b_output, 'powerups' : p_output} #write that list as data to save file
+    store_tiles(b_output, p_output) # put the placed tiles in the grids
+
+    # dont save empty columns scrolled past at the end, levels are always at least a screen wide
+    columns = len(b_output[0])
+    while columns > gameplay.LEVEL_COLUMNS and not any(row[columns - 1] for row in b_output) and not any(row[columns - 1] for row in p_output):
+        columns -= 1
+    data = {'blocks': [row[:columns] for row in b_output], 'powerups' : [row[:columns] for row in p_output]} #write that list as data to save file
     
     # Hide the root window (prevents the Tkinter window from showing)
     root = tk.Tk()
@@ -390,28 +446,22 @@ def save_level(b_output,p_output, img = None, music = None):
     # Ask the user for a file name and location to save
     file_path = filedialog.asksaveasfilename(
         defaultextension=".adiv",  # Default file extension for saved files
-        filetypes=[("Adiv Level Files", "*.adiv"), ("All Files", "*.*")],  # File type filters
+        filetypes=[("Adiv Level Files", "*.adiv"), ("Adiv Level Packs", "*" + packs.PACK_EXTENSION), ("All Files", "*.*")],  # File type filters, choosing a pack adds the level to it
         title="Save Level As"  # Dialog window title
     )
     root.destroy()
 
     # If the user selected a file path
     if file_path:
-        # Open the file for writing
-        with open(file_path, 'w') as filehandle:
-            # Save the level data as JSON to the file
-            # Save image and music file paths
-            if img is not None and img != "background.png":
-                try:
-                    data['image'] = img
-                except:
-                    pass #image doesnt load
-            if music is not None:
-                try:
-                    data['music'] = music
-                except:
-                    pass #music doesnt load
-            json.dump(data, filehandle) #place data in file
+        # Save image and music file paths
+        if img is not None and img != "background.png":
+            data['image'] = img
+        if music is not None:
+            data['music'] = music
+        if file_path.lower().endswith(packs.PACK_EXTENSION): # Add it to a level pack, with copies of its image and music
+            packs.add_level(file_path, data)
+        else:
+            level_format.write_level(file_path, data) # Save the level data in the binary format
 
     return b_output, p_output
 
@@ -421,36 +471,52 @@ def load_level_e(level_path):
     Args:
         level_path (string): file path of level
     """
-    global block_output, power_up_output, b_img, b_sound, blocks, power_ups
-    block_output, power_up_output, b_img, b_sound, _ = gameplay.adiv_parser(level_path, b_img, b_sound) #load file to edit or None for new file
+    global block_output, power_up_output, b_img, b_sound, blocks, power_ups, tile_layer, editor_camera_x
+    assets.load("level_editor") # the tile images, the first time the editor is opened
+    old_img = b_img # the parser holds a new reference if it keeps it
+    block_output, power_up_output, b_img, b_sound, clouds = gameplay.adiv_parser(level_path, b_img, b_sound) #load file to edit or None for new file
+    assets.release_image(old_img) # the editor doesnt draw clouds, and the old background can be forgotten if nothing else uses it
+    assets.release_image(clouds)
     blocks, power_ups = grid_to_class(block_output, "Block", GRID_SIZE_LE, block_imgs), grid_to_class(power_up_output, "Powerups", GRID_SIZE_LE, power_up_imgs)
+    tile_layer = Tile_Layer(blocks, power_ups, blocks, GRID_SIZE_LE, (GRID_SCREEN_X, GRID_SCREEN_Y)) # pre-render the tiles, any block can change when placing
+    editor_camera_x = 0 # start at the left of the level
+
+def load_assets():
+    """loads the tile images and makes the panels, for the "level_editor" asset group. then starts a new level
+    """
+    global b_img, block_imgs, power_up_imgs, background_img, level_editor_tiles, last_powerup_x, last_block_x, file_handler_tiles
+    b_img = assets.get_image("background.png", (tools.SCREEN_X, tools.SCREEN_Y)) # default background, shared with gameplay
+    block_imgs, power_up_imgs, background_img = load_images(GRID_SIZE_LE) #load images
+    level_editor_tiles, last_powerup_x, last_block_x, file_handler_tiles = tiles_to_panel(GRID_SIZE_LE, block_imgs, power_up_imgs, GRID_SIZE_LE) #create panel and some buttons
+    load_level_e(None) # new level to start
 
 # your GLOBAL variables go here
 GRID_SIZE_LE = gameplay.GRID_SIZE
 
-b_img = pygame.image.load("background.png").convert_alpha() 
+b_img = None # background, loaded when the editor is first opened
 b_img_file_path = "background.png" #start bg file_path
 b_sound = None #default sound (none)
 b_sound_file_path = None 
 
-block_output, power_up_output, b_img, b_sound, _ = gameplay.adiv_parser(None, b_img, b_sound) #load file to edit or None for new file
-
 select_block = 0 #start at eraser
 select_powerup = 0
 
-grids = (tools.SCREEN_X/GRID_SIZE_LE, tools.SCREEN_Y/GRID_SIZE_LE) #grid dimensions
+editor_camera_x = 0 # how far the grid is scrolled to the right, in pixels
+EDITOR_SCROLL_SPEED = 10 # pixels the grid scrolls each frame an arrow key is held
 PANEL_SIZE = 75 # size of bigger panel
 SMALL_PANEL_SIZE = PANEL_SIZE * min(tools.SCREEN_X,tools.SCREEN_Y) / max(tools.SCREEN_X,tools.SCREEN_Y) #size of smaller panel
 GRID_SIZE_LE = (GRID_SIZE_LE/tools.SCREEN_X)*(tools.SCREEN_X - PANEL_SIZE) #grid size with panel 
 GRID_SCREEN_X, GRID_SCREEN_Y = (tools.SCREEN_X - PANEL_SIZE, tools.SCREEN_Y - SMALL_PANEL_SIZE) #screen size ignoring panels
 if tools.SCREEN_Y > tools.SCREEN_X: #flip them if the y screen is bigger than x
     GRID_SCREEN_X, GRID_SCREEN_Y = (tools.SCREEN_X - SMALL_PANEL_SIZE, tools.SCREEN_Y - PANEL_SIZE)
-    
-block_imgs, power_up_imgs, background_img = load_images(GRID_SIZE_LE) #load images
-
-blocks, power_ups = grid_to_class(block_output, "Block", GRID_SIZE_LE, block_imgs), grid_to_class(power_up_output, "Powerups", GRID_SIZE_LE, power_up_imgs) #place blocks and powerups in class
 
-level_editor_tiles, last_powerup_x, last_block_x, file_handler_tiles = tiles_to_panel(GRID_SIZE_LE, block_imgs, power_up_imgs, GRID_SIZE_LE) #create panel and some buttons
+# images, panels and the level being edited, loaded with the "level_editor" asset group
+block_imgs, power_up_imgs, background_img = [], [], None
+block_output, power_up_output = [], []
+blocks, power_ups = [], []
+tile_layer = None
+level_editor_tiles, last_powerup_x, last_block_x, file_handler_tiles = [], 0, 0, []
+assets.declare("level_editor", load_assets, ("main_menu",))
 
 input_info = None #button info
 
@@ -464,16 +530,18 @@ input_info = None #button info
 def run_level_editor(): #while loop
     global screen, b_img, b_sound, PANEL_SIZE, SMALL_PANEL_SIZE, GRID_SIZE_LE, b_img_file_path, b_sound_file_path
     global block_imgs, power_up_imgs, background_img, block_output, power_up_output, blocks, power_ups
-    global level_editor_tiles, last_powerup_x, last_block_x, file_handler_tiles, input_info, done #split globals into a few lines for organization
+    global level_editor_tiles, last_powerup_x, last_block_x, file_handler_tiles, input_info, done, tile_layer #split globals into a few lines for organization
+    assets.load("level_editor") # images and a new level, if the editor was opened without loading one
     screen.fill(tools.WHITE)
     if b_img is not None: #if there is an image
         screen.blit(b_img, (0,0)) #blit it
         
-    if b_sound is not None: #play bg sound if it exists
-        if not pygame.mixer.get_busy(): #prevent echo
-            b_sound.play(-1)
+    audio.play_music(b_sound) #play bg music if it exists, the audio manager only starts it once
 
     input_info, done = tools.check_input() # get user inputs
+    if input_info.left_mouse_down or input_info.right_mouse_down or input_info.holding_Lmouse or input_info.holding_Rmouse: # placing tiles or clicking buttons can change anything
+        tools.request_full_update()
+    scroll_editor() # arrow keys move along the level
     
     #draw grid and panels
     draw_grid(GRID_SIZE_LE, GRID_SCREEN_X, GRID_SCREEN_Y)
@@ -484,11 +552,7 @@ def run_level_editor(): #while loop
     for tile in level_editor_tiles:
         tile.go() #run leevel editor tiles
     
-    for block in blocks: # run blocks
-        block.go()
-        
-    for power_up in power_ups: # run powerups
-        power_up.go()
+    tile_layer.go((editor_camera_x, 0)) # run blocks and powerups in view, only changed tiles are redrawn
         
     for tile in file_handler_tiles:
         tile.go() #run file handler tiles
@@ -496,16 +560,15 @@ def run_level_editor(): #while loop
     screen.blit(main_menu.back_button, (745,545)) #blit back button
     back = main_menu.back_button_collide((745,545), 50, "level_editor_menu", input_info.left_mouse_down, input_info.xMouse, input_info.yMouse) #check for collision
     if back: # if you go back reset img and sound
-        b_img = pygame.image.load("background.png").convert_alpha() 
+        assets.release_image(b_img) # done with the levels background
+        b_img = assets.get_image("background.png", (tools.SCREEN_X, tools.SCREEN_Y))
         b_img_file_path = "background.png" #start bg file_path
-        if b_sound is not None: #if there is a sound
-            b_sound.stop()
-        b_sound = None
+        b_sound = None # the menu music takes over
         b_sound_file_path = None
     
 
-    # this line draws everything into the window all at once
-    pygame.display.flip()
+    # this line draws the parts of the screen that changed into the window
+    tools.update_display("level_editor")
     # this line limits the frames per second to 60
     clock.tick(60)
     
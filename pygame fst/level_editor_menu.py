@@ -14,14 +14,15 @@ This module implements the level editor for the platformer game. It provides a u
 # import the pygame module
 import pygame
 import tools
+import assets
 import main_menu
 from main_menu import Menu_Buttons
 
 # initializes the pygame module
 pygame.init()
 
-# creates a screen variable of size 800 x 600
-screen = pygame.display.set_mode([tools.SCREEN_X,tools.SCREEN_Y])
+# the 800 x 600 screen made in tools, shown scaled to the window
+screen = tools.screen
 
 # controls the main game while loop
 done = False
@@ -29,32 +30,39 @@ done = False
 # sets the frame rate of the program
 clock = pygame.time.Clock()
 
-# your GLOBAL variables go here
-menu_background = pygame.image.load("level editor menu.png").convert_alpha() # Load the background image for the level editor menu
-menu_background = pygame.transform.scale(menu_background, (tools.SCREEN_X, tools.SCREEN_Y)) # Scale the background to fit the screen
+# your FUNCTIONS go here
+def load_assets():
+    """Loads the level editor menu background and buttons, for the "level_editor_menu" asset group.
+    """
+    global menu_background, play_img, new_img, load_img, lem_buttons
+    menu_background = assets.get_image("level editor menu.png", (tools.SCREEN_X, tools.SCREEN_Y)) # Load the background image for the level editor menu scaled to fit the screen
 
-play_img = pygame.image.load("menu icons/play circle.png").convert_alpha() # Load the play button image
-play_length = 225
-play_img = pygame.transform.scale(play_img, (play_length,play_length)) # Scale the play button image to fit the button size
+    play_img = assets.get_image("menu icons/play circle.png", (play_length,play_length)) # Load the play button image, scaled
 
-new_img = pygame.image.load("menu icons/new white.png").convert_alpha() # Load the new level button image
-new_length = 125
-new_img = pygame.transform.scale(new_img, (new_length,new_length)) # Scale the new level button image to fit the button size
+    new_img = assets.get_image("menu icons/new white.png", (new_length,new_length)) # Load the new level button image, scaled
 
-load_img = pygame.image.load("menu icons/load white.png").convert_alpha() # Load the load level button image
-load_length = 125
-load_img = pygame.transform.scale(load_img, (load_length,load_length)) # Scale the load level button image to fit the button size
+    load_img = assets.get_image("menu icons/load white.png", (load_length,load_length)) # Load the load level button image, scaled
+
+    lem_buttons = [ # List of buttons for the level editor menu
+        Menu_Buttons(281, 217,play_img, 5, play_length), #play button, type 5
+        Menu_Buttons(62, 301,new_img, 6, new_length), #edit new button, type 6
+        Menu_Buttons(613, 296,load_img, 7, load_length) #load and edit button, type 7
+    ]
 
-lem_buttons = [ # List of buttons for the level editor menu
-    Menu_Buttons(281, 217,play_img, 5, play_length), #play button, type 5
-    Menu_Buttons(62, 301,new_img, 6, new_length), #edit new button, type 6
-    Menu_Buttons(613, 296,load_img, 7, load_length) #load and edit button, type 7
-]
+# your GLOBAL variables go here
+menu_background = None # images and buttons, loaded the first time the menu is shown
+play_img = new_img = load_img = None
+lem_buttons = []
+play_length = 225 # sizes of the buttons
+new_length = 125
+load_length = 125
+assets.declare("level_editor_menu", load_assets, ("main_menu",))
 
 
 # MAIN LOOP
 def run_level_editor_menu(): #while loop for the level editor menu
     global screen, menu_background, play_img, play_length, new_img, new_length, load_img, load_length, lem_buttons, done
+    assets.load("level_editor_menu") # load the images the first time the menu is shown
     
     screen.blit(menu_background, (0, 0)) # Draw the background image onto the screen
         
@@ -68,8 +76,8 @@ def run_level_editor_menu(): #while loop for the level editor menu
     for button in lem_buttons:
         button.go() # Call the go method for each button in the lem_buttons list to handle their actions
 
-    # this line draws everything into the window all at once
-    pygame.display.flip()
+    # this line draws the parts of the screen that changed into the window
+    tools.update_display("level_editor_menu")
     # this line limits the frames per second to 60
     clock.tick(60)
     
@@ -0,0 +1,264 @@
+"""
+level_format.py
+Author: Adiv Goldberg
+Date last edited: 2026-10-18
+Program: platformer binary level format
+Description:
+-------------
+This module reads and writes .adiv levels in a small binary format, and still reads the old JSON ones. It provides:
+- A versioned binary format: a header with the size of the level, a table of the image and music paths the level uses (each path stored once),
+  then the blocks and powerups as one byte per cell, run length encoded when that is smaller.
+- Reading either format by looking at the start of the file, so JSON levels keep working without being converted.
+- Writing levels in either format, safely through a temporary file.
+- Converting whole folders of levels from one format to the other from the command line:
+  python level_format.py binary "levels folder" or python level_format.py json "level 1.adiv"
+"""
+import json
+import os
+import struct
+import sys
+
+LEVEL_MAGIC = b"ADIVLV" # start of every binary level, JSON levels start with {
+LEVEL_VERSION = 1 # version of the binary format
+LEVEL_HEADER = struct.Struct("<6sBBHHB") # magic, version, flags (none yet), columns, rows, number of paths in the table
+PATH_LENGTH = struct.Struct("<H") # length of each path in the table
+LEVEL_REFS = struct.Struct("<BB") # table index of the image and music, NO_REF if the level has none
+LAYER_HEADER = struct.Struct("<BI") # encoding of a layer and how many bytes it takes
+NO_REF = 255 # no image or music
+RAW, RLE = 0, 1 # layer encodings, one byte per cell or (count, value) pairs
+CELL_BYTES = [bytes((value,)) for value in range(256)] # each cell value as a byte, made once so decoding runs doesnt make them again
+
+# your FUNCTIONS go here
+def rle_encode(cells):
+    """run length encodes a layer
+
+    Args:
+        cells (bytes): one byte per cell
+
+    Returns:
+        bytes: (count, value) pairs, counts up to 255
+    """
+    encoded = bytearray()
+    i = 0
+    while i < len(cells):
+        value = cells[i]
+        run = 1
+        while i + run < len(cells) and cells[i + run] == value and run < 255: # how many cells in a row are the same
+            run += 1
+        encoded += bytes((run, value))
+        i += run
+    return bytes(encoded)
+
+def rle_decode(encoded):
+    """decodes a run length encoded layer
+
+    Args:
+        encoded (bytes): (count, value) pairs
+
+    Returns:
+        bytes: one byte per cell
+    """
+    return b"".join([CELL_BYTES[value] * count for count, value in zip(encoded[0::2], encoded[1::2])])
+
+def encode_layer(grid):
+    """turns a grid into a layer, run length encoded if thats smaller
+
+    Args:
+        grid (list): rows of cell values from 0 to 255
+
+    Returns:
+        bytes: the layer with its header
+    """
+    cells = bytes(value for row in grid for value in row) # raises ValueError if a value doesnt fit in a byte
+    encoded = rle_encode(cells)
+    if len(encoded) < len(cells): # most levels are mostly empty, so this is usually much smaller
+        return LAYER_HEADER.pack(RLE, len(encoded)) + encoded
+    return LAYER_HEADER.pack(RAW, len(cells)) + cells
+
+def encode_level(data):
+    """turns a level into the binary format
+
+    Args:
+        data (dict): the level like the JSON format, "blocks" and "powerups" grids the same size and optionally "image" and "music" paths
+
+    Returns:
+        bytes: the binary level
+
+    Raises:
+        ValueError: if the grids are empty or not the same size
+    """
+    blocks, powerups = data["blocks"], data["powerups"]
+    if not blocks or not blocks[0]: # the header needs a size
+        raise ValueError("a level needs at least one row and column")
+    rows, columns = len(blocks), len(blocks[0])
+    if len(powerups) != rows or any(len(row) != columns for row in blocks + powerups): # both layers share the header size
+        raise ValueError("blocks and powerups must be the same size")
+    paths = [] # each path once
+    refs = []
+    for key in ("image", "music"):
+        path = data.get(key)
+        if path is None:
+            refs.append(NO_REF)
+            continue
+        if path not in paths:
+            paths.append(path)
+        refs.append(paths.index(path))
+    out = [LEVEL_HEADER.pack(LEVEL_MAGIC, LEVEL_VERSION, 0, columns, rows, len(paths))]
+    for path in paths: # the path table
+        encoded = path.encode("utf-8")
+        out.append(PATH_LENGTH.pack(len(encoded)) + encoded)
+    out.append(LEVEL_REFS.pack(*refs))
+    out.append(encode_layer(blocks))
+    out.append(encode_layer(powerups))
+    return b"".join(out)
+
+def decode_level(raw):
+    """reads a binary level
+
+    Args:
+        raw (bytes): the whole file
+
+    Returns:
+        dict: the level like the JSON format
+
+    Raises:
+        ValueError: if it isnt a binary level this version can read, or is cut off
+    """
+    try:
+        magic, version, flags, columns, rows, path_count = LEVEL_HEADER.unpack_from(raw)
+        if magic != LEVEL_MAGIC or version != LEVEL_VERSION:
+            raise ValueError("not a binary level this version can read")
+        at = LEVEL_HEADER.size
+        paths = []
+        for _ in range(path_count): # the path table
+            length, = PATH_LENGTH.unpack_from(raw, at)
+            at += PATH_LENGTH.size
+            paths.append(raw[at:at + length].decode("utf-8"))
+            at += length
+        refs = LEVEL_REFS.unpack_from(raw, at)
+        at += LEVEL_REFS.size
+        layers = []
+        for _ in range(2): # blocks then powerups
+            encoding, length = LAYER_HEADER.unpack_from(raw, at)
+            at += LAYER_HEADER.size
+            cells = raw[at:at + length]
+            at += length
+            if encoding == RLE:
+                cells = rle_decode(cells)
+            if len(cells) != columns * rows: # cut off
+                raise ValueError("layer is the wrong size")
+            layers.append([list(cells[row * columns:(row + 1) * columns]) for row in range(rows)]) # one slice per row, straight from the bytes
+    except (struct.error, IndexError, UnicodeDecodeError) as error:
+        raise ValueError(f"broken binary level: {error}")
+    data = {"blocks": layers[0], "powerups": layers[1]}
+    for key, ref in zip(("image", "music"), refs):
+        if ref != NO_REF and ref < len(paths):
+            data[key] = paths[ref]
+    return data
+
+def read_level(file_path):
+    """reads a level in either format
+
+    Args:
+        file_path (string): filepath of the .adiv file
+
+    Returns:
+        dict: the level, "blocks" and "powerups" grids and maybe "image" and "music"
+
+    Raises:
+        OSError, ValueError: if it cant be read or isnt a level
+    """
+    with open(file_path, "rb") as filehandle:
+        return parse_level(filehandle.read())
+
+def parse_level(raw):
+    """parses a level in either format, by looking at how it starts
+
+    Args:
+        raw (bytes): the whole .adiv file
+
+    Returns:
+        dict: the level, "blocks" and "powerups" grids and maybe "image" and "music"
+
+    Raises:
+        ValueError: if it isnt a level
+    """
+    if raw.startswith(LEVEL_MAGIC): # binary
+        return decode_level(raw)
+    return json.loads(raw.decode("utf-8")) # the old JSON format
+
+def is_binary(file_path):
+    """checks if a level is in the binary format, only reads its first few bytes
+
+    Args:
+        file_path (string): filepath of the .adiv file
+
+    Returns:
+        bool: True if it is binary
+    """
+    with open(file_path, "rb") as filehandle:
+        return filehandle.read(len(LEVEL_MAGIC)) == LEVEL_MAGIC
+
+def write_level(file_path, data, binary = True):
+    """writes a level, to a temporary file first so a crash never leaves half a level
+
+    Args:
+        file_path (string): filepath of the .adiv file
+        data (dict): the level, like read_level gives
+        binary (bool, optional): write the binary format, False for JSON. Defaults to True.
+    """
+    raw = encode_level(data) if binary else json.dumps(data).encode("utf-8")
+    with open(file_path + ".tmp", "wb") as filehandle:
+        filehandle.write(raw)
+    os.replace(file_path + ".tmp", file_path)
+
+def find_levels(paths):
+    """finds every .adiv file in some files and folders
+
+    Args:
+        paths (list): files and folders, folders are searched all the way down
+
+    Returns:
+        list: filepaths of the levels
+    """
+    levels = []
+    for path in paths:
+        if os.path.isdir(path): # every level in the folder
+            for folder, _, names in os.walk(path):
+                levels += [os.path.join(folder, name) for name in sorted(names) if name.lower().endswith(".adiv")]
+        else:
+            levels.append(path)
+    return levels
+
+def convert_levels(paths, binary = True):
+    """converts levels to a format in place, levels already in it are left alone
+
+    Args:
+        paths (list): files and folders of levels
+        binary (bool, optional): convert to binary, False for JSON. Defaults to True.
+
+    Returns:
+        tuple: number converted, number already in the format, list of (filepath, error) that couldnt be read
+    """
+    converted, skipped, failed = 0, 0, []
+    for level_path in find_levels(paths):
+        try:
+            if is_binary(level_path) == binary: # already in that format
+                skipped += 1
+                continue
+            write_level(level_path, read_level(level_path), binary)
+            converted += 1
+        except (OSError, ValueError, KeyError, IndexError, TypeError) as error: # not a level, leave it alone
+            failed.append((level_path, error))
+    return converted, skipped, failed
+
+
+if __name__ == "__main__": # convert levels from the command line
+    if len(sys.argv) < 3 or sys.argv[1] not in ("binary", "json"):
+        print("usage: python level_format.py binary|json <level files or folders>...")
+        sys.exit(1)
+    converted, skipped, failed = convert_levels(sys.argv[2:], sys.argv[1] == "binary")
+    print(f"converted {converted} levels to {sys.argv[1]}, {skipped} already were")
+    for level_path, error in failed:
+        print(f"couldnt convert {level_path}: {error}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,136 @@
+"""
+loader.py
+Author: Adiv Goldberg
+Date last edited: 2026-10-18
+Program: platformer background level loader
+Description:
+-------------
+This module reads levels on a background thread, so the window keeps drawing while a big custom background is decoded. It provides:
+- Preloading a level: reading its .adiv file and decoding and scaling its custom image off the main thread (its music is streamed by audio while it plays, so there is nothing to decode).
+- How far a preload has got, for drawing a loading bar.
+- Handing a finished preload to gameplay.load_level, which converts the image for the display on the main thread (converting needs the display).
+- Prefetching the next level while the current one is played, so starting it is instant.
+"""
+import threading
+import queue
+import tools
+import assets
+import packs
+from collections import OrderedDict
+
+MAX_PRELOADS = 3 # most finished preloads to keep waiting to be used, decoded images take a lot of memory
+PRELOAD_STEPS = 2 # reading the file and the image, for the loading bar
+
+#CLASSES
+class Preload:
+    def __init__(self, level_path):
+        """a level being read on the background thread
+
+        Args:
+            level_path (string): filepath to .adiv
+        """
+        self.level_path = level_path
+        self.mtime = get_mtime(level_path) # to notice if the level is saved again before its used
+        self.data = None # the parsed .adiv file, None if it couldnt be read
+        self.image = None # the custom image decoded and scaled to the screen, not converted yet
+        self.steps_done = 0 # how many of PRELOAD_STEPS are finished
+        self.done = threading.Event() # set when everything is read
+
+    def progress(self):
+        """how far the preload has got
+
+        Returns:
+            float: 0 to 1
+        """
+        return 1.0 if self.done.is_set() else self.steps_done / PRELOAD_STEPS
+
+    def read(self):
+        """reads everything, runs on the background thread. anything that fails is left as None and loaded the normal way on the main thread
+        """
+        try:
+            self.data = packs.read_level(self.level_path) # read and parse the level, binary or JSON, on its own or in a level pack
+        except: # loaded the normal way, which falls back to an empty level
+            self.data = None
+        self.steps_done = 1
+        if isinstance(self.data, dict):
+            try:
+                self.image = assets.decode_image(self.data.get("image"), (tools.SCREEN_X, tools.SCREEN_Y)) # decode and scale the custom image
+            except: # no image or it cant be loaded, the default is used
+                self.image = None
+        self.steps_done = 2
+
+
+# your FUNCTIONS go here
+def get_mtime(path):
+    """gets when a file was last changed
+
+    Args:
+        path (string): filepath, or path into a level pack
+
+    Returns:
+        float: modification time, None if the file doesnt exist
+    """
+    try:
+        return packs.get_mtime(path)
+    except (OSError, TypeError):
+        return None
+
+def preload_level(level_path):
+    """starts reading a level on the background thread, if it isnt already being read
+
+    Args:
+        level_path (string): filepath to .adiv
+
+    Returns:
+        Preload: the preload, check its done event or progress to know when its read
+    """
+    global worker
+    preload = preloads.get(level_path)
+    if preload is not None and preload.mtime == get_mtime(level_path): # already read or being read
+        preloads.move_to_end(level_path)
+        return preload
+    preload = Preload(level_path)
+    preloads[level_path] = preload
+    while len(preloads) > MAX_PRELOADS: # forget the oldest finished preload, ones still being read are kept
+        oldest = next((path for path, waiting in preloads.items() if waiting.done.is_set() and path != level_path), None)
+        if oldest is None:
+            break
+        del preloads[oldest]
+    jobs.put(preload)
+    if worker is None: # first preload, start the thread
+        worker = threading.Thread(target=work, name="level loader", daemon=True) # daemon so it never stops the game closing
+        worker.start()
+    return preload
+
+def take_level(level_path):
+    """takes the preload of a level to load it, waiting for it to finish if its still being read
+
+    Args:
+        level_path (string): filepath to .adiv
+
+    Returns:
+        Preload: the finished preload, None if the level wasnt preloaded or has changed since
+    """
+    preload = preloads.pop(level_path, None)
+    if preload is None:
+        return None
+    preload.done.wait() # usually already done, the loading screen waits for it
+    if preload.mtime != get_mtime(level_path): # saved again since it was read
+        return None
+    return preload
+
+def work():
+    """reads preloads one at a time, runs on the background thread forever
+    """
+    while True:
+        preload = jobs.get() # wait for the next level
+        try:
+            preload.read()
+        finally:
+            preload.done.set() # always finish, so nothing waits forever
+
+
+# your GLOBAL variables go here
+preloads = OrderedDict() # level path to its Preload, oldest first
+jobs = queue.Queue() # preloads waiting for the background thread
+worker = None # the background thread, started by the first preload
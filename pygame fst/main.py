@@ -1,42 +1,46 @@
 """ 
 main.py
 Author: Adiv Goldberg
-Date last edited: 2025-06-09
+Date last edited: 2026-10-18
 Program: platformer main module
 Description:
 -------------
 This module implements the main functionality for the platformer game. It provides a user-friendly interface for accessing different game modes, including:
 - A main menu for starting the game or accessing other options.
 - A gameplay mode for playing the game.
+- Music streamed by the audio manager, fading between the menu, level and level editor tracks.
 - A level editor for creating and editing levels.
-- A play menu for selecting and starting levels.
+- A play menu for selecting and starting levels, with a loading screen while a level is read.
 - An about menu for displaying information about the game.
 - A skin shop for customizing the player's character.
 """
-# import the pygame module
-import pygame
-import gameplay, level_editor, main_menu, play_menu, level_editor_menu, about_menu, skin_shop
-import tools
-
-# initializes the pygame module
-pygame.init()
+if __name__ == "__main__": # if this is the file its being run from, then run the main loop
+    # everything is in here, the processes drawing level previews run this file again and only need the module they draw with
+    # import the pygame module
+    import pygame
+    import gameplay, level_editor, main_menu, play_menu, level_editor_menu, about_menu, skin_shop
+    import tools
+    import assets
+    import audio
+    import stats
+    import thumbnails
 
-# creates a screen variable of size 800 x 600
-screen = pygame.display.set_mode([tools.SCREEN_X,tools.SCREEN_Y])
+    # initializes the pygame module
+    pygame.init()
 
-# controls the main game while loop
-done = False
+    # the 800 x 600 screen made in tools, shown scaled to the window
+    screen = tools.screen
 
-# sets the frame rate of the program
-clock = pygame.time.Clock()
+    # controls the main game while loop
+    done = False
 
-# your GLOBAL variables go here
+    # sets the frame rate of the program
+    clock = pygame.time.Clock()
 
-pygame.mixer.music.load("sound/music/intro Theme.mp3")
+    # your GLOBAL variables go here
 
-pygame.display.set_caption("Adiv's Platformer")
+    pygame.display.set_caption("Adiv's Platformer")
 
-if __name__ == "__main__": # if this is the file its being run from, then run the main loop
     # MAIN LOOP
     while not done:
         # makes the background the colour WHITE
@@ -49,6 +53,8 @@ if __name__ == "__main__": # if this is the file its being run from, then run th
             done = gameplay.run_gameplay()
         elif tools.game_state == "update_play_menu":
             done = play_menu.update_play_menu()
+        elif tools.game_state == "loading_level":
+            done = play_menu.run_loading_level()
         elif tools.game_state == "play_menu":
             done = play_menu.run_play_menu()
         elif tools.game_state == "level_editor":
@@ -60,11 +66,16 @@ if __name__ == "__main__": # if this is the file its being run from, then run th
         elif tools.game_state == "skin_shop":
             done = skin_shop.run_skin_shop()
         
-        # if its in the listed game states or level complete is playing, play the music, otherwise stop it
-        if tools.game_state in ["main_menu", "play_menu", "about_menu", "level_editor_menu", "skin_shop"] and not gameplay.level_complete_se.get_num_channels():
-            if not pygame.mixer.music.get_busy():
-                pygame.mixer.music.play(-1)
-        else:
-            if pygame.mixer.music.get_busy():
-                pygame.mixer.music.stop()
+        # if its in the listed game states the menu music plays once level complete has finished, gameplay and the level editor ask for their own music
+        level_complete_playing = assets.is_loaded("gameplay") and audio.is_playing("ui", gameplay.level_complete_se) # no level has been loaded if gameplay isnt loaded
+        if tools.game_state in ["main_menu", "play_menu", "about_menu", "level_editor_menu", "skin_shop"]:
+            if level_complete_playing:
+                audio.stop_music()
+            else:
+                audio.play_music(audio.MENU_MUSIC)
+        elif tools.game_state == "loading_level": # quiet while the level loads
+            audio.stop_music()
+        audio.update() # fade between tracks
+    stats.close() # save any stats the background thread hasnt saved yet
+    thumbnails.close() # stop drawing level previews
     pygame.quit()
\ No newline at end of file
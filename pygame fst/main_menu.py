@@ -8,7 +8,7 @@ Description:
 This module implements the main menu and navigation system for the platformer level editor. It provides a user-friendly interface for accessing different sections of the program, including:
 - Main menu with options to play the game, access information, visit the in-game shop, and enter the level editor.
 - Button classes for interactive menu elements with distinct actions.
-- File handling integration allowing users to load existing levels directly from the main menu for gameplay or editing.
+- File handling integration allowing users to load existing levels directly from the main menu for gameplay or editing, choosing a level pack opens its first level.
 - Background and visual elements for an engaging main menu experience.
 """
 # import the pygame module
@@ -18,14 +18,16 @@ import pygame
 import gameplay
 import level_editor
 import tools
+import assets
+import packs
 import tkinter as tk
 from tkinter import filedialog
 
 # initializes the pygame module
 pygame.init()
 
-# creates a screen variable of size 800 x 600
-screen = pygame.display.set_mode([tools.SCREEN_X,tools.SCREEN_Y])
+# the 800 x 600 screen made in tools, shown scaled to the window
+screen = tools.screen
 
 # controls the main game while loop
 done = False
@@ -72,10 +74,13 @@ class Menu_Buttons:
                 root.withdraw()
                 file_path = filedialog.askopenfilename( #Open file selector
                     defaultextension=".adiv",  # Default file extension for opened files
-                    filetypes=[("Adiv Level Files", "*.adiv"), ("All Files", "*.*")],  # File type filters
+                    filetypes=[("Adiv Level Files", "*.adiv"), ("Adiv Level Packs", "*" + packs.PACK_EXTENSION), ("All Files", "*.*")],  # File type filters
                     title="Open Level File"  # Dialog window title
                 )
                 root.destroy()
+                tools.request_full_update() # the file dialog may have covered the window
+                if file_path and file_path.lower().endswith(packs.PACK_EXTENSION): # a level pack, open its first level
+                    file_path = packs.first_level(file_path) or ""
 
                 if self.type == 5 and file_path[-5:] == ".adiv": #load and play the level
                     gameplay.load_level(file_path)
@@ -121,37 +126,42 @@ def back_button_collide(pos, len, change_to, lm, xm, ym):
         tools.game_state = change_to # change the game state to the specified one
     return collide
 
-# your GLOBAL variables go here
-menu_background = pygame.image.load("main menu.png").convert_alpha() # Load the main menu background image
-menu_background = pygame.transform.scale(menu_background, (tools.SCREEN_X, tools.SCREEN_Y)) #scale it
+def load_assets():
+    """Loads the main menu images and the back button every menu uses, for the "main_menu" asset group.
+    """
+    global menu_background, mm_buttons, back_button
+    menu_background = assets.get_image("main menu.png", (tools.SCREEN_X, tools.SCREEN_Y)) # Load the main menu background image scaled to the screen
 
-play_img = pygame.image.load("menu icons/play circle.png").convert_alpha() # Load the play button image
-play_length = 225
-play_img = pygame.transform.scale(play_img, (play_length,play_length)) # Scale the play button image to the specified length
+    play_img = assets.get_image("menu icons/play circle.png", (play_length,play_length)) # Load the play button image, scaled
 
-settings_img = pygame.image.load("menu icons/info white.png").convert_alpha() # Load the settings button image
-settings_length = 125
-settings_img = pygame.transform.scale(settings_img, (settings_length,settings_length)) # Scale the settings button image to the specified length
+    settings_img = assets.get_image("menu icons/info white.png", (settings_length,settings_length)) # Load the settings button image, scaled
 
-shop_img = pygame.image.load("menu icons/shop white.png").convert_alpha() # Load the shop button image
-shop_length = 125
-shop_img = pygame.transform.scale(shop_img, (shop_length,shop_length)) # Scale the shop button image to the specified length
+    shop_img = assets.get_image("menu icons/shop white.png", (shop_length,shop_length)) # Load the shop button image, scaled
 
-mm_buttons = [ # List of menu buttons with their positions, images, types, and lengths into the class
-    Menu_Buttons(279, 229,play_img, 1, play_length), #play button, type 1
-    Menu_Buttons(72, 311,settings_img, 2, settings_length), #settings button, type 2
-    Menu_Buttons(590, 304,shop_img, 3, shop_length) #shop button, type 3
-]
+    mm_buttons = [ # List of menu buttons with their positions, images, types, and lengths into the class
+        Menu_Buttons(279, 229,play_img, 1, play_length), #play button, type 1
+        Menu_Buttons(72, 311,settings_img, 2, settings_length), #settings button, type 2
+        Menu_Buttons(590, 304,shop_img, 3, shop_length) #shop button, type 3
+    ]
 
-back_button = pygame.image.load("menu icons/undo.png").convert_alpha() # Load the back button image
-back_button = pygame.transform.scale(back_button, (50, 50)) # Scale the back button images
+    back_button = assets.get_image("menu icons/undo.png", (50, 50)) # Load the back button image, scaled
+
+# your GLOBAL variables go here
+menu_background = None # images and buttons, loaded the first time the main menu is shown
+mm_buttons = []
+back_button = None
+play_length = 225 # sizes of the buttons
+settings_length = 125
+shop_length = 125
 back_button_pos = (15, 15)
+assets.declare("main_menu", load_assets, ("clouds",))
 
 input_info = None #user inputs
 
 # MAIN LOOP
 def run_main_menu():
     global screen, menu_background, mm_buttons, input_info, done, clock
+    assets.load("main_menu") # load the images the first time the menu is shown
     screen.blit(menu_background, (0, 0)) # Draw the main menu background
     
     tools.cloud_x = tools.draw_clouds(tools.cloud_img, tools.cloud_x) # Draw the clouds on the main menu background
@@ -161,8 +171,8 @@ def run_main_menu():
     for button in mm_buttons: 
         button.go() # Call the go method of each button in the mm_buttons list to draw and handle their functionality
 
-    # this line draws everything into the window all at once
-    pygame.display.flip()
+    # this line draws the parts of the screen that changed into the window
+    tools.update_display("main_menu")
     # this line limits the frames per second to 60
     clock.tick(60)
     
@@ -0,0 +1,452 @@
+"""
+packs.py
+Author: Adiv Goldberg
+Date last edited: 2026-10-18
+Program: platformer level packs
+Description:
+-------------
+This module reads and writes level packs, zip files (.adivpack) holding many levels with their custom images and music and a manifest listing them. It provides:
+- Paths into packs, like "my levels.adivpack::levels/level 1.adiv", that can be used anywhere a level, image or music filepath is used.
+  Levels in a pack refer to their image and music inside the same pack, so a pack keeps working wherever it is moved.
+- Reading only the manifest when a pack is opened, each level, image or music file is only read when it is used, and music is streamed
+  from the pack while it plays instead of being extracted. Each pack is opened once, however many of its files are used.
+- Exporting levels into a pack (their images and music are copied in, each file once) and importing a pack into a folder of normal levels.
+- Adding or replacing one level in a pack (from the level editor), the other levels and files are copied across a bit at a time, not read into memory or decoded.
+- Working with packs from the command line:
+  python packs.py export "my levels.adivpack" "level 1.adiv" "level 6.adiv", python packs.py import "my levels.adivpack" "my levels", python packs.py list "my levels.adivpack"
+"""
+# import the pygame module
+import pygame
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import zipfile
+import level_format
+
+PACK_EXTENSION = ".adivpack" # file extension of level packs
+PACK_SEPARATOR = "::" # between the pack and the file in it, in paths into packs
+PACK_VERSION = 1 # version of the manifest
+MANIFEST = "manifest.json" # the manifest inside every pack
+LEVEL_FOLDER = "levels" # folder the levels are in, inside the pack
+MEDIA_FOLDER = "media" # folder the images and music are in, inside the pack
+COPY_CHUNK = 1 << 16 # bytes read at a time when hashing or copying files into a pack
+
+# your FUNCTIONS go here
+def is_pack_path(path):
+    """checks if a path is to a file inside a pack
+
+    Args:
+        path (string): filepath
+
+    Returns:
+        bool: True if it is like "my levels.adivpack::levels/level 1.adiv"
+    """
+    return isinstance(path, str) and PACK_SEPARATOR in path
+
+def split_path(path):
+    """splits a path into a pack into the pack and the file in it
+
+    Args:
+        path (string): path into a pack
+
+    Returns:
+        tuple: filepath of the pack, name of the file in the pack
+    """
+    pack_file, member = path.split(PACK_SEPARATOR, 1)
+    return pack_file, member
+
+def open_pack(pack_file):
+    """opens a pack and reads its manifest, once. opened again if the pack has changed since
+
+    Args:
+        pack_file (string): filepath of the .adivpack
+
+    Returns:
+        tuple: the open zipfile.ZipFile and the manifest
+
+    Raises:
+        OSError, ValueError: if it cant be read or isnt a pack
+    """
+    mtime = os.path.getmtime(pack_file)
+    opened = open_packs.get(pack_file)
+    if opened is not None and opened[2] == mtime: # already open
+        return opened[0], opened[1]
+    close_pack(pack_file) # saved again since it was opened
+    try:
+        archive = zipfile.ZipFile(pack_file) # only reads the list of files at the end of the zip
+        manifest = json.loads(archive.read(MANIFEST))
+    except (zipfile.BadZipFile, KeyError) as error: # not a zip, or no manifest
+        raise ValueError(f"not a level pack: {error}")
+    if not isinstance(manifest, dict) or manifest.get("version") != PACK_VERSION:
+        archive.close()
+        raise ValueError("not a level pack this version can read")
+    open_packs[pack_file] = (archive, manifest, mtime)
+    return archive, manifest
+
+def close_pack(pack_file):
+    """closes a pack if its open, files from it that are still being read (like streaming music) keep working
+
+    Args:
+        pack_file (string): filepath of the .adivpack
+    """
+    opened = open_packs.pop(pack_file, None)
+    if opened is not None:
+        opened[0].close()
+
+def get_mtime(path):
+    """gets when a file was last changed, for files in packs its when the pack was
+
+    Args:
+        path (string): filepath, or path into a pack
+
+    Returns:
+        float: modification time
+
+    Raises:
+        OSError: if the file doesnt exist
+    """
+    if is_pack_path(path):
+        path = split_path(path)[0]
+    return os.path.getmtime(path)
+
+def get_stat(path):
+    """gets the size and modification time of a file, for files in packs its the packs
+
+    Args:
+        path (string): filepath, or path into a pack
+
+    Returns:
+        os.stat_result: the files stat
+
+    Raises:
+        OSError: if the file doesnt exist
+    """
+    if is_pack_path(path):
+        path = split_path(path)[0]
+    return os.stat(path)
+
+def exists(path):
+    """checks if a file exists, in a pack or on its own
+
+    Args:
+        path (string): filepath, or path into a pack
+
+    Returns:
+        bool: True if it exists
+    """
+    if not is_pack_path(path):
+        return isinstance(path, str) and os.path.isfile(path)
+    pack_file, member = split_path(path)
+    try:
+        archive, _ = open_pack(pack_file)
+    except (OSError, ValueError):
+        return False
+    try:
+        archive.getinfo(member)
+    except KeyError: # not in the pack
+        return False
+    return True
+
+def open_file(path):
+    """opens a file for reading, in a pack or on its own. files in packs are decompressed as they are read, not extracted
+
+    Args:
+        path (string): filepath, or path into a pack
+
+    Returns:
+        file: the open file, in binary mode
+
+    Raises:
+        OSError, ValueError: if it cant be opened
+    """
+    if not is_pack_path(path):
+        return open(path, "rb")
+    pack_file, member = split_path(path)
+    archive, _ = open_pack(pack_file)
+    try:
+        return archive.open(member)
+    except KeyError: # not in the pack
+        raise FileNotFoundError(path)
+
+def read_file(path):
+    """reads a whole file, in a pack or on its own
+
+    Args:
+        path (string): filepath, or path into a pack
+
+    Returns:
+        bytes: the file
+    """
+    with open_file(path) as filehandle:
+        return filehandle.read()
+
+def load_image(path):
+    """loads an image, in a pack or on its own, like pygame.image.load
+
+    Args:
+        path (string): filepath, or path into a pack
+
+    Returns:
+        pygame.Surface: the image, not converted
+    """
+    if not is_pack_path(path):
+        return pygame.image.load(path)
+    with open_file(path) as filehandle:
+        return pygame.image.load(filehandle, split_path(path)[1]) # the name tells pygame the image type
+
+def load_music(path):
+    """loads a track into pygame.mixer.music, streamed from the pack while it plays if its in one
+
+    Args:
+        path (string): filepath, or path into a pack
+
+    Returns:
+        file: the open file the music streams from, keep it until the music stops then close it. None if its a normal file
+    """
+    if not is_pack_path(path):
+        pygame.mixer.music.load(path)
+        return None
+    filehandle = open_file(path)
+    try:
+        pygame.mixer.music.load(filehandle, os.path.splitext(path)[1][1:]) # the extension tells pygame the music type
+    except:
+        filehandle.close()
+        raise
+    return filehandle
+
+def read_level(level_path):
+    """reads a level in either format, in a pack or on its own. the image and music of levels in packs are turned into paths into the pack
+
+    Args:
+        level_path (string): filepath of the .adiv file, or path into a pack
+
+    Returns:
+        dict: the level, like level_format.read_level gives
+
+    Raises:
+        OSError, ValueError: if it cant be read or isnt a level
+    """
+    if not is_pack_path(level_path):
+        return level_format.read_level(level_path)
+    data = level_format.parse_level(read_file(level_path))
+    pack_file = split_path(level_path)[0]
+    for key in ("image", "music"):
+        if isinstance(data.get(key), str) and not is_pack_path(data[key]) and exists(pack_file + PACK_SEPARATOR + data[key]): # in the pack
+            data[key] = pack_file + PACK_SEPARATOR + data[key]
+    return data
+
+def list_levels(pack_file):
+    """gets the levels in a pack, from its manifest
+
+    Args:
+        pack_file (string): filepath of the .adivpack
+
+    Returns:
+        list: paths into the pack of each level, in the order of the manifest
+    """
+    _, manifest = open_pack(pack_file)
+    return [pack_file + PACK_SEPARATOR + level["file"] for level in manifest.get("levels", [])]
+
+def first_level(pack_file):
+    """gets the first level of a pack, for opening a pack like a level
+
+    Args:
+        pack_file (string): filepath of the .adivpack
+
+    Returns:
+        string: path into the pack of its first level, None if it cant be read or has no levels
+    """
+    try:
+        level_paths = list_levels(pack_file)
+    except (OSError, ValueError):
+        return None
+    return level_paths[0] if level_paths else None
+
+def media_name(path):
+    """names an image or music file inside a pack, the same file always gets the same name so its only stored once.
+    files already in a pack keep their name without being read, others are hashed a bit at a time
+
+    Args:
+        path (string): where the file is, filepath or path into a pack
+
+    Returns:
+        string: its name in the pack
+
+    Raises:
+        OSError, ValueError: if it cant be read
+    """
+    if is_pack_path(path) and split_path(path)[1].startswith(MEDIA_FOLDER + "/"): # from a pack, already named like this
+        if not exists(path):
+            raise FileNotFoundError(path)
+        return split_path(path)[1]
+    digest = hashlib.sha1()
+    with open_file(path) as filehandle:
+        for chunk in iter(lambda: filehandle.read(COPY_CHUNK), b""):
+            digest.update(chunk)
+    return f"{MEDIA_FOLDER}/{digest.hexdigest()[:12]} {os.path.basename(path)}"
+
+def pack_media(data, media, names):
+    """points the image and music of a level at their names in the pack, and finds the files the pack doesnt have yet
+
+    Args:
+        data (dict): the level, its image and music are filepaths or paths into packs. changed to the names in the pack
+        media (dict): name in the pack to where it is copied from, files that arent in it yet are added
+        names (dict): filepath to its name in the pack (None if it cant be read), so each file is only named once
+    """
+    for key in ("image", "music"):
+        path = data.pop(key, None)
+        if path is None:
+            continue
+        if path not in names:
+            try:
+                names[path] = media_name(path)
+            except (OSError, ValueError): # missing, the level uses the default
+                names[path] = None
+        if names[path] is not None:
+            data[key] = names[path]
+            media.setdefault(names[path], path) # a file with the same name is the same file, its only copied once
+
+def level_entry(file_name, data):
+    """makes the manifest entry of a level
+
+    Args:
+        file_name (string): name of the level in the pack
+        data (dict): the level, its image and music are names in the pack
+
+    Returns:
+        dict: the entry
+    """
+    return {"file": file_name, "columns": len(data["blocks"][0]), "rows": len(data["blocks"]), "image": data.get("image"), "music": data.get("music")}
+
+def save_pack(pack_file, manifest, members):
+    """writes a pack, to a temporary file first so a crash never leaves half a pack.
+    levels are compressed, images and music are stored as they are (they are compressed already, and music can be streamed without decompressing)
+
+    Args:
+        pack_file (string): filepath of the .adivpack
+        manifest (dict): the manifest
+        members (dict): name in the pack to its bytes, or to the filepath or path into a pack it is copied from a bit at a time
+    """
+    with zipfile.ZipFile(pack_file + ".tmp", "w") as archive:
+        archive.writestr(MANIFEST, json.dumps(manifest, indent=1), zipfile.ZIP_DEFLATED)
+        for member, source in members.items():
+            info = zipfile.ZipInfo(member, time.localtime()[:6])
+            info.compress_type = zipfile.ZIP_STORED if member.startswith(MEDIA_FOLDER + "/") else zipfile.ZIP_DEFLATED
+            if isinstance(source, bytes):
+                archive.writestr(info, source)
+                continue
+            with open_file(source) as src, archive.open(info, "w", force_zip64=True) as dst: # never all in memory at once
+                shutil.copyfileobj(src, dst, COPY_CHUNK)
+    close_pack(pack_file) # let go of the old pack so it can be replaced
+    os.replace(pack_file + ".tmp", pack_file)
+
+def write_pack(pack_file, levels):
+    """writes a pack of levels, each image and music file is copied in once
+
+    Args:
+        pack_file (string): filepath of the .adivpack
+        levels (list): (file name in the pack, level data) for each level, the image and music are filepaths or paths into packs
+    """
+    manifest = {"version": PACK_VERSION, "levels": [], "media": []}
+    members = {} # name in the pack to its bytes or where it is copied from
+    media, names = {}, {}
+    for name, data in levels:
+        data = dict(data)
+        pack_media(data, media, names)
+        file_name = f"{LEVEL_FOLDER}/{name}"
+        members[file_name] = level_format.encode_level(data)
+        manifest["levels"].append(level_entry(file_name, data))
+    manifest["media"] = list(media)
+    members.update(media)
+    save_pack(pack_file, manifest, members)
+
+def add_level(pack_file, data, name = None):
+    """adds a level to a pack, making the pack if it doesnt exist. used by the level editor to save into a pack.
+    only the new level is encoded, the other levels and the images and music are copied across from the old pack without being read into memory
+
+    Args:
+        pack_file (string): filepath of the .adivpack
+        data (dict): the level, its image and music are filepaths or paths into packs
+        name (string, optional): file name of the level in the pack, a level with the same name is replaced. Defaults to None (the first "level N.adiv" not in the pack).
+
+    Returns:
+        string: path into the pack of the level
+    """
+    old_levels, media = [], {}
+    if os.path.isfile(pack_file): # the levels and files already in the pack
+        _, manifest = open_pack(pack_file)
+        old_levels = manifest.get("levels", [])
+        media = {member: pack_file + PACK_SEPARATOR + member for member in manifest.get("media", [])}
+    if name is None: # the first level number not used in the pack, so no level is replaced
+        names = {os.path.basename(level["file"]) for level in old_levels}
+        number = 1
+        while f"level {number}.adiv" in names:
+            number += 1
+        name = f"level {number}.adiv"
+    file_name = f"{LEVEL_FOLDER}/{name}"
+    data = dict(data)
+    pack_media(data, media, {}) # files the pack already has arent read
+    levels = [level for level in old_levels if level["file"] != file_name] + [level_entry(file_name, data)]
+    used = {level.get(key) for level in levels for key in ("image", "music")}
+    media = {member: source for member, source in media.items() if member in used} # leave out files only the replaced level used
+    members = {level["file"]: pack_file + PACK_SEPARATOR + level["file"] for level in levels[:-1]}
+    members[file_name] = level_format.encode_level(data)
+    members.update(media)
+    save_pack(pack_file, {"version": PACK_VERSION, "levels": levels, "media": list(media)}, members)
+    return pack_file + PACK_SEPARATOR + file_name
+
+def export_levels(pack_file, level_paths):
+    """exports levels into a new pack
+
+    Args:
+        pack_file (string): filepath of the .adivpack, replaced if it exists
+        level_paths (list): filepaths of the levels, or paths into other packs
+    """
+    write_pack(pack_file, [(os.path.basename(split_path(level_path)[1] if is_pack_path(level_path) else level_path), read_level(level_path)) for level_path in level_paths])
+
+def import_pack(pack_file, folder):
+    """imports a pack into a folder of normal levels, with its images and music next to them
+
+    Args:
+        pack_file (string): filepath of the .adivpack
+        folder (string): folder to put the levels in, made if it doesnt exist
+
+    Returns:
+        list: filepaths of the levels
+    """
+    os.makedirs(folder, exist_ok=True)
+    level_paths = []
+    for level_path in list_levels(pack_file):
+        data = read_level(level_path)
+        for key in ("image", "music"):
+            if is_pack_path(data.get(key)): # copy it out of the pack, the level refers to the copy
+                path = os.path.join(folder, os.path.basename(split_path(data[key])[1]))
+                with open(path, "wb") as filehandle:
+                    filehandle.write(read_file(data[key]))
+                data[key] = path
+        new_path = os.path.join(folder, os.path.basename(split_path(level_path)[1]))
+        level_format.write_level(new_path, data)
+        level_paths.append(new_path)
+    return level_paths
+
+
+# your GLOBAL variables go here
+open_packs = {} # pack filepath to its open zipfile.ZipFile, manifest and modification time
+
+
+if __name__ == "__main__": # work with packs from the command line
+    if len(sys.argv) < 3 or sys.argv[1] not in ("export", "import", "list") or (sys.argv[1] != "list" and len(sys.argv) < 4):
+        print("usage: python packs.py export <pack> <levels or folders>... | import <pack> <folder> | list <pack>")
+        sys.exit(1)
+    if sys.argv[1] == "export":
+        level_paths = level_format.find_levels(sys.argv[3:])
+        export_levels(sys.argv[2], level_paths)
+        print(f"exported {len(level_paths)} levels to {sys.argv[2]}")
+    elif sys.argv[1] == "import":
+        print(f"imported {len(import_pack(sys.argv[2], sys.argv[3]))} levels into {sys.argv[3]}")
+    else:
+        for level_path in list_levels(sys.argv[2]):
+            print(level_path)
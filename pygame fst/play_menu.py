@@ -1,7 +1,7 @@
 """ 
 play_menu.py
 Author: Adiv Goldberg
-Date last edited: 2025-06-09
+Date last edited: 2026-10-18
 Program: platformer play menu
 Description:
 -------------
@@ -10,11 +10,18 @@ This module implements the play menu for the platformer game. It provides a user
 - Load game button to continue a previously saved game.
 - Options button to adjust game settings such as audio and controls.
 - Back button to return to the main menu.
+- A loading screen that keeps drawing while the chosen level is read on a background thread, and prefetching the next level in the grid.
+- A level grid of the numbered levels that exist, found from the level catalog without opening the level files.
+- A preview of each level in its square, drawn by the thumbnail worker processes and cached.
 """
 # import the pygame module
 import pygame
-import skin_shop
 import tools
+import atlas
+import assets
+import loader
+import catalog
+import thumbnails
 import main_menu
 from main_menu import Menu_Buttons
 
@@ -24,8 +31,8 @@ import gameplay
 # initializes the pygame module
 pygame.init()
 
-# creates a screen variable of size 800 x 600
-screen = pygame.display.set_mode([tools.SCREEN_X,tools.SCREEN_Y])
+# the 800 x 600 screen made in tools, shown scaled to the window
+screen = tools.screen
 
 # controls the main game while loop
 done = False
@@ -35,7 +42,7 @@ clock = pygame.time.Clock()
 
 #CLASSES
 class Deafault_Levels:
-    def __init__(self, x, y, img, level, length, completed, best_time):
+    def __init__(self, x, y, img, level, level_path, length, completed, best_time):
         """ Initializes a level square with the specified attributes.
 
         Args:
@@ -43,6 +50,7 @@ class Deafault_Levels:
             y (float): The y-coordinate of the level square.
             img (Surface): The image representing the level square.
             level (int): The level number.
+            level_path (str): The level's file, like "level 3.adiv".
             length (float): The length of the level square.
             completed (bool): Whether the level is completed.
             best_time (float): The best time for completing the level.
@@ -54,6 +62,8 @@ class Deafault_Levels:
         self.completed = completed
         self.best_time = best_time
         self.level_num = level
+        self.level_path = level_path # The level's file
+        self.thumb = None # Preview of the level, None until it is drawn
         
     def go(self):
         """
@@ -67,22 +77,27 @@ class Deafault_Levels:
         """
         global checkmark_img
         screen.blit(self.img, (self.x, self.y))
+        if self.thumb is None: # Ask for the preview until it is ready
+            self.thumb = thumbnails.get_thumbnail(self.level_path)
+            if self.thumb is not None: # It just finished, show it
+                tools.mark_dirty((self.x, self.y, self.length, self.length))
+        if self.thumb is not None: # Draw the preview centered in the square, under the number
+            screen.blit(self.thumb, (self.x + (self.length - self.thumb.get_width()) // 2, self.y + (self.length - self.thumb.get_height()) // 2))
         if self.completed:
             if self.best_time is not None: # If the level is completed
-                time_text = skin_shop.retro_font_15.render(f"{round(self.best_time,1)} s", True, tools.BLACK) # Render the best time text
+                time_text = tools.render_text(assets.get_font(15), f"{round(self.best_time,1)} s", tools.BLACK) # Render the best time text
                 screen.blit(time_text, (self.x + self.length // 2 - time_text.get_width() // 2, self.y + self.length + 5)) #blit it
             screen.blit(checkmark_img, (self.x + self.length - 24, self.y)) # Draw the checkmark in the top right corner of the square
         
         # Draw the level number centered in the square
-        level_text = gameplay.retro_font_32.render(str(self.level_num), True, tools.WHITE)
+        level_text = tools.render_text(assets.get_font(32), str(self.level_num), tools.WHITE) # Render the level number
         screen.blit(level_text, (self.x + self.length // 2 - level_text.get_width() // 2, self.y + self.length // 2 - level_text.get_height() // 2))
                     
     def selection(self):
         """Handles the selection of the level square.
         """
         if pygame.Rect(self.x, self.y, self.length, self.length).collidepoint((main_menu.input_info.xMouse, main_menu.input_info.yMouse)) and main_menu.input_info.left_mouse_down: # If the mouse is over the level square and clicked
-            gameplay.load_level(f"level {self.level_num}.adiv") # Load the level file
-            tools.game_state = "gameplay" # Change the game state to gameplay
+            start_loading(self.level_path) # Read the level file on the background thread while the loading screen is drawn
         
 
 
@@ -98,8 +113,9 @@ def level_grid(c_levels):
         list: A list of Level instances representing the level squares.
     """
     global level_outline_img
-    # Create a 5x4 grid of Level instances on the left of the screen
+    # Create a 5x4 grid of Level instances on the left of the screen, for the numbered levels in the catalog
     levels = []
+    level_paths = catalog.numbered_levels()[:20] # the levels that exist, lowest number first
     level_width = 60
     level_height = 60
     xpadding = 25
@@ -107,18 +123,20 @@ def level_grid(c_levels):
     start_x = 70
     start_y = 175
 
-    for row in range(4):
-        for col in range(5):
-            x = start_x + col * (level_width + xpadding) # Calculate x position based on column
-            y = start_y + row * (level_height + ypadding) # Calculate y position based on row
-            level_number = row * 5 + col + 1 # Calculate level number (1 to 20)
-            completed = False # Default to not completed
-            if f"level {level_number}.adiv" in c_levels: # Check if the level file exists in the completed levels
-                completed = True # If it exists, set completed to True
-            best_time = float("inf") # Default best time to infinity
-            if completed: # If the level is completed
-                best_time = c_levels[f"level {level_number}.adiv"] # get the best time from the dictionary
-            levels.append(Deafault_Levels(x, y, level_outline_img, level_number, level_width, completed, best_time)) # Append the level instance to the list
+    for i, level_path in enumerate(level_paths):
+        row, col = divmod(i, 5)
+        x = start_x + col * (level_width + xpadding) # Calculate x position based on column
+        y = start_y + row * (level_height + ypadding) # Calculate y position based on row
+        level_number = catalog.level_number(level_path) # The number in the level's name
+        completed = False # Default to not completed
+        if level_path in c_levels: # Check if the level file exists in the completed levels
+            completed = True # If it exists, set completed to True
+        best_time = float("inf") # Default best time to infinity
+        if completed: # If the level is completed
+            best_time = c_levels[level_path] # get the best time from the dictionary
+        levels.append(Deafault_Levels(x, y, level_outline_img, level_number, level_path, level_width, completed, best_time)) # Append the level instance to the list
+    thumbnails.request_thumbnails(level_paths) # Draw the previews of levels that are new or changed, in the background
+    thumbnails.trim_cache() # Forget the previews of levels that changed
     return levels
 
 def get_level_class():
@@ -139,44 +157,121 @@ def total_time():
     for level in levels: # Iterate through each level in the levels list
         if level.best_time != float("inf"): # If the level has a valid best time
             time += level.best_time # Add the best time to the total time
-    return gameplay.retro_font_32.render(f"your total time is: {round(time, 1)} s", True, tools.BLACK) # Render the total time as a text surface
+    return tools.render_text(assets.get_font(32), f"your total time is: {round(time, 1)} s", tools.BLACK) # Render the total time as a text surface
+
+def start_loading(level_path):
+    """Starts reading a level on the background thread and shows the loading screen until it is read.
+
+    Args:
+        level_path (str): filepath to .adiv
+    """
+    global loading_level, loading_preload
+    loading_level = level_path
+    loading_preload = loader.preload_level(level_path) # Already read if it was prefetched
+    tools.game_state = "loading_level" # Change the game state to the loading screen
+
+def next_level_path(level_path):
+    """Gets the level after a level in the play menu grid, to prefetch it.
+
+    Args:
+        level_path (str): filepath to .adiv, like "level 3.adiv"
+
+    Returns:
+        str: filepath of the next level, None if it is the last level or not one of the grid levels
+    """
+    level_paths = [level.level_path for level in levels] # the grid levels, in order
+    if level_path not in level_paths[:-1]: # not a grid level, or the last one
+        return None
+    return level_paths[level_paths.index(level_path) + 1]
+
+def draw_loading_bar(progress):
+    """Draws the loading bar and text in the middle of the screen.
+
+    Args:
+        progress (float): how much is loaded, 0 to 1
+    """
+    bar = pygame.Rect(250, 380, 300, 24) # Where the bar is
+    pygame.draw.rect(screen, tools.WHITE, bar) # Empty bar
+    pygame.draw.rect(screen, tools.BLACK, (bar.x, bar.y, int(bar.width * progress), bar.height)) # Filled part
+    pygame.draw.rect(screen, tools.BLACK, bar, 3) # Outline
+    loading_text = tools.render_text(assets.get_font(32), "loading" + "." * (pygame.time.get_ticks() // 300 % 4), tools.BLACK) # Dots show it hasnt frozen
+    screen.blit(loading_text, (bar.x, bar.y - loading_text.get_height() - 10))
 
 def update_play_menu():
     """Updates the play menu with the current level instances and total time.
     """
     global levels, net_time_label
+    assets.load("play_menu") # the level squares need the play menu images
+    catalog.update_catalog() # Notice levels added, changed or deleted since the menu was last shown, only changed levels are read
     tools.coins, tools.complete_levels, _, _ = tools.read_stats() # Read the coins and completed levels from stats
     levels = level_grid(tools.complete_levels) # Update the levels variable with the current level instances
     net_time_label = total_time() # Update the total time label with the new total time
     tools.game_state = "play_menu" # Change the game state to play_menu
 
+def load_assets():
+    """Loads the play menu images and makes the level squares, for the "play_menu" asset group.
+    """
+    global menu_background, level_e_img, pm_buttons, level_outline_img, checkmark_img, net_time_label
+    menu_background = assets.get_image("play menu.png", (tools.SCREEN_X, tools.SCREEN_Y)) # Load the play menu background image scaled to fit the screen
 
-# your GLOBAL variables go here
-menu_background = pygame.image.load("play menu.png").convert_alpha() # Load the play menu background image
-menu_background = pygame.transform.scale(menu_background, (tools.SCREEN_X, tools.SCREEN_Y)) # Scale the background to fit the screen
+    level_e_img = assets.get_image("menu icons/level editor white.png", (level_e_length,level_e_length)) # Load the level editor button image, scaled
 
-level_e_img = pygame.image.load("menu icons/level editor white.png").convert_alpha() # Load the level editor button image
-level_e_length = 125 # Set the length of the level editor button
-level_e_img = pygame.transform.scale(level_e_img, (level_e_length,level_e_length)) # Scale the level editor button image to the specified length
+    pm_buttons = [ # List of Menu_Buttons instances for the play menu
+        Menu_Buttons(584, 279,level_e_img, 4, level_e_length), #level editor button, type 4
+    ]
 
-pm_buttons = [ # List of Menu_Buttons instances for the play menu
-    Menu_Buttons(584, 279,level_e_img, 4, level_e_length), #level editor button, type 4
-]
+    level_outline_img = atlas.load_image("menu icons/level outline.png") # Load the level outline image
+    checkmark_img = assets.get_image("check-mark.png", (24, 24)) # Load the checkmark image, scaled
 
-level_outline_img = pygame.image.load("menu icons/level outline.png").convert_alpha() # Load the level outline image
-checkmark_img = pygame.image.load("check-mark.png").convert_alpha() # Load the checkmark image
-checkmark_img = pygame.transform.scale(checkmark_img, (24, 24)) # Scale the checkmark image to the specified size
+    get_level_class() # Initialize the levels variable with the current level instances
+    net_time_label = total_time() # Update the total time label with the new total time
 
+
+# your GLOBAL variables go here
+menu_background = None # images and buttons, loaded the first time the play menu is shown
+level_e_img = None
+level_e_length = 125 # Set the length of the level editor button
+pm_buttons = []
+level_outline_img = None
+checkmark_img = None
 levels = []
-get_level_class() # Initialize the levels variable with the current level instances
+net_time_label = None
+loading_level = None # level the loading screen is loading
+loading_preload = None # its preload, being read on the background thread
+assets.declare("play_menu", load_assets, ("main_menu",))
 
-net_time_label = total_time() # Update the total time label with the new total time
 
 
+def run_loading_level():
+    """Draws the loading screen while the level is read on the background thread, then loads it and starts the gameplay.
+    The image is converted for the display here on the main thread, which is quick once it is decoded.
+
+    Returns:
+        bool: done, if the window was closed
+    """
+    global done, loading_preload
+    assets.load("play_menu") # the background is the play menus
+    main_menu.input_info, done = tools.check_input() # Keep the window responding while it loads
+    screen.blit(menu_background, (0, 0)) # Draw the play menu background
+    tools.cloud_x = tools.draw_clouds(tools.cloud_img, tools.cloud_x) # The clouds keep moving
+    draw_loading_bar(loading_preload.progress())
+    if loading_preload.done.is_set(): # Read, finish loading it
+        assets.load("gameplay") # the first level also needs the gameplay images and sounds, loaded here so the last frame is the full bar
+        gameplay.load_level(loading_level) # Converts the preloaded image and builds the level
+        loading_preload = None
+        tools.game_state = "gameplay" # Change the game state to gameplay
+        next_level = next_level_path(loading_level)
+        if next_level is not None: # Read the next level while this one is played, so starting it is instant
+            loader.preload_level(next_level)
+    tools.mark_dirty((250, 320, 300, 90)) # the bar and text change every frame
+    tools.update_display("loading_level")
+    clock.tick(60)
+    return done
 
 # MAIN LOOP
 def run_play_menu(): #while loop function for the play menu
     global screen, menu_background, level_e_img, level_e_length, pm_buttons, done, clock, done
+    assets.load("play_menu") # load the images the first time the menu is shown
     screen.blit(menu_background, (0, 0)) # Draw the play menu background
     
     main_menu.input_info, done = tools.check_input() # Check for user input and update the done variable
@@ -194,8 +289,8 @@ def run_play_menu(): #while loop function for the play menu
         
     screen.blit(net_time_label, (270 - net_time_label.get_width()*0.5, 510)) # Draw the total time label centered at the bottom of the screen
     
-    # this line draws everything into the window all at once
-    pygame.display.flip()
+    # this line draws the parts of the screen that changed into the window
+    tools.update_display("play_menu")
     # this line limits the frames per second to 60
     clock.tick(60)
     
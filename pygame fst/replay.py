@@ -0,0 +1,195 @@
+"""
+replay.py
+Author: Adiv Goldberg
+Date last edited: 2026-10-18
+Program: platformer run recording and replay
+Description:
+-------------
+This module records the inputs of a level attempt and plays them back, so times can be checked and physics bugs can be reproduced. It provides:
+- A recorder that stores the right, left and jump inputs used by each physics tick.
+- A compact binary run file with the level file hash, level path and skin type.
+- A replayer that feeds a run back into the headless simulation faster than real time.
+- Checking a run from the command line: python replay.py "runs/last run.run" ["level 1.adiv"]
+"""
+import hashlib
+import os
+import struct
+import sys
+import packs
+
+RUN_MAGIC = b"ADRN" # first bytes of every run file
+RUN_VERSION = 1 # version of the run file format
+RUN_HEADER = struct.Struct("<4sBB32sIIH") # magic, version, skin type, level hash, ticks, time in ticks, level path length
+RUN_SPAN = struct.Struct("<BH") # inputs, number of ticks they are held for
+MAX_SPAN = 65535 # most ticks one span can hold
+
+RIGHT_BIT = 1 # bits for each input in a tick
+LEFT_BIT = 2
+JUMP_BIT = 4
+
+#CLASSES
+class Run_Recorder:
+    def __init__(self):
+        """records the inputs used by each physics tick of a level attempt
+        """
+        self.level_path = None # level being played
+        self.level_hash = hash_level(None) # hash of the level file
+        self.skin_type = 1 # 1 for cube, 2 for runner
+        self.spans = [] # [inputs, ticks] for each run of ticks with the same inputs
+        self.ticks = 0 # ticks recorded
+        self.finish_time = 0 # player.time in ticks when the level was finished, 0 if it wasnt
+
+    def start(self, level_path, skin_type):
+        """starts a new recording, for when a level is loaded or restarted
+
+        Args:
+            level_path (string): filepath to the .adiv being played
+            skin_type (int): 1 for cube, 2 for runner
+        """
+        if level_path != self.level_path: # only hash the file again if its a different level
+            self.level_hash = hash_level(level_path)
+        self.level_path = level_path
+        self.skin_type = skin_type
+        self.spans = []
+        self.ticks = 0
+        self.finish_time = 0
+
+    def record(self, r_pressed, l_pressed, just_jumped):
+        """records the inputs for one tick
+
+        Args:
+            r_pressed (bool): if the right key is held
+            l_pressed (bool): if the left key is held
+            just_jumped (bool): if jump was used this tick
+        """
+        inputs = pack_inputs(r_pressed, l_pressed, just_jumped)
+        if self.spans and self.spans[-1][0] == inputs and self.spans[-1][1] < MAX_SPAN: # same as the last tick, make the span longer
+            self.spans[-1][1] += 1
+        else: # inputs changed, start a new span
+            self.spans.append([inputs, 1])
+        self.ticks += 1
+
+    def finish(self, time):
+        """marks the recording as a finished level
+
+        Args:
+            time (int): player.time in ticks when the level was finished
+        """
+        self.finish_time = time
+
+    def save(self, file_path):
+        """writes the recording to a run file
+
+        Args:
+            file_path (string): filepath of the run file
+        """
+        folder = os.path.dirname(file_path)
+        if folder: # make the runs folder if it doesnt exist
+            os.makedirs(folder, exist_ok=True)
+        path_bytes = (self.level_path or "").encode("utf-8")
+        with open(file_path, "wb") as filehandle:
+            filehandle.write(RUN_HEADER.pack(RUN_MAGIC, RUN_VERSION, self.skin_type, self.level_hash, self.ticks, self.finish_time, len(path_bytes)))
+            filehandle.write(path_bytes)
+            for inputs, count in self.spans: # write each span
+                filehandle.write(RUN_SPAN.pack(inputs, count))
+
+# your FUNCTIONS go here
+def hash_level(level_path):
+    """hashes a level file so a run can only be replayed on the exact level it was recorded on
+
+    Args:
+        level_path (string): filepath to .adiv or path into a pack, None for no level
+
+    Returns:
+        bytes: sha256 of the file, or of nothing if it cant be read
+    """
+    try:
+        return hashlib.sha256(packs.read_file(level_path)).digest()
+    except (OSError, ValueError, TypeError): # no file, the game loads an empty level
+        return hashlib.sha256(b"").digest()
+
+def pack_inputs(r_pressed, l_pressed, just_jumped):
+    """packs the inputs of a tick into one number
+
+    Returns:
+        int: bits for right, left and jump
+    """
+    return (RIGHT_BIT if r_pressed else 0) | (LEFT_BIT if l_pressed else 0) | (JUMP_BIT if just_jumped else 0)
+
+def unpack_inputs(inputs):
+    """unpacks the inputs of a tick
+
+    Args:
+        inputs (int): bits for right, left and jump
+
+    Returns:
+        tuple: (right held, left held, jump pressed)
+    """
+    return bool(inputs & RIGHT_BIT), bool(inputs & LEFT_BIT), bool(inputs & JUMP_BIT)
+
+def read_run(file_path):
+    """reads a run file
+
+    Args:
+        file_path (string): filepath of the run file
+
+    Returns:
+        tuple: level path, level hash, skin type, list of (right held, left held, jump pressed) for each tick, finish time in ticks (0 if not finished)
+
+    Raises:
+        ValueError: if the file is not a run file or is from a newer version
+    """
+    with open(file_path, "rb") as filehandle:
+        data = filehandle.read()
+    if len(data) < RUN_HEADER.size:
+        raise ValueError("not a run file")
+    magic, version, skin_type, level_hash, ticks, finish_time, path_length = RUN_HEADER.unpack_from(data)
+    if magic != RUN_MAGIC or version > RUN_VERSION:
+        raise ValueError("not a run file or unsupported version")
+    offset = RUN_HEADER.size
+    level_path = data[offset:offset + path_length].decode("utf-8") or None
+    offset += path_length
+    inputs = []
+    for span_inputs, count in RUN_SPAN.iter_unpack(data[offset:]): # expand each span into ticks
+        inputs += [unpack_inputs(span_inputs)] * count
+    if len(inputs) != ticks:
+        raise ValueError("run file is incomplete")
+    return level_path, level_hash, skin_type, inputs, finish_time
+
+def replay_run(file_path, level_path=None):
+    """replays a run in the headless simulation, as fast as it can go
+
+    Args:
+        file_path (string): filepath of the run file
+        level_path (string, optional): level to replay on, defaults to the level path saved in the run
+
+    Returns:
+        tuple: if the replay finished the level, the time in seconds, the number of deaths, the ticks run
+
+    Raises:
+        ValueError: if the level file does not match the one the run was recorded on
+    """
+    import headless # only imported here, it switches pygame to run without a window
+    run_level_path, level_hash, skin_type, inputs, _ = read_run(file_path)
+    if level_path is None:
+        level_path = run_level_path
+    if hash_level(level_path) != level_hash: # level has changed since the run was recorded
+        raise ValueError(f"{level_path} is not the level this run was recorded on")
+    return headless.run_level(level_path, inputs, skin_type)
+
+
+if __name__ == "__main__": # check a run from the command line
+    if len(sys.argv) < 2:
+        print("usage: python replay.py <run file> [level.adiv]")
+        sys.exit(1)
+    run_level_path, _, _, _, finish_time = read_run(sys.argv[1])
+    finished, time, deaths, ticks = replay_run(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    print(f"level: {sys.argv[2] if len(sys.argv) > 2 else run_level_path}")
+    if finished:
+        print(f"replay finished in {time} s ({ticks} ticks, {deaths} deaths)")
+    else:
+        print(f"replay did not finish after {ticks} ticks ({deaths} deaths)")
+    if finish_time: # the recording finished, check the replay matches
+        import gameplay # already loaded headless by the replay
+        recorded_time = round(finish_time / gameplay.TICK_RATE, 1)
+        print(f"recorded time: {recorded_time} s, {'verified' if finished and gameplay.finish_time == finish_time else 'does not match'}") # the same tick, not just the same rounded time
@@ -14,17 +14,16 @@ This module implements the skin shop for the platformer game. It provides a user
 # import the pygame module
 import pygame
 import tools
+import assets
 import main_menu
 from pygame.draw import rect
 import gameplay
 
 # initializes the pygame module
 pygame.init()
-SCREEN_X = 800
-SCREEN_Y = 600
 
-# creates a screen variable of size 800 x 600
-screen = pygame.display.set_mode([SCREEN_X,SCREEN_Y])
+# the 800 x 600 screen made in tools, shown scaled to the window
+screen = tools.screen
 
 # controls the main game while loop
 done = False
@@ -76,11 +75,11 @@ class Skins:
         else:
             screen.blit(self.img[0], (self.x, self.y)) # If the skin is a runner, draw the first image (for now, no animation)
             
-        name_text = retro_font_15.render(self.name, True, tools.BLACK) # Render the name of the skin
+        name_text = tools.render_text(retro_font_15, self.name, tools.BLACK) # Render the name of the skin
         screen.blit(name_text, (self.x + self.length // 2 - name_text.get_width() // 2, self.y - 18)) #blit it above the skin
          
         if not self.owned: # If the skin is not owned
-            cost_text = retro_font_15.render(str(self.cost), True, tools.BLACK) # Render the cost of the skin
+            cost_text = tools.render_text(retro_font_15, str(self.cost), tools.BLACK) # Render the cost of the skin
             screen.blit(cost_text, (self.x + self.length // 2 - cost_text.get_width() // 2 + 5, self.y + self.length + 12 - cost_text.get_height() // 2)) #blit it below the skin
             screen.blit(coin_img_small, (self.x + self.length // 2 - cost_text.get_width() // 2 - coin_img_small.get_width() + 5, self.y + self.length + 12 - coin_img_small.get_height() // 2)) #blit the coin image next to the cost
         else: # If the skin is owned
@@ -93,6 +92,7 @@ class Skins:
         """Handles the selection of the skin.
         """
         if pygame.Rect(self.x, self.y, self.length, self.length).collidepoint(main_menu.input_info.xMouse, main_menu.input_info.yMouse) and main_menu.input_info.left_mouse_down: # If the mouse is over the skin and clicked
+            tools.request_full_update() # the selected skin and coins can change, redraw the whole screen
             if self.owned: # If the skin is owned
                 tools.selected_skin = [self.name, self.type] # Set the selected skin to this skin
                 tools.write_stats(None, None, tools.selected_skin, tools.selected_skin) # Write the selected skin to the stats file
@@ -114,7 +114,7 @@ def draw_coins(coin_img):
     x = 335
     y = 75
     screen.blit(coin_img, (x,y)) # Draw the coin image at the specified position
-    coin_text = gameplay.retro_font_32.render(str(tools.coins), True, tools.BLACK) # Render the player's coins as text
+    coin_text = tools.render_text(assets.get_font(32), str(tools.coins), tools.BLACK) # Render the player's coins as text
     screen.blit(coin_text, (x + coin_img.get_width(), y + coin_img.get_height() // 2 - coin_text.get_height() // 2)) #blit the text next to the coin image
     
 def draw_coming_soon(img, num):
@@ -128,58 +128,65 @@ def draw_coming_soon(img, num):
     x_start = 75 + img.get_width()
     margin = img.get_width() + 20
     y_start = 450
-    text = retro_font_15.render("Coming Soon", True, tools.BLACK) # Render the "Coming Soon" text
+    text = tools.render_text(retro_font_15, "Coming Soon", tools.BLACK) # Render the "Coming Soon" text
     for i in range(num):
         screen.blit(img, (x_start + margin*i, y_start)) # Draw the image at the specified position
         screen.blit(text, (x_start + margin*i + 0.5*img.get_width() - 0.5*text.get_width(), y_start - text.get_height()- 5)) #blit the text above the image
     
 
-# your GLOBAL variables go here
-menu_background = pygame.image.load("skin shop menu.png").convert_alpha() # Load the skin shop background image
-menu_background = pygame.transform.scale(menu_background, (SCREEN_X, SCREEN_Y)) # Scale the background image to fit the screen
+def load_assets():
+    """Loads the skin shop images and makes a Skins object for every skin, for the "skin_shop" asset group.
+    """
+    global menu_background, retro_font_15, checkmark_img, coin_img, coin_img_small, coming_soon_img, skins
+    menu_background = assets.get_image("skin shop menu.png", (tools.SCREEN_X, tools.SCREEN_Y)) # Load the skin shop background image scaled to fit the screen
 
-retro_font_15 = pygame.font.Font("upheavtt.ttf", 15) # Load the retro font for rendering text
+    retro_font_15 = assets.get_font(15) # Load the retro font for rendering text
 
-checkmark_img = pygame.image.load("check-mark.png") # Load the checkmark image
-checkmark_img = pygame.transform.scale(checkmark_img, (25,25)) # Scale the checkmark image
+    checkmark_img = assets.get_image("check-mark.png", (25,25)) # Load the checkmark image, scaled
 
-coin_img = pygame.image.load("powerups for game/coin(1).png") # Load the coin image
-coin_img_small = pygame.transform.scale(coin_img, (20,20)) # Scale the coin image to a smaller size for displaying coins
+    coin_img = assets.get_image("powerups for game/coin(1).png") # Load the coin image
+    coin_img_small = assets.get_image("powerups for game/coin(1).png", (20,20)) # Load the coin image again, scaled smaller for displaying coins
 
-coming_soon_img = pygame.image.load("characters/coming soon.png").convert_alpha() # Load the "Coming Soon" image
-coming_soon_img = pygame.transform.scale(coming_soon_img, (100, 100)) # Scale the "Coming Soon" image
+    coming_soon_img = assets.get_image("characters/coming soon.png", (100, 100)) # Load the "Coming Soon" image, scaled
 
-tools.coins, _, tools.owned_skins, tools.selected_skin = tools.read_stats() # Read the player's coins, owned skins, and selected skin from the stats file
+    tools.coins, _, tools.owned_skins, tools.selected_skin = tools.read_stats() # Read the player's coins, owned skins, and selected skin from the stats file
 
-skins = []
+    skins = []
+
+    person_owned = False # assume user doesnt own skin
+    if "Runner" in tools.owned_skins: # If the player owns the Runner skin
+        person_owned = True # Mark the skin as owned
+    skins.append(Skins(50,450, tools.person_imgs, 500, 2, "Runner", 100, person_owned)) # Add the Runner skin to the list of skins
 
-person_owned = False # assume user doesnt own skin
-if "Runner" in tools.owned_skins: # If the player owns the Runner skin
-    person_owned = True # Mark the skin as owned
-skins.append(Skins(50,450, tools.person_imgs, 500, 2, "Runner", 100, person_owned)) # Add the Runner skin to the list of skins
+    for i, (name, img) in enumerate(tools.type1_skins_imgs.items()): # Iterate through the type 1 skins
+        row = i // cols # Calculate the row index based on the current index and number of columns
+        col = i % cols # Calculate the column index based on the current index and number of columns
+        x = x_margin + col * spacing_x # Calculate the x position based on the column index and spacing
+        y = y_margin + row * spacing_y # Calculate the y position based on the row index and spacing
+        cost = 50 # Default cost for the skin
+        owned = False # Assume the skin is not owned by the player
+        if name in tools.owned_skins: # If the player owns the skin
+            owned = True # Mark the skin as owned
+        skins.append(Skins(x, y, img, cost, 1, name, 35, owned)) # Add the skin to the list of skins
 
+# your GLOBAL variables go here
+menu_background = None # images, font and skins, loaded the first time the shop is opened
+retro_font_15 = None
+checkmark_img = coin_img = coin_img_small = coming_soon_img = None
+skins = []
 cols = 10
 x_margin = 50 # Margin from the left edge of the screen
 y_margin = 150 # Margin from the top edge of the screen
 spacing_x = 75 # Horizontal spacing between skins
 spacing_y = 100 # Vertical spacing between skins
-
-for i, (name, img) in enumerate(tools.type1_skins_imgs.items()): # Iterate through the type 1 skins
-    row = i // cols # Calculate the row index based on the current index and number of columns
-    col = i % cols # Calculate the column index based on the current index and number of columns
-    x = x_margin + col * spacing_x # Calculate the x position based on the column index and spacing
-    y = y_margin + row * spacing_y # Calculate the y position based on the row index and spacing
-    cost = 50 # Default cost for the skin
-    owned = False # Assume the skin is not owned by the player
-    if name in tools.owned_skins: # If the player owns the skin
-        owned = True # Mark the skin as owned
-    skins.append(Skins(x, y, img, cost, 1, name, 35, owned)) # Add the skin to the list of skins
+assets.declare("skin_shop", load_assets, ("main_menu", "skins"))
 
 
 
 # MAIN LOOP
 def run_skin_shop(): #while loop function for the skin shop
     global screen, menu_background, coin_img, skins, done, coming_soon_img
+    assets.load("skin_shop") # load the images and skins the first time the shop is opened
 
     screen.blit(menu_background, (0, 0)) # Draw the skin shop background image onto the screen
         
@@ -197,8 +204,8 @@ def run_skin_shop(): #while loop function for the skin shop
     
     draw_coming_soon(coming_soon_img, 5) # Draw the "Coming Soon" message and the associated image in a row
 
-    # this line draws everything into the window all at once
-    pygame.display.flip()
+    # this line draws the parts of the screen that changed into the window
+    tools.update_display("skin_shop")
     # this line limits the frames per second to 60
     clock.tick(60)
     
@@ -0,0 +1,181 @@
+"""
+stats.py
+Author: Adiv Goldberg
+Date last edited: 2026-10-18
+Program: platformer stats store
+Description:
+-------------
+This module keeps the players coins, best level times, owned skins and selected skin in memory, and saves them to stats.json in the background. It provides:
+- Reading stats.json once, the first time the stats are needed. After that every read is from memory.
+- Changing the stats in memory straight away, each change is also added to a small journal file (stats.journal) so it isnt lost if the game crashes before the next save.
+- Saving in a background thread a moment after the last change, so lots of changes together are saved once.
+- Safe saving: the stats are written to a temporary file, flushed to the disk and then renamed over stats.json, so a crash part way through never leaves a cut off file.
+- Recovering after a crash: the changes in the journal are applied again on top of stats.json when it is read.
+- Saving straight away when the game closes.
+"""
+import json
+import os
+import threading
+import atexit
+
+STATS_FILE = "stats.json" # the saved stats
+JOURNAL_FILE = "stats.journal" # changes since stats.json was last saved, one JSON list per line
+SAVE_DELAY = 1.0 # seconds to wait after a change before saving, so changes close together are saved once
+
+# your FUNCTIONS go here
+def default_stats():
+    """makes the stats of a new player
+
+    Returns:
+        dict: coins, completed_levels, owned_skins and selected_skin
+    """
+    return {"coins": 0, "completed_levels": {}, "owned_skins": {}, "selected_skin": []}
+
+def apply_change(data, change):
+    """applies one change to the stats
+
+    Args:
+        data (dict): the stats, changed in place
+        change (list): ["coins", amount], ["level_time", level path, time], ["skin", name, type] or ["selected_skin", [name, type]]
+    """
+    kind = change[0]
+    if kind == "coins": # new amount of coins
+        data["coins"] = change[1]
+    elif kind == "level_time": # finished a level, keep the best time
+        level_path, new_time = change[1], change[2]
+        data["completed_levels"][level_path] = min(new_time, data["completed_levels"].get(level_path, float("inf")))
+    elif kind == "skin": # bought a skin
+        data["owned_skins"][change[1]] = change[2]
+    elif kind == "selected_skin":
+        data["selected_skin"] = list(change[1])
+
+def read_file():
+    """reads stats.json and applies the journal on top of it, for when the game starts
+
+    Returns:
+        tuple: the stats, and the lines of the journal that were applied (they still need saving)
+    """
+    data = default_stats()
+    lines = []
+    try:
+        with open(STATS_FILE) as filehandle:
+            saved = json.load(filehandle)
+        if isinstance(saved, dict):
+            data.update(saved)
+    except FileNotFoundError: # new player
+        pass
+    except (OSError, ValueError): # cut off by an old version, keep it so the stats can be fixed by hand instead of saving over it
+        try:
+            os.replace(STATS_FILE, STATS_FILE + ".bad")
+        except OSError:
+            pass
+    try:
+        with open(JOURNAL_FILE) as filehandle: # changes that hadnt been saved yet
+            for line in filehandle:
+                try:
+                    apply_change(data, json.loads(line))
+                except (ValueError, IndexError, KeyError, TypeError): # the last line can be cut off if the game crashed while writing it
+                    break
+                lines.append(line)
+    except OSError: # no journal, everything was saved
+        pass
+    return data, lines
+
+def get_stats():
+    """gets the stats, reading them the first time
+
+    Returns:
+        dict: the stats in memory, change them with change_stats not directly
+    """
+    global loaded_stats
+    if loaded_stats is None: # first read, the only time the file is read
+        loaded_stats, recovered = read_file()
+        journal.extend(recovered) # saved with the next save
+    return loaded_stats
+
+def change_stats(change):
+    """changes the stats in memory, adds the change to the journal and saves them soon in the background
+
+    Args:
+        change (list): the change, see apply_change
+    """
+    global writer
+    with lock:
+        apply_change(get_stats(), change)
+        line = json.dumps(change) + "\n"
+        journal.append(line)
+        try:
+            with open(JOURNAL_FILE, "a") as filehandle: # a few bytes, so it is quick
+                filehandle.write(line)
+        except OSError: # cant write the journal (e.g. read only folder), it is still saved with the stats
+            pass
+    if writer is None: # first change, start the saving thread
+        writer = threading.Thread(target=write_behind, name="stats writer", daemon=True)
+        writer.start()
+    changed.set()
+
+def write_behind():
+    """saves the stats a moment after they change, runs on the background thread forever
+    """
+    while True:
+        changed.wait() # wait for a change
+        changed.clear()
+        stop.wait(SAVE_DELAY) # wait a moment for more changes, or less if the game is closing
+        save()
+
+def save():
+    """saves the stats to stats.json if they changed, safely, then empties the journal
+    """
+    with save_lock: # the background thread and closing the game can both save
+        with lock: # copy the stats and how much of the journal they include
+            if not journal:
+                return
+            text = json.dumps(get_stats())
+            saved_lines = len(journal)
+        try:
+            with open(STATS_FILE + ".tmp", "w") as filehandle: # write everything to a new file first
+                filehandle.write(text)
+                filehandle.flush()
+                os.fsync(filehandle.fileno()) # make sure its on the disk before it replaces the old file
+            os.replace(STATS_FILE + ".tmp", STATS_FILE) # swap it in, a crash leaves either the old or the new file
+            sync_folder()
+        except OSError: # cant save, the journal keeps the changes
+            return
+        with lock: # the saved changes arent needed in the journal any more, keep any made while saving
+            del journal[:saved_lines]
+            try:
+                with open(JOURNAL_FILE, "w") as filehandle:
+                    filehandle.writelines(journal)
+            except OSError:
+                pass
+
+def sync_folder():
+    """flushes the rename of stats.json to the disk, only possible on some systems
+    """
+    try:
+        folder = os.open(os.path.dirname(os.path.abspath(STATS_FILE)), os.O_RDONLY)
+    except OSError: # windows cant open folders, it flushes renames itself
+        return
+    try:
+        os.fsync(folder)
+    except OSError:
+        pass
+    finally:
+        os.close(folder)
+
+def close():
+    """saves anything that hasnt been saved, when the game closes
+    """
+    stop.set() # dont let the background thread wait
+    save()
+
+
+# your GLOBAL variables go here
+loaded_stats = None # the stats in memory, read the first time they are needed
+journal = [] # lines of changes since stats.json was last saved
+lock = threading.Lock() # guards the stats and journal between the game and the background thread
+save_lock = threading.Lock() # only one save at a time
+changed = threading.Event() # set when the stats change
+stop = threading.Event() # set when the game is closing
+writer = None # the background saving thread, started by the first change
+atexit.register(close) # save when python exits, however the game is closed
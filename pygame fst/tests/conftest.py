@@ -0,0 +1,56 @@
+"""
+conftest.py
+Author: Adiv Goldberg
+Date last edited: 2026-10-18
+Program: platformer tests
+Description:
+-------------
+Shared setup for the tests. It provides:
+- Running every test from the game folder without a window or sound card, like headless.py, so the modules find their files.
+- Writing small levels to a temporary folder.
+"""
+import os
+import sys
+import pytest
+
+GAME_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) # the folder with the games modules and files
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, GAME_FOLDER)
+
+import level_format
+
+@pytest.fixture(autouse=True)
+def game_folder(monkeypatch):
+    """runs the test from the game folder"""
+    monkeypatch.chdir(GAME_FOLDER)
+
+@pytest.fixture
+def make_level(tmp_path):
+    """writes levels to the temporary folder
+
+    Returns:
+        function: takes a file name and the block grid (and optionally the powerup grid, empty by default), returns the levels filepath
+    """
+    def make(name, blocks, powerups=None):
+        level_path = str(tmp_path / name)
+        if powerups is None:
+            powerups = [[0] * len(row) for row in blocks]
+        level_format.write_level(level_path, {"blocks": blocks, "powerups": powerups})
+        return level_path
+    return make
+
+def run_to_finish_level(finish_column):
+    """block grid of a corridor the player runs right along to a finish block
+
+    Args:
+        finish_column (int): column of the finish block, further means a later finish
+
+    Returns:
+        list: the block grid
+    """
+    columns = finish_column + 3
+    blocks = [[1] * columns] + [[1] + [0] * (columns - 2) + [1] for _ in range(3)] + [[1] * columns] # walls all the way round
+    blocks[3][1] = 13 # spawn in the bottom left
+    blocks[3][finish_column] = 14
+    return blocks
@@ -0,0 +1,32 @@
+"""
+test_headless.py
+Author: Adiv Goldberg
+Date last edited: 2026-10-18
+Program: platformer tests
+Description:
+-------------
+Tests for running levels in the headless simulation.
+"""
+import gameplay
+import headless
+import tools
+from conftest import run_to_finish_level
+
+RIGHT = (True, False, False) # inputs holding right
+
+def test_time_is_the_saved_time(make_level, monkeypatch):
+    saved = []
+    monkeypatch.setattr(gameplay, "save_stats", True) # save the time like the game does, into the list instead of stats.json
+    monkeypatch.setattr(tools, "write_stats", lambda coins=None, level_time=None, new_skin=None, selected_skin=None: saved.append(level_time))
+    monkeypatch.setattr(gameplay, "save_run", lambda best=False: None) # no runs folder
+    for finish_column in range(3, 12): # finish ticks on and off the rounding boundaries
+        level_path = make_level(f"corridor {finish_column}.adiv", run_to_finish_level(finish_column))
+        finished, time, _, _ = headless.run_level(level_path, [RIGHT] * 600)
+        assert finished
+        assert saved.pop() == (level_path, time)
+
+def test_unfinished_level(make_level):
+    level_path = make_level("corridor.adiv", run_to_finish_level(30))
+    finished, time, deaths, ticks = headless.run_level(level_path, [RIGHT] * 10)
+    assert (finished, deaths, ticks) == (False, 0, 10)
+    assert time == round(10 / gameplay.TICK_RATE, 1)
@@ -0,0 +1,39 @@
+"""
+test_level_format.py
+Author: Adiv Goldberg
+Date last edited: 2026-10-18
+Program: platformer tests
+Description:
+-------------
+Tests for the binary level format and converting levels.
+"""
+import json
+import pytest
+import level_format
+
+LEVEL = {"blocks": [[1, 1, 0], [13, 0, 14]], "powerups": [[0, 1, 0], [0, 0, 5]], "image": "background.png"}
+
+def write_json(path, data):
+    """writes a level in the old JSON format"""
+    with open(path, "w") as filehandle:
+        json.dump(data, filehandle)
+
+def test_round_trip(tmp_path):
+    level_path = str(tmp_path / "level.adiv")
+    level_format.write_level(level_path, LEVEL)
+    assert level_format.is_binary(level_path)
+    assert level_format.read_level(level_path) == LEVEL
+
+@pytest.mark.parametrize("blocks", [[], [[]], [[1, 1], [1]]])
+def test_bad_grids_are_value_errors(blocks):
+    with pytest.raises(ValueError):
+        level_format.encode_level({"blocks": blocks, "powerups": blocks})
+
+def test_convert_skips_bad_levels(tmp_path):
+    write_json(tmp_path / "empty.adiv", {"blocks": [], "powerups": []})
+    write_json(tmp_path / "good.adiv", LEVEL)
+    converted, skipped, failed = level_format.convert_levels([str(tmp_path)])
+    assert (converted, skipped) == (1, 0)
+    assert [level_path for level_path, _ in failed] == [str(tmp_path / "empty.adiv")]
+    assert level_format.read_level(str(tmp_path / "good.adiv")) == LEVEL
+    assert not level_format.is_binary(str(tmp_path / "empty.adiv")) # left alone
@@ -0,0 +1,64 @@
+"""
+test_packs.py
+Author: Adiv Goldberg
+Date last edited: 2026-10-18
+Program: platformer tests
+Description:
+-------------
+Tests for writing level packs and adding levels to them.
+"""
+import zipfile
+import level_format
+import packs
+
+def level(image=None, music=None, block=1):
+    """a small level
+
+    Returns:
+        dict: the level data
+    """
+    data = {"blocks": [[block, 0], [13, 0]], "powerups": [[0, 0], [0, 0]]}
+    if image is not None:
+        data["image"] = image
+    if music is not None:
+        data["music"] = music
+    return data
+
+def test_add_level_copies_the_pack_without_decoding_it(tmp_path, monkeypatch):
+    pack_file = str(tmp_path / "test.adivpack")
+    packs.write_pack(pack_file, [("level 1.adiv", level("background.png")), ("level 2.adiv", level("background.png"))])
+    _, manifest = packs.open_pack(pack_file)
+    assert len(manifest["media"]) == 1 # the shared background once
+
+    def no_decoding(raw):
+        raise AssertionError("a level already in the pack was decoded")
+    monkeypatch.setattr(level_format, "parse_level", no_decoding)
+    shared = packs.list_levels(pack_file)[0]
+    level_path = packs.add_level(pack_file, level(pack_file + packs.PACK_SEPARATOR + manifest["media"][0], block=3)) # uses the packs background
+    monkeypatch.undo()
+
+    assert level_path == pack_file + packs.PACK_SEPARATOR + "levels/level 3.adiv"
+    _, manifest = packs.open_pack(pack_file)
+    assert len(manifest["media"]) == 1
+    assert packs.read_level(level_path)["blocks"] == [[3, 0], [13, 0]]
+    assert packs.read_level(shared)["image"] == pack_file + packs.PACK_SEPARATOR + manifest["media"][0]
+    with open("background.png", "rb") as filehandle:
+        assert packs.read_file(packs.read_level(shared)["image"]) == filehandle.read()
+
+def test_replacing_a_level_drops_its_unused_files(tmp_path):
+    pack_file = str(tmp_path / "test.adivpack")
+    packs.add_level(pack_file, level("background.png"))
+    packs.add_level(pack_file, level("clouds.png"), "level 2.adiv")
+    packs.add_level(pack_file, level(block=4), "level 2.adiv") # no image any more
+    _, manifest = packs.open_pack(pack_file)
+    assert [entry["file"] for entry in manifest["levels"]] == ["levels/level 1.adiv", "levels/level 2.adiv"]
+    assert len(manifest["media"]) == 1 and manifest["media"][0].endswith("background.png")
+    with zipfile.ZipFile(pack_file) as archive:
+        assert sorted(archive.namelist()) == sorted([packs.MANIFEST, "levels/level 1.adiv", "levels/level 2.adiv"] + manifest["media"])
+    assert packs.read_level(pack_file + packs.PACK_SEPARATOR + "levels/level 2.adiv")["blocks"] == [[4, 0], [13, 0]]
+
+def test_missing_media_is_left_out(tmp_path):
+    pack_file = str(tmp_path / "test.adivpack")
+    level_path = packs.add_level(pack_file, level("no such image.png", pack_file + "::media/missing.mp3"))
+    data = packs.read_level(level_path)
+    assert "image" not in data and "music" not in data
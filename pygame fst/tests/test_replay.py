@@ -0,0 +1,44 @@
+"""
+test_replay.py
+Author: Adiv Goldberg
+Date last edited: 2026-10-18
+Program: platformer tests
+Description:
+-------------
+Tests for recording runs and replaying them in the headless simulation.
+"""
+import gameplay
+import headless
+import replay
+from conftest import run_to_finish_level
+
+RIGHT = (True, False, False) # inputs holding right
+
+def boundary_level(make_level):
+    """makes a corridor level whose finish tick is the last one before the rounded time goes up, so a time one tick late wouldnt match
+
+    Returns:
+        string: filepath of the level
+    """
+    for finish_column in range(3, 40):
+        level_path = make_level(f"boundary {finish_column}.adiv", run_to_finish_level(finish_column))
+        finished, _, _, _ = headless.run_level(level_path, [RIGHT] * 600)
+        assert finished
+        ticks = gameplay.finish_time
+        if round(ticks / gameplay.TICK_RATE, 1) != round((ticks + 1) / gameplay.TICK_RATE, 1):
+            return level_path
+    raise AssertionError("no finish tick on a rounding boundary")
+
+def test_replay_matches_recorded_time(make_level, tmp_path):
+    level_path = boundary_level(make_level)
+    finished, time, deaths, ticks = headless.run_level(level_path, [RIGHT] * 600)
+    run_path = str(tmp_path / "run.adivrun")
+    gameplay.recorder.save(run_path) # the simulation records its inputs like the game does
+    _, _, _, inputs, finish_time = replay.read_run(run_path)
+    assert finished and deaths == 0
+    assert len(inputs) == ticks
+    assert time == round(finish_time / gameplay.TICK_RATE, 1)
+
+    replay_finished, replay_time, replay_deaths, replay_ticks = replay.replay_run(run_path)
+    assert (replay_finished, replay_time, replay_deaths, replay_ticks) == (True, time, 0, ticks)
+    assert gameplay.finish_time == finish_time # the same tick, not just the same rounded time
@@ -0,0 +1,28 @@
+"""
+test_thumbnails.py
+Author: Adiv Goldberg
+Date last edited: 2026-10-18
+Program: platformer tests
+Description:
+-------------
+Tests for the level preview cache.
+"""
+import catalog
+import thumbnails
+
+def test_failed_preview_is_not_looked_for_again(monkeypatch, tmp_path):
+    entry = {"hash": "not drawn", "mtime": 1.0, "image": None}
+    monkeypatch.setattr(catalog, "get_level", lambda level_path: entry)
+    monkeypatch.setattr(thumbnails, "THUMB_FOLDER", str(tmp_path)) # empty, the preview was never drawn
+    monkeypatch.setattr(thumbnails, "failed", {})
+    looked = []
+    monkeypatch.setattr(thumbnails, "thumb_path", lambda entry: looked.append(entry["mtime"]) or str(tmp_path / "missing.png"))
+
+    assert thumbnails.get_thumbnail("broken.adiv") is None
+    assert thumbnails.get_thumbnail("broken.adiv") is None # every frame the menu draws
+    thumbnails.request_thumbnails(["broken.adiv"])
+    assert looked == [1.0] and thumbnails.pool is None
+
+    entry["mtime"] = 2.0 # the level changed, try again
+    assert thumbnails.get_thumbnail("broken.adiv") is None
+    assert looked == [1.0, 2.0]
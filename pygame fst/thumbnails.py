@@ -0,0 +1,217 @@
+"""
+thumbnails.py
+Author: Adiv Goldberg
+Date last edited: 2026-10-18
+Program: platformer level thumbnails
+Description:
+-------------
+This module makes small previews of levels for the play menu, drawn from their block and powerup grids on top of their background. It provides:
+- Drawing a level preview in a separate process, without a window, from the level file and the tile images.
+- Drawing the previews of many levels at once in a pool of processes, so the menu keeps running while they are drawn.
+- Caching the previews as PNGs in the thumbnail cache folder, named from a hash of the level (from the level catalog) and its background,
+  so a preview is only drawn again when its level changes. The folder is safe to delete.
+- Getting a levels preview for drawing, None until it is ready.
+"""
+# import the pygame module
+import pygame
+import os
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import catalog
+import level_format
+
+THUMB_FOLDER = "thumbnail cache" # where the previews are cached, safe to delete
+THUMB_VERSION = 1 # change when the previews are drawn differently, so the old ones are drawn again
+THUMB_BOX = (46, 46) # most width and height of a preview, it keeps the levels shape. fits inside the level outline in the play menu
+TILE_PX = 8 # size of a tile when the level is drawn, before it is shrunk to the preview
+MAX_WORKERS = 4 # most processes drawing previews at once
+HEADLESS_ENV = {"SDL_VIDEODRIVER": "dummy", "SDL_AUDIODRIVER": "dummy"} # drawing every preview from the command line needs no window or sound
+DEFAULT_BACKGROUND = "background.png" # background of levels without their own image, the same as gameplay
+# image of each block type, the first frame of animated blocks. the same files as gameplay.load_images
+BLOCK_FILES = {1: "tiles for game/full block(1).png", 2: "tiles for game/phase block(2).png", 3: "tiles for game/floor piece(3).png",
+               4: "tiles for game/roof piece(4).png", 5: "tiles for game/left wall(5).png", 6: "tiles for game/right wall(6).png",
+               7: "tiles for game/bottom right wall(7).png", 8: "tiles for game/bottom left wall(8).png", 9: "tiles for game/top right wall(9).png",
+               10: "tiles for game/top left wall(10).png", 11: "tiles for game/death block(11).png", 12: "tiles for game/checkpoint(12).png",
+               13: "tiles for game/spawn block(13).png", 14: "tiles for game/finish block 1(14).png", 15: "tiles for game/floor death piece1(15).png",
+               16: "tiles for game/key block(16).png", 17: "tiles for game/phase block(2).png"}
+POWER_UP_FILES = {1: "powerups for game/coin(1).png", 2: "powerups for game/double jump(2).png", 3: "powerups for game/wall jump(3).png",
+                  4: "powerups for game/high jump(4).png", 5: "powerups for game/key(5).png"}
+
+# your FUNCTIONS go here
+def thumb_path(entry):
+    """gets where the preview of a level is cached
+
+    Args:
+        entry (dict): the levels catalog entry
+
+    Returns:
+        string: filepath of the cached PNG, it changes when the level, its background image or the preview size changes
+    """
+    image = entry.get("image") or DEFAULT_BACKGROUND
+    try:
+        image_mtime = os.path.getmtime(image)
+    except (OSError, TypeError): # no image, the preview has no background
+        image_mtime = None
+    key = f"{entry['hash']}|{image}|{image_mtime}|{THUMB_BOX}|{THUMB_VERSION}"
+    return os.path.join(THUMB_FOLDER, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".png")
+
+def load_rgba(file_path):
+    """loads an image as 32 bit RGBA whatever format the file is, without the display (like tools.decode_scaled), so it can be smoothscaled
+
+    Args:
+        file_path (string): filepath of the image
+
+    Returns:
+        pygame.Surface: the image
+    """
+    img = pygame.image.load(file_path)
+    return pygame.image.frombytes(pygame.image.tobytes(img, "RGBA"), img.get_size(), "RGBA")
+
+def tile_image(file_path):
+    """loads a tile image shrunk to TILE_PX, once per worker process
+
+    Args:
+        file_path (string): filepath of the tile
+
+    Returns:
+        pygame.Surface: the tile, None if it cant be loaded
+    """
+    if file_path not in tile_imgs:
+        try:
+            tile_imgs[file_path] = pygame.transform.smoothscale(load_rgba(file_path), (TILE_PX, TILE_PX))
+        except (pygame.error, OSError): # missing tile, left out of the preview
+            tile_imgs[file_path] = None
+    return tile_imgs[file_path]
+
+def render_thumbnail(level_path, cache_path):
+    """draws the preview of a level and saves it, runs in a worker process
+
+    Args:
+        level_path (string): filepath of the .adiv file
+        cache_path (string): where to save the preview
+
+    Returns:
+        string: cache_path, once it is saved
+    """
+    data = level_format.read_level(level_path)
+    blocks, powerups = data["blocks"], data["powerups"]
+    level_img = pygame.Surface((len(blocks[0]) * TILE_PX, len(blocks) * TILE_PX), pygame.SRCALPHA)
+    try: # the background stretched over the whole level
+        level_img.blit(pygame.transform.smoothscale(load_rgba(data.get("image") or DEFAULT_BACKGROUND), level_img.get_size()), (0, 0))
+    except (pygame.error, OSError, TypeError): # no background, the tiles on their own
+        pass
+    for grid, files in ((blocks, BLOCK_FILES), (powerups, POWER_UP_FILES)): # blocks then powerups on top
+        for row_num, row in enumerate(grid):
+            for col_num, value in enumerate(row):
+                if value in files:
+                    img = tile_image(files[value])
+                    if img is not None:
+                        level_img.blit(img, (col_num * TILE_PX, row_num * TILE_PX))
+    scale = min(THUMB_BOX[0] / level_img.get_width(), THUMB_BOX[1] / level_img.get_height()) # fit in the box, keeping the levels shape
+    thumb = pygame.transform.smoothscale(level_img, (max(1, round(level_img.get_width() * scale)), max(1, round(level_img.get_height() * scale))))
+    os.makedirs(THUMB_FOLDER, exist_ok=True)
+    pygame.image.save(thumb, cache_path + ".tmp.png") # a crash never leaves half a preview
+    os.replace(cache_path + ".tmp.png", cache_path)
+    return cache_path
+
+def request_thumbnails(level_paths):
+    """starts drawing the previews of levels that arent cached, in the worker processes
+
+    Args:
+        level_paths (list): filepaths of the levels, they must be in the level catalog
+    """
+    global pool
+    wanted = {}
+    for level_path in level_paths:
+        entry = catalog.get_level(level_path)
+        if entry is None or failed.get(level_path) == entry["mtime"]: # not a level, or its preview couldnt be drawn and it hasnt changed since
+            continue
+        cache_path = thumb_path(entry)
+        if cache_path not in thumbs and cache_path not in pending and not os.path.isfile(cache_path): # not drawn yet
+            wanted[cache_path] = level_path
+    if not wanted:
+        return
+    if pool is None: # spawned, not forked, so the workers dont copy the game and its threads. they only import this module, main.py starts the game under its __main__ check
+        pool = ProcessPoolExecutor(min(MAX_WORKERS, os.cpu_count() or 1), multiprocessing.get_context("spawn"))
+    for cache_path, level_path in wanted.items():
+        pending[cache_path] = pool.submit(render_thumbnail, level_path, cache_path)
+
+def get_thumbnail(level_path):
+    """gets the preview of a level for drawing
+
+    Args:
+        level_path (string): filepath of the .adiv file
+
+    Returns:
+        pygame.Surface: the preview, None if it isnt ready yet or couldnt be drawn
+    """
+    entry = catalog.get_level(level_path)
+    if entry is None or failed.get(level_path) == entry["mtime"]: # not a level, or its preview couldnt be drawn, checked before any file is looked at
+        return None
+    cache_path = thumb_path(entry)
+    if cache_path in thumbs:
+        return thumbs[cache_path]
+    job = pending.get(cache_path)
+    if job is not None:
+        if not job.done(): # still being drawn
+            return None
+        del pending[cache_path]
+        if not pending: # nothing left to draw, let the workers close
+            close()
+        if job.exception() is not None: # couldnt be drawn, dont try again until the level changes
+            failed[level_path] = entry["mtime"]
+            return None
+    try:
+        thumbs[cache_path] = pygame.image.load(cache_path).convert_alpha()
+    except (pygame.error, OSError): # not drawn and not being drawn, dont try again until the level changes
+        failed[level_path] = entry["mtime"]
+        return None
+    return thumbs[cache_path]
+
+def trim_cache():
+    """deletes cached previews of levels that have changed or been deleted
+    """
+    keep = {os.path.basename(thumb_path(entry)) for entry in catalog.update_catalog().values() if "error" not in entry}
+    try:
+        names = os.listdir(THUMB_FOLDER)
+    except OSError: # no previews yet
+        return
+    for name in names:
+        if name.endswith(".png") and name not in keep and not name.endswith(".tmp.png"):
+            try:
+                os.remove(os.path.join(THUMB_FOLDER, name))
+            except OSError:
+                pass
+
+def close():
+    """stops the worker processes, previews still waiting to be drawn are drawn next time
+    """
+    global pool
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+        pool = None
+    for cache_path in [cache_path for cache_path, job in pending.items() if job.cancelled()]:
+        del pending[cache_path]
+
+
+# your GLOBAL variables go here
+pool = None # the worker processes, started by the first preview that needs drawing
+pending = {} # cache path to the job drawing it
+thumbs = {} # cache path to the loaded preview
+failed = {} # level path to the modification time of the level when its preview couldnt be drawn, it is tried again when the level changes
+tile_imgs = {} # tile filepath to its shrunk image, in each worker process
+
+
+if __name__ == "__main__": # draw every levels preview
+    os.environ.update(HEADLESS_ENV)
+    pygame.display.init()
+    pygame.display.set_mode((1, 1)) # to convert the previews
+    level_paths = [level_path for level_path in catalog.update_catalog() if catalog.get_level(level_path) is not None]
+    request_thumbnails(level_paths)
+    for job in list(pending.values()):
+        job.exception() # wait for it
+    trim_cache()
+    drawn = sum(1 for level_path in level_paths if get_thumbnail(level_path) is not None)
+    close()
+    print(f"{drawn} of {len(level_paths)} level previews in {THUMB_FOLDER}")
@@ -1,7 +1,7 @@
 """ 
 tools.py
 Author: Adiv Goldberg
-Date last edited: 2025-06-09
+Date last edited: 2026-10-18
 Program: platformer tools module
 Description:
 -------------
@@ -9,11 +9,24 @@ This module provides utility functions and classes for the platformer game, incl
 - Functions for loading and managing game assets (images, sounds, etc.).
 - Classes for representing game objects (players, enemies, items, etc.).
 - Functions for handling user input and game events.
+- A shared cache of rendered text, so the same label is not rendered again every frame.
+- Dirty rectangle display updates, so each frame only the areas of the screen that changed are pushed to the window.
+- A fixed 800 x 600 screen that everything is drawn on, shown scaled to any window size or fullscreen (F11) by SDL.
+- The game statistics, read from and changed in the stats store (stats.py) which saves them safely in the background.
+- A disk cache of scaled images, so big images are not loaded and scaled down again every launch.
+- The skins and clouds as asset groups, only loaded when a screen that shows them is first opened.
 - middle man file to avoid circular dependencies between modules
 """
 # import the pygame module
 import pygame
-import json
+import os
+import hashlib
+import struct
+import atlas
+import assets
+import stats
+import packs
+from collections import OrderedDict
 
 # colour variables, (R, G, B) from 0-255
 WHITE = (255,255,255)
@@ -24,8 +37,11 @@ BLUE = (0,0,255)
 
 # initializes the pygame module
 pygame.init()
-SCREEN_X, SCREEN_Y = (800, 600)
-screen = pygame.display.set_mode((SCREEN_X, SCREEN_Y))
+SCREEN_X, SCREEN_Y = (800, 600) # size of the screen the game draws on, the window can be any size
+# every module draws on this one screen, SDL scales it to fit the window (on the graphics card when it can) and keeps mouse positions in screen pixels
+# without a real display (headless) there is no window to scale to
+SCREEN_FLAGS = 0 if pygame.display.get_driver() in ("dummy", "offscreen") else pygame.SCALED | pygame.RESIZABLE
+screen = pygame.display.set_mode((SCREEN_X, SCREEN_Y), SCREEN_FLAGS)
 
 class Status_Info:
     def __init__(self, keys, mouse_pos, just_jumped, left_mouse_down, right_mouse_down, h_Lmouse, h_Rmouse):
@@ -87,6 +103,10 @@ def check_input():
                 just_jumped = True # Set just_jumped to True to indicate the player has jumped
             if event.key == pygame.K_UP: # If the up arrow key is pressed
                 just_jumped = True # Set just_jumped to True to indicate the player has jumped
+            if event.key == pygame.K_F11: # If F11 is pressed
+                toggle_fullscreen() # switch between fullscreen and a window
+        if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWSIZECHANGED): # If the window was covered (e.g. by a file dialog) or resized and needs repainting
+            request_full_update() # push the whole screen next frame
         if event.type == pygame.MOUSEBUTTONDOWN: # If a mouse button is pressed down
             if event.button == 1: # If the left mouse button is pressed
                 left_mouse_down = True # Set left_mouse_down to True to indicate the left mouse button is pressed
@@ -100,36 +120,36 @@ def load_type1_skins():
     Returns:
         dict: A dictionary containing the loaded animal skin images.
     """
-    bear = pygame.image.load('characters/simple animals/bear.png')
-    buffalo = pygame.image.load('characters/simple animals/buffalo.png')
-    chick = pygame.image.load('characters/simple animals/chick.png')
-    chicken = pygame.image.load('characters/simple animals/chicken.png')
-    cow = pygame.image.load('characters/simple animals/cow.png')
-    crocodile = pygame.image.load('characters/simple animals/crocodile.png')
-    dog = pygame.image.load('characters/simple animals/dog.png')
-    duck = pygame.image.load('characters/simple animals/duck.png')
-    elephant = pygame.image.load('characters/simple animals/elephant.png')
-    frog = pygame.image.load('characters/simple animals/frog.png')
-    giraffe = pygame.image.load('characters/simple animals/giraffe.png')
-    goat = pygame.image.load('characters/simple animals/goat.png')
-    gorilla = pygame.image.load('characters/simple animals/gorilla.png')
-    hippo = pygame.image.load('characters/simple animals/hippo.png')
-    horse = pygame.image.load('characters/simple animals/horse.png')
-    monkey = pygame.image.load('characters/simple animals/monkey.png')
-    moose = pygame.image.load('characters/simple animals/moose.png')
-    narwhal = pygame.image.load('characters/simple animals/narwhal.png')
-    owl = pygame.image.load('characters/simple animals/owl.png')
-    panda = pygame.image.load('characters/simple animals/panda.png')
-    parrot = pygame.image.load('characters/simple animals/parrot.png')
-    penguin = pygame.image.load('characters/simple animals/penguin.png')
-    pig = pygame.image.load('characters/simple animals/pig.png')
-    rabbit = pygame.image.load('characters/simple animals/rabbit.png')
-    rhino = pygame.image.load('characters/simple animals/rhino.png')
-    sloth = pygame.image.load('characters/simple animals/sloth.png')
-    snake = pygame.image.load('characters/simple animals/snake.png')
-    walrus = pygame.image.load('characters/simple animals/walrus.png')
-    whale = pygame.image.load('characters/simple animals/whale.png')
-    zebra = pygame.image.load('characters/simple animals/zebra.png')
+    bear = atlas.load_image('characters/simple animals/bear.png')
+    buffalo = atlas.load_image('characters/simple animals/buffalo.png')
+    chick = atlas.load_image('characters/simple animals/chick.png')
+    chicken = atlas.load_image('characters/simple animals/chicken.png')
+    cow = atlas.load_image('characters/simple animals/cow.png')
+    crocodile = atlas.load_image('characters/simple animals/crocodile.png')
+    dog = atlas.load_image('characters/simple animals/dog.png')
+    duck = atlas.load_image('characters/simple animals/duck.png')
+    elephant = atlas.load_image('characters/simple animals/elephant.png')
+    frog = atlas.load_image('characters/simple animals/frog.png')
+    giraffe = atlas.load_image('characters/simple animals/giraffe.png')
+    goat = atlas.load_image('characters/simple animals/goat.png')
+    gorilla = atlas.load_image('characters/simple animals/gorilla.png')
+    hippo = atlas.load_image('characters/simple animals/hippo.png')
+    horse = atlas.load_image('characters/simple animals/horse.png')
+    monkey = atlas.load_image('characters/simple animals/monkey.png')
+    moose = atlas.load_image('characters/simple animals/moose.png')
+    narwhal = atlas.load_image('characters/simple animals/narwhal.png')
+    owl = atlas.load_image('characters/simple animals/owl.png')
+    panda = atlas.load_image('characters/simple animals/panda.png')
+    parrot = atlas.load_image('characters/simple animals/parrot.png')
+    penguin = atlas.load_image('characters/simple animals/penguin.png')
+    pig = atlas.load_image('characters/simple animals/pig.png')
+    rabbit = atlas.load_image('characters/simple animals/rabbit.png')
+    rhino = atlas.load_image('characters/simple animals/rhino.png')
+    sloth = atlas.load_image('characters/simple animals/sloth.png')
+    snake = atlas.load_image('characters/simple animals/snake.png')
+    walrus = atlas.load_image('characters/simple animals/walrus.png')
+    whale = atlas.load_image('characters/simple animals/whale.png')
+    zebra = atlas.load_image('characters/simple animals/zebra.png')
     return {
         "bear": bear,
         "buffalo": buffalo,
@@ -169,41 +189,42 @@ def load_type2_skin():
     Returns:
         tuple: A tuple containing the loaded runner character skins.
     """
-    standing = pygame.image.load("characters/runner/standing.png").convert_alpha()
-    falling = pygame.image.load("characters/runner/falling.png").convert_alpha()
-    jumping = pygame.image.load("characters/runner/jumping.png").convert_alpha()
-    run1 = pygame.image.load("characters/runner/run1.png").convert_alpha()
-    run2 = pygame.image.load("characters/runner/run2.png").convert_alpha()
-    run3 = pygame.image.load("characters/runner/run3.png").convert_alpha()
+    standing = atlas.load_image("characters/runner/standing.png")
+    falling = atlas.load_image("characters/runner/falling.png")
+    jumping = atlas.load_image("characters/runner/jumping.png")
+    run1 = atlas.load_image("characters/runner/run1.png")
+    run2 = atlas.load_image("characters/runner/run2.png")
+    run3 = atlas.load_image("characters/runner/run3.png")
     return  standing, falling, jumping, run1, run2, run3
 
-def read_stats_dict():
-    """Reads the game statistics from the stats.json file.
+def load_skins():
+    """Loads the images of every skin, for the "skins" asset group.
+    """
+    global type1_skins_imgs, person_imgs
+    type1_skins_imgs = load_type1_skins() # Load the type 1 skins images from the 'characters/simple animals' folder
+    person_imgs = load_type2_skin() # Load the runner character skins
 
-    Returns:
-        dict: A dictionary containing the game statistics.
+def load_clouds():
+    """Loads the cloud image drawn over the menus, for the "clouds" asset group.
     """
-    try:
-        with open("stats.json") as filehandle: # Open the stats.json file
-            return json.load(filehandle) # Load the JSON data from the file
-    except:
-        return {} # If the file does not exist or cannot be read, return an empty dictionary
+    global cloud_img
+    cloud_img = assets.get_image("clouds.png") # Get the cloud image for drawing clouds from the shared image cache
 
 def read_stats():
-    """Reads the game statistics from the stats.json file.
+    """Gets the game statistics from the stats store, in memory after the first read.
 
     Returns:
-        tuple: A tuple containing the game statistics.
+        tuple: A tuple containing the game statistics, copies so changing them doesn't change the store.
     """
-    data = read_stats_dict() # Read the statistics dictionary from the stats.json file
-    coins = data.get("coins", 0) # Get the number of coins, defaulting to 0 if not found
-    complete_levels = data.get("completed_levels", {}) # Get the completed levels, defaulting to an empty dictionary if not found
-    owned_skins = data.get("owned_skins", {}) # Get the owned skins, defaulting to an empty dictionary if not found
-    selected_skin = data.get("selected_skin", []) # Get the selected skin, defaulting to an empty list if not found
+    data = stats.get_stats() # The stats in memory, stats.json is only read the first time
+    coins = data["coins"] # The number of coins
+    complete_levels = dict(data["completed_levels"]) # The completed levels and their best times
+    owned_skins = dict(data["owned_skins"]) # The owned skins
+    selected_skin = list(data["selected_skin"]) # The selected skin
     return coins, complete_levels, owned_skins, selected_skin
 
 def write_stats(coins=None, level_time=None, new_skin=None, selected_skin=None):
-    """Writes the game statistics to the stats.json file.
+    """Changes the game statistics in the stats store, which saves them to stats.json in the background.
 
     Args:
         coins (int, optional): The number of coins to update. Defaults to None.
@@ -211,25 +232,19 @@ def write_stats(coins=None, level_time=None, new_skin=None, selected_skin=None):
         new_skin (tuple, optional): A tuple containing the skin name and skin type to add. Defaults to None.
         selected_skin (list, optional): A list of selected skins to update. Defaults to None.
     """
-    data = read_stats_dict() # Read the statistics dictionary from the stats.json file
-        
     if coins is not None: # If coins is provided
-        data["coins"] = coins # Update the coins in the statistics dictionary
+        stats.change_stats(["coins", coins]) # Update the coins
 
     if level_time is not None: # If level_time is provided
         level_path, new_time = level_time # Unpack the level path and new time
-        saved_score = data["completed_levels"].get(level_path, float('inf')) # Get the saved time for the level, defaulting to infinity if not found
-        data["completed_levels"][level_path] = min(new_time, saved_score) # Update the level time, keeping the minimum of the new time and saved score
+        stats.change_stats(["level_time", level_path, new_time]) # Update the level time, the store keeps the minimum of the new time and saved score
 
     if new_skin is not None: # If new_skin is provided
         skin_name, skin_type = new_skin # Unpack the skin name and skin type
-        data["owned_skins"][skin_name] = skin_type # Add the new skin to the owned skins dictionary
-        
-    if selected_skin is not None: # If selected_skin is provided
-        data["selected_skin"] = selected_skin # Update the selected skin in the statistics dictionary
+        stats.change_stats(["skin", skin_name, skin_type]) # Add the new skin to the owned skins
 
-    with open("stats.json", "w") as filehandle: # Open the stats.json file in write mode
-        json.dump(data, filehandle) # Write the updated statistics dictionary to the file
+    if selected_skin is not None: # If selected_skin is provided
+        stats.change_stats(["selected_skin", selected_skin]) # Update the selected skin
         
 def draw_clouds(cloud_img, cloud_x):
     """Draws the clouds on the screen.
@@ -241,18 +256,189 @@ def draw_clouds(cloud_img, cloud_x):
     Returns:
         int: The updated x-coordinate of the cloud.
     """
-    global SCREEN_X
+    global SCREEN_X, cloud_strips, cloud_strips_img
     if cloud_img is not None: # Check if the cloud image is loaded
         screen.blit(cloud_img, (cloud_x,0)) # Draw the cloud image at the specified x-coordinate and at the top of the screen
+        if cloud_img is not cloud_strips_img: # new cloud image, find which rows change as it scrolls
+            cloud_strips = get_cloud_strips(cloud_img)
+            cloud_strips_img = cloud_img
+        for strip in cloud_strips: # only these rows of the screen change
+            mark_dirty(strip)
         cloud_x -= 1 # Move the cloud to the left by 1 pixel
         cloud_x %= SCREEN_X - cloud_img.get_width() # Wrap the cloud position around the screen width to create a continuous scrolling effect
         return cloud_x 
     return 0 # If the cloud image is not loaded, return 0
 
 
+def get_cloud_strips(cloud_img):
+    """Finds the rows of the cloud image that look different when it scrolls sideways, so only those need to be updated.
+
+    Args:
+        cloud_img (Surface): The image of the cloud.
+
+    Returns:
+        list: pygame.Rects across the screen for each run of rows that changes.
+    """
+    width = cloud_img.get_width() # width of the image
+    row_size = width * 4 # bytes in each row
+    data = pygame.image.tobytes(cloud_img, "RGBA") # raw pixels of the image
+    strips = []
+    start = None # first row of the current run of changing rows
+    for y in range(min(cloud_img.get_height(), SCREEN_Y) + 1): # go through each row on the screen, and one past the end to close the last run
+        row = data[y * row_size:(y + 1) * row_size] # pixels of the row
+        changes = y < min(cloud_img.get_height(), SCREEN_Y) and row[4:] != row[:-4] # if moving it a pixel sideways changes it
+        if changes and start is None: # start of a run
+            start = y
+        elif not changes and start is not None: # end of a run
+            strips.append(pygame.Rect(0, start, SCREEN_X, y - start))
+            start = None
+    return strips
+
+def render_text(font, text, colour):
+    """Renders text with a font, reusing the surface if the same text was rendered recently.
+
+    Args:
+        font (pygame.font.Font): The font to render with.
+        text (str): The text to render.
+        colour (tuple): (R, G, B) colour of the text.
+
+    Returns:
+        pygame.Surface: The rendered text, shared with other callers so it should not be drawn on.
+    """
+    key = (font, text, colour)
+    text_img = text_cache.get(key)
+    if text_img is None: # not rendered recently, render it and remember it
+        text_img = font.render(text, True, colour)
+        text_cache[key] = text_img
+        if len(text_cache) > TEXT_CACHE_SIZE: # too many, forget the one used longest ago
+            text_cache.popitem(last=False)
+    else: # used again, move it to the newest end
+        text_cache.move_to_end(key)
+    return text_img
+
+def toggle_fullscreen():
+    """Switches the window between fullscreen and windowed, the screen is scaled to fit either way.
+    """
+    try:
+        pygame.display.toggle_fullscreen()
+    except pygame.error: # Some video drivers cant go fullscreen, stay in a window
+        pass
+    request_full_update() # the whole window needs drawing again
+
+def load_scaled(file_path, size):
+    """Loads an image scaled to a size, from the scaled image cache if it was scaled before.
+    An image is scaled again if its file or the size changes.
+
+    Args:
+        file_path (str): The path of the image to load.
+        size (tuple): (width, height) to scale it to, in screen pixels. One of them can be None to keep the images shape.
+
+    Returns:
+        pygame.Surface: The scaled image, converted for fast drawing.
+
+    Raises:
+        pygame.error, FileNotFoundError: If the image can't be loaded, the same as pygame.image.load.
+    """
+    return decode_scaled(file_path, size).convert_alpha() # Converting needs the display, so it is done here and not in decode_scaled
+
+def decode_scaled(file_path, size):
+    """Decodes and scales an image like load_scaled, without converting it for the display.
+    It doesn't touch the display, so it can run on the background loading thread.
+
+    Args:
+        file_path (str): The path of the image to load.
+        size (tuple): (width, height) to scale it to, in screen pixels. One of them can be None to keep the images shape.
+
+    Returns:
+        pygame.Surface: The scaled image as 32 bit RGBA, convert_alpha it on the main thread before drawing it.
+
+    Raises:
+        pygame.error, FileNotFoundError: If the image can't be loaded, the same as pygame.image.load.
+    """
+    stat = packs.get_stat(file_path) # images in level packs change with their pack
+    key = f"{os.path.abspath(file_path)}|{stat.st_mtime}|{stat.st_size}|{size}" # changes if the file or the size it is scaled to changes, the screen is always SCREEN_X x SCREEN_Y
+    cache_path = os.path.join(SCALED_FOLDER, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".rgba")
+    try:
+        with open(cache_path, "rb") as filehandle: # Raw pixels, much faster to read than decoding and scaling the image
+            data = filehandle.read()
+        width, height = SCALED_HEADER.unpack_from(data) # size it was scaled to
+        if len(data) == SCALED_HEADER.size + width * height * 4: # Not cut short
+            return pygame.image.frombuffer(data[SCALED_HEADER.size:], (width, height), "RGBA")
+    except (OSError, struct.error): # Not scaled before
+        pass
+    img = packs.load_image(file_path) # Load it, on its own or from a level pack
+    img = pygame.image.frombytes(pygame.image.tobytes(img, "RGBA"), img.get_size(), "RGBA") # As 32 bit RGBA whatever format the file was, like convert_alpha but without the display
+    width, height = size
+    if width is None: # keep the shape, from the height
+        width = height * img.get_width() / img.get_height()
+    elif height is None: # from the width
+        height = width * img.get_height() / img.get_width()
+    img = pygame.transform.scale(img, (int(width), int(height))) # Scale it, whole pixels
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(cache_path + ".tmp", "wb") as filehandle: # Write to a temporary file and then rename it, so a half written file is never read
+            filehandle.write(SCALED_HEADER.pack(*img.get_size()) + pygame.image.tobytes(img, "RGBA"))
+        os.replace(cache_path + ".tmp", cache_path)
+    except OSError: # Can't write the cache (e.g. read only folder), it just gets scaled again next time
+        pass
+    return img
+
+def mark_dirty(area):
+    """Marks an area of the screen as changed this frame, so update_display pushes it to the window.
+
+    Args:
+        area (tuple or Rect): x, y, width, height of the area that changed.
+    """
+    dirty_rects.append(pygame.Rect(area)) # Add it to the list of changed areas
+
+def request_full_update():
+    """Makes update_display push the whole screen this frame and the next, for when too much changes to keep track of.
+    The next frame is included because things that change part way through drawing a frame only show up fully in the next one.
+    """
+    global full_updates
+    full_updates = 2
+
+def update_display(scene):
+    """Pushes the frame to the window, only the areas marked with mark_dirty unless a full update is needed.
+
+    Args:
+        scene (str): The game state being drawn, the whole screen is pushed on the first frame of a new scene.
+    """
+    global dirty_rects, full_updates, drawn_scene
+    if scene != drawn_scene: # first frame of a new scene, everything changed
+        request_full_update()
+        drawn_scene = scene
+    screen_rect = pygame.Rect(0, 0, SCREEN_X, SCREEN_Y) # the whole screen
+    rects = [area.clip(screen_rect) for area in dirty_rects] # keep the changed areas on the screen
+    if sum(area.width * area.height for area in rects) > DIRTY_LIMIT * SCREEN_X * SCREEN_Y: # so much changed that one full update is faster
+        full_updates = max(full_updates, 1)
+    if full_updates > 0 or not use_dirty_rects: # push everything
+        pygame.display.flip()
+    elif rects: # push only the changed areas
+        pygame.display.update(rects)
+    dirty_rects = [] # start the next frame with nothing changed
+    full_updates = max(full_updates - 1, 0) # one less full update left
+
+
 game_state = "main_menu" # Global variable to keep track of the current game state
-type1_skins_imgs = load_type1_skins() # Load the type 1 skins images from the 'characters/simple animals' folder
-person_imgs = load_type2_skin() # Load the runner character skins
-coins, complete_levels, owned_skins, selected_skin = read_stats() # Read the game statistics from the stats.json file
-cloud_img = pygame.image.load("clouds.png").convert_alpha() # Load the cloud image for drawing clouds
-cloud_x = 0 # Initial x-coordinate for the cloud image
\ No newline at end of file
+type1_skins_imgs = {} # skin name to image of each type 1 skin, loaded with the "skins" asset group
+person_imgs = None # the runner character images, loaded with the "skins" asset group
+assets.declare("skins", load_skins)
+coins, complete_levels, owned_skins, selected_skin = read_stats() # Read the game statistics, the only time stats.json is read
+cloud_img = None # cloud image for drawing clouds, loaded with the "clouds" asset group
+assets.declare("clouds", load_clouds)
+cloud_x = 0 # Initial x-coordinate for the cloud image
+cloud_strips = [] # rows of the screen the clouds change, found by get_cloud_strips
+cloud_strips_img = None # cloud image the strips were found for
+
+SCALED_FOLDER = "scaled cache" # folder scaled images are cached in, safe to delete
+SCALED_HEADER = struct.Struct("<II") # width and height at the start of each cached image
+
+TEXT_CACHE_SIZE = 256 # most rendered texts to remember
+text_cache = OrderedDict() # (font, text, colour) to the rendered surface, oldest first
+
+use_dirty_rects = True # only push the changed areas of the screen to the window each frame, False to always push everything
+DIRTY_LIMIT = 0.5 # if more than this fraction of the screen changed, push everything at once instead
+dirty_rects = [] # areas of the screen that changed this frame
+full_updates = 0 # number of frames left that need the whole screen pushed
+drawn_scene = None # game state that was drawn last frame
\ No newline at end of file